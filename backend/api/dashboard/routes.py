@@ -2,7 +2,8 @@
 Dashboard API routes for user profiles, stats, and activity
 """
 from flask import Blueprint, request, jsonify
-from config.database import supabase
+from config.storage import storage
+from api.dashboard.services import DashboardService
 
 # Create blueprint for dashboard routes
 dashboard_bp = Blueprint('dashboard', __name__)
@@ -17,11 +18,9 @@ def get_user_profile():
         if not user_id:
             return jsonify({'error': 'User ID is required'}), 400
         
-        # Fetch from Supabase
-        response = supabase.table('users').select('*').eq('clerk_user_id', user_id).execute()
+        user_data = storage.users.get(user_id)
         
-        if response.data:
-            user_data = response.data[0]
+        if user_data:
             return jsonify({
                 'success': True,
                 'data': {
@@ -52,21 +51,11 @@ def get_user_stats():
         if not user_id:
             return jsonify({'error': 'User ID is required'}), 400
         
-        # Fetch stats from Supabase
-        print(f"DEBUG: Fetching stats for user_id: {user_id}")
-        posts_response = supabase.table('forum_posts').select('id').eq('user_id', user_id).execute()
-        print(f"DEBUG: Posts response: {posts_response}")
-        upvotes_response = supabase.table('post_upvotes').select('id').eq('user_id', user_id).execute()
-        print(f"DEBUG: Upvotes response: {upvotes_response}")
+        stats = DashboardService.get_user_stats(user_id)
         
         return jsonify({
             'success': True,
-            'data': {
-                'notes_shared': 0,
-                'forum_posts': len(posts_response.data) if posts_response.data else 0,
-                'upvotes_received': len(upvotes_response.data) if upvotes_response.data else 0,
-                'total_contributions': len(posts_response.data) if posts_response.data else 0
-            }
+            'data': stats
         })
             
     except Exception as e:
@@ -86,20 +75,19 @@ def get_recent_activity():
             return jsonify({'error': 'User ID is required'}), 400
         
         # Fetch recent forum posts
-        posts_response = supabase.table('forum_posts').select('*').eq('user_id', user_id).order('created_at', desc=True).limit(int(limit)).execute()
+        posts = storage.posts.list_for_user(user_id, int(limit))
         
         # Combine and sort by date
         activities = []
         
-        if posts_response.data:
-            for post in posts_response.data:
-                activities.append({
-                    'type': 'forum_post',
-                    'title': post.get('title', ''),
-                    'course': post.get('course', ''),
-                    'created_at': post.get('created_at', ''),
-                    'upvotes': post.get('upvotes', 0)
-                })
+        for post in posts:
+            activities.append({
+                'type': 'forum_post',
+                'title': post.get('title', ''),
+                'course': post.get('course', ''),
+                'created_at': post.get('created_at', ''),
+                'upvotes': post.get('upvotes', 0)
+            })
         
         # Sort by date and limit
         activities.sort(key=lambda x: x['created_at'], reverse=True)
@@ -125,14 +113,13 @@ def create_user_profile():
         if not user_data.get('clerk_user_id'):
             return jsonify({'error': 'Clerk user ID is required'}), 400
         
-        # Insert new user into Supabase
-        response = supabase.table('users').insert(user_data).execute()
+        created = storage.users.create(user_data)
         
-        if response.data:
+        if created:
             return jsonify({
                 'success': True,
                 'message': 'Profile created successfully',
-                'data': response.data[0]
+                'data': created
             })
         else:
             return jsonify({'error': 'Failed to create profile'}), 500
@@ -153,14 +140,13 @@ def update_user_profile():
         if not user_id:
             return jsonify({'error': 'User ID is required'}), 400
         
-        # Update in Supabase
-        response = supabase.table('users').update(profile_data).eq('clerk_user_id', user_id).execute()
+        updated = storage.users.update(user_id, profile_data)
         
-        if response.data:
+        if updated:
             return jsonify({
                 'success': True,
                 'message': 'Profile updated successfully',
-                'data': response.data[0]
+                'data': updated
             })
         else:
             return jsonify({'error': 'Failed to update profile'}), 500
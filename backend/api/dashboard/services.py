@@ -0,0 +1,47 @@
+"""
+Dashboard services for user statistics
+
+Counts come from the ``user_stats`` row the database keeps current as posts,
+replies and upvotes are written, so a statistics response is one primary
+key lookup however long the user's history is. ``reconcile_user_stats.py``
+recounts them exactly.
+"""
+
+import logging
+from typing import Dict
+
+from config.storage import storage
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardService:
+    """Service for dashboard statistics"""
+    
+    @staticmethod
+    def get_user_stats(user_id: str) -> Dict[str, int]:
+        """
+        Get a user's dashboard statistics.
+        
+        Upvotes received are upvotes on the user's posts, not upvotes the
+        user gave.
+        
+        Args:
+            user_id (str): The user's Clerk ID
+            
+        Returns:
+            Dict[str, int]: notes_shared, forum_posts, forum_replies,
+                upvotes_received and total_contributions
+        """
+        logger.debug("Fetching stats for user_id: %s", user_id)
+        
+        stats = storage.users.stats(user_id)
+        forum_posts = stats['forum_posts']
+        
+        return {
+            'notes_shared': 0,
+            'forum_posts': forum_posts,
+            'forum_replies': stats['forum_replies'],
+            'upvotes_received': stats['upvotes_received'],
+            'total_contributions': forum_posts
+        }
@@ -0,0 +1,228 @@
+"""
+Read-through cache for course post listings
+
+Pages returned by ``ForumPostService.get_posts_for_course`` are kept in
+memory keyed by (course, sort, cursor, offset, limit), so the first page of a
+busy course is served without a database round trip. Entries expire after
+FORUM_POST_CACHE_TTL seconds and the least recently used ones are evicted
+beyond FORUM_POST_CACHE_MAX_ENTRIES.
+
+Writes made through this process keep the cache current: a new post drops
+its course's pages, and a reply or upvote patches the post in every cached
+page whose order it cannot change ('new') and drops the ranked pages it can.
+Writes made by other worker processes are only seen once entries expire, so
+the TTL bounds how stale a page can be.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+FORUM_POST_CACHE_TTL = float(os.getenv('FORUM_POST_CACHE_TTL', '10'))
+FORUM_POST_CACHE_MAX_ENTRIES = int(os.getenv('FORUM_POST_CACHE_MAX_ENTRIES', '1024'))
+
+# Sorts whose order a post's counts cannot change, so cached pages can be patched
+PATCHABLE_SORTS = frozenset({'new'})
+
+# (course, sort, cursor, offset, limit)
+CacheKey = Tuple[str, str, Optional[str], int, int]
+
+# (posts, next_cursor)
+Page = Tuple[List[Dict], Optional[str]]
+
+
+class PostPageCache:
+    """Thread-safe TTL + LRU cache of course post pages"""
+
+    def __init__(self, ttl: float = FORUM_POST_CACHE_TTL, max_entries: int = FORUM_POST_CACHE_MAX_ENTRIES):
+        """
+        Initialize an empty cache.
+
+        Args:
+            ttl (float): Seconds a page stays valid; 0 disables the cache
+            max_entries (int): Pages kept before least recently used ones are evicted
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[CacheKey, Tuple[float, List[Dict], Optional[str]]]' = OrderedDict()
+        self._post_keys: Dict[int, Set[CacheKey]] = {}
+        self._course_keys: Dict[str, Set[CacheKey]] = {}
+        self._generations: Dict[str, int] = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._patches = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether pages are cached at all"""
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key: CacheKey) -> Optional[Page]:
+        """
+        Look up a page.
+
+        Args:
+            key (CacheKey): (course, sort, cursor, offset, limit)
+
+        Returns:
+            Optional[Page]: A copy of the cached (posts, next_cursor), safe for
+                the caller to modify, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, posts, next_cursor = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return [dict(post) for post in posts], next_cursor
+
+    def generation(self, course: str) -> int:
+        """
+        Current write generation of a course.
+
+        Read it before querying the database and pass it to ``put``, so a page
+        read concurrently with a write to the course is not cached.
+        """
+        with self._lock:
+            return self._generations.get(course, 0)
+
+    def put(self, key: CacheKey, posts: List[Dict], next_cursor: Optional[str], generation: int) -> None:
+        """
+        Cache a page read from the database.
+
+        Args:
+            key (CacheKey): (course, sort, cursor, offset, limit)
+            posts (List[Dict]): Posts on the page; copied before caching
+            next_cursor (Optional[str]): Cursor for the following page
+            generation (int): ``generation(course)`` read before the query
+        """
+        if not self.enabled:
+            return
+
+        course = key[0]
+        with self._lock:
+            if self._generations.get(course, 0) != generation:
+                return
+
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, [dict(post) for post in posts], next_cursor)
+            self._course_keys.setdefault(course, set()).add(key)
+            for post in posts:
+                self._post_keys.setdefault(post['id'], set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate_course(self, course: str) -> None:
+        """Drop every cached page of a course"""
+        with self._lock:
+            self._bump(course)
+            for key in list(self._course_keys.get(course, ())):
+                self._remove(key)
+                self._invalidations += 1
+
+    def patch_post(self, post_id: int, update: Callable[[Dict], None], course: Optional[str] = None) -> None:
+        """
+        Apply a change to a post wherever it is cached.
+
+        Pages in a patchable sort are updated in place. Ranked pages of the
+        post's course are dropped, since the change may move the post within
+        them or into them.
+
+        Args:
+            post_id (int): The ID of the changed post
+            update (Callable[[Dict], None]): Mutates a cached post dict
+            course (Optional[str]): The post's course, if known; without it
+                only courses with a cached page holding the post are affected
+        """
+        with self._lock:
+            keys = self._post_keys.get(post_id, set())
+            courses = {key[0] for key in keys}
+            if course is not None:
+                courses.add(course)
+
+            for affected in courses:
+                self._bump(affected)
+                for key in list(self._course_keys.get(affected, ())):
+                    if key[1] not in PATCHABLE_SORTS:
+                        self._remove(key)
+                        self._invalidations += 1
+
+            for key in self._post_keys.get(post_id, ()):
+                for post in self._entries[key][1]:
+                    if post['id'] == post_id:
+                        update(post)
+                self._patches += 1
+
+    def clear(self) -> None:
+        """Drop every cached page"""
+        with self._lock:
+            for course in list(self._course_keys):
+                self._bump(course)
+            self._entries.clear()
+            self._post_keys.clear()
+            self._course_keys.clear()
+
+    def metrics(self) -> Dict:
+        """Entry count and hit, miss and invalidation counters"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'invalidations': self._invalidations,
+                'patches': self._patches
+            }
+
+    def _bump(self, course: str) -> None:
+        """Advance a course's write generation; the caller holds the lock"""
+        self._generations[course] = self._generations.get(course, 0) + 1
+
+    def _remove(self, key: CacheKey) -> None:
+        """Drop an entry and its index references; the caller holds the lock"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        course_keys = self._course_keys.get(key[0])
+        if course_keys is not None:
+            course_keys.discard(key)
+            if not course_keys:
+                del self._course_keys[key[0]]
+
+        for post in entry[1]:
+            post_keys = self._post_keys.get(post['id'])
+            if post_keys is not None:
+                post_keys.discard(key)
+                if not post_keys:
+                    del self._post_keys[post['id']]
+
+
+# Global post page cache for this process
+post_cache = PostPageCache()
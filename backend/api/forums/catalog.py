@@ -0,0 +1,227 @@
+"""
+In-memory course catalog for the forums API
+
+The catalog is built from the scraped university files in
+``webscrape/college_data`` once per process and kept in memory. Source files
+are re-checked at most every ``check_interval`` seconds: a file is only
+re-read when its mtime or size changes, and only re-parsed when its content
+hash changes, so a warm catalog costs a handful of ``stat`` calls per interval.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COLLEGE_DATA_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '../../../webscrape/college_data'
+))
+
+UNIVERSITY_FILES = [
+    'North Carolina State University.json',
+    'University of North Carolina at Chapel Hill.json',
+    'University of North Carolina at Charlotte.json'
+]
+
+# Sections of each major that list courses
+COURSE_SECTIONS = ('core_courses', 'math_science_requirements', 'elective_courses')
+
+# Seconds between file change checks on a warm catalog
+DEFAULT_CHECK_INTERVAL = float(os.getenv('COURSE_CATALOG_CHECK_INTERVAL', '5'))
+
+# (mtime_ns, size) of a source file, or None if it is missing
+FileStat = Optional[Tuple[int, int]]
+
+
+class CourseCatalog:
+    """
+    Process-wide cache of the parsed course list.
+
+    The course list returned by ``get_courses`` is shared between callers and
+    must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        data_dir: str = COLLEGE_DATA_DIR,
+        filenames: Optional[List[str]] = None,
+        check_interval: float = DEFAULT_CHECK_INTERVAL
+    ):
+        """
+        Initialize an empty catalog. Nothing is read until first use.
+
+        Args:
+            data_dir (str): Directory containing the university JSON files
+            filenames (List[str]): University files to load, in priority order
+            check_interval (float): Minimum seconds between file change checks
+        """
+        self.data_dir = data_dir
+        self.filenames = list(filenames or UNIVERSITY_FILES)
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._last_checked = 0.0
+        self._file_stats: Dict[str, FileStat] = {}
+        self._file_hashes: Dict[str, str] = {}
+        self._file_courses: Dict[str, List[Tuple[str, str, str]]] = {}
+        self._courses: List[Dict[str, str]] = []
+        self._content_hash = ''
+
+    def get_courses(self) -> List[Dict[str, str]]:
+        """
+        Get the deduplicated course list, refreshing it if the files changed.
+
+        Returns:
+            List[Dict[str, str]]: Courses with course_code, course_name and university
+        """
+        self._refresh_if_stale()
+        return self._courses
+
+    @property
+    def content_hash(self) -> str:
+        """Hex digest identifying the current catalog contents"""
+        self._refresh_if_stale()
+        return self._content_hash
+
+    def invalidate(self) -> None:
+        """Force the next access to re-read and re-parse every source file"""
+        with self._lock:
+            self._loaded = False
+            self._file_stats.clear()
+            self._file_hashes.clear()
+            self._file_courses.clear()
+
+    def _refresh_if_stale(self) -> None:
+        """Re-check the source files if the check interval has elapsed"""
+        if self._loaded and time.monotonic() - self._last_checked < self.check_interval:
+            return
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._loaded and time.monotonic() - self._last_checked < self.check_interval:
+                return
+
+            stats = {filename: self._stat_file(filename) for filename in self.filenames}
+            if not self._loaded or stats != self._file_stats:
+                self._reload(stats)
+
+            self._loaded = True
+            self._last_checked = time.monotonic()
+
+    def _stat_file(self, filename: str) -> FileStat:
+        """Get the (mtime_ns, size) of a source file, or None if it is missing"""
+        try:
+            stat = os.stat(os.path.join(self.data_dir, filename))
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _reload(self, stats: Dict[str, FileStat]) -> None:
+        """
+        Rebuild the course list from the files whose stats changed.
+
+        Args:
+            stats (Dict[str, FileStat]): Fresh stats for every source file
+        """
+        changed = False
+
+        for filename in self.filenames:
+            if self._loaded and stats[filename] == self._file_stats.get(filename):
+                continue
+
+            file_path = os.path.join(self.data_dir, filename)
+            university_name = filename.replace('.json', '')
+
+            try:
+                with open(file_path, 'rb') as file:
+                    raw = file.read()
+            except FileNotFoundError:
+                logger.warning("University file not found: %s", file_path)
+                changed = changed or filename in self._file_courses
+                self._file_hashes.pop(filename, None)
+                self._file_courses.pop(filename, None)
+                continue
+
+            file_hash = hashlib.sha256(raw).hexdigest()
+            if self._file_hashes.get(filename) == file_hash:
+                # Touched but not modified
+                continue
+
+            logger.info("Loading courses from: %s", university_name)
+            try:
+                data = json.loads(raw)
+            except json.JSONDecodeError as e:
+                logger.warning("Invalid JSON in %s: %s", filename, e)
+                changed = changed or filename in self._file_courses
+                self._file_hashes.pop(filename, None)
+                self._file_courses.pop(filename, None)
+                continue
+
+            self._file_hashes[filename] = file_hash
+            self._file_courses[filename] = self._parse_courses(data, university_name)
+            changed = True
+
+        self._file_stats = stats
+
+        if changed or not self._loaded:
+            self._rebuild()
+
+    @staticmethod
+    def _parse_courses(data: Dict, university_name: str) -> List[Tuple[str, str, str]]:
+        """
+        Extract (course_code, course_name, university) tuples from a university file.
+
+        Args:
+            data (Dict): Parsed university JSON document
+            university_name (str): University the courses belong to
+
+        Returns:
+            List[Tuple[str, str, str]]: Courses in file order, possibly with duplicates
+        """
+        courses = []
+        for major in data.get('majors', []):
+            for section in COURSE_SECTIONS:
+                for course in major.get(section, []):
+                    course_code = course.get('course_code', '').strip()
+                    course_name = course.get('course_name', '').strip()
+                    if course_code and course_name:
+                        courses.append((course_code, course_name, university_name))
+        return courses
+
+    def _rebuild(self) -> None:
+        """Merge the per-file course lists into the deduplicated catalog"""
+        course_list = []
+        seen_courses = set()
+        digest = hashlib.sha256()
+
+        for filename in self.filenames:
+            if filename not in self._file_courses:
+                continue
+
+            digest.update(self._file_hashes[filename].encode())
+            for code, name, university in self._file_courses[filename]:
+                unique_key = (code, university)
+                if unique_key not in seen_courses:
+                    seen_courses.add(unique_key)
+                    course_list.append({
+                        'course_code': code,
+                        'course_name': name,
+                        'university': university
+                    })
+
+        self._courses = course_list
+        self._content_hash = digest.hexdigest()
+        logger.info(
+            "Loaded %d unique courses from %d universities",
+            len(course_list), len(self._file_courses)
+        )
+
+
+# Global catalog instance shared by every request in this process
+course_catalog = CourseCatalog()
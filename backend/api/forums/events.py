@@ -0,0 +1,329 @@
+"""
+Publish/subscribe hub for live forum updates
+
+Services publish events (new posts, new replies, upvote changes) per course
+and the SSE stream route delivers them to subscribers. gunicorn runs several
+worker processes, so events travel through the ``forum_events`` table rather
+than memory: each worker's relay thread writes the events it raised with one
+insert and, while the worker has subscribers, polls every
+FORUM_STREAM_POLL_MS for new events from all workers and delivers them in ID
+order. Event IDs are the table's, so a client resuming with Last-Event-ID may
+reconnect to any worker. Run the streaming workers with gevent (see
+gunicorn.conf.py) so idle connections cost a greenlet rather than an OS
+thread.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from config.storage import storage
+
+logger = logging.getLogger(__name__)
+
+# Most missed events replayed to a client resuming via Last-Event-ID
+REPLAY_BUFFER_SIZE = int(os.getenv('FORUM_STREAM_REPLAY_BUFFER', '100'))
+
+# Undelivered events a subscriber may accumulate before it is disconnected
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv('FORUM_STREAM_QUEUE_SIZE', '256'))
+
+# Milliseconds between polls for new events while this worker has subscribers
+STREAM_POLL_MS = int(os.getenv('FORUM_STREAM_POLL_MS', '250'))
+
+# Milliseconds delivery waits at a missing event ID, which another worker may
+# not have committed yet, before giving it up as rolled back
+STREAM_GAP_TIMEOUT_MS = int(os.getenv('FORUM_STREAM_GAP_TIMEOUT_MS', '2000'))
+
+# Age at which events are deleted from the table
+STREAM_RETENTION_SECONDS = int(os.getenv('FORUM_STREAM_RETENTION_SECONDS', '3600'))
+
+# Events read per poll query
+POLL_BATCH_SIZE = 500
+
+# Seconds between prunes of old events
+PRUNE_INTERVAL_SECONDS = 60
+
+# (event id, event type, JSON-encoded data)
+Event = Tuple[int, str, str]
+
+
+class Subscription:
+    """A single subscriber's queue of pending events for one course"""
+
+    def __init__(self, course: str):
+        """
+        Initialize an empty subscription.
+
+        Args:
+            course (str): Course code the subscriber listens to
+        """
+        self.course = course
+        self.overflowed = False
+        self._queue: 'queue.Queue[Event]' = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def get(self, timeout: float) -> Optional[Event]:
+        """
+        Wait for the next event.
+
+        Args:
+            timeout (float): Seconds to wait before giving up
+
+        Returns:
+            Optional[Event]: The next event, or None if none arrived in time
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _offer(self, event: Event) -> bool:
+        """Queue an event without blocking; returns False if the queue is full"""
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.overflowed = True
+            return False
+
+
+class EventHub:
+    """Per-course fan-out of every worker's forum events to this worker's stream subscribers"""
+
+    def __init__(
+        self,
+        replay_buffer_size: int = REPLAY_BUFFER_SIZE,
+        poll_interval_ms: int = STREAM_POLL_MS,
+        gap_timeout_ms: int = STREAM_GAP_TIMEOUT_MS,
+        retention_seconds: int = STREAM_RETENTION_SECONDS
+    ):
+        """
+        Initialize a hub with no subscribers. The relay thread starts on first use.
+
+        Args:
+            replay_buffer_size (int): Most events replayed to a resuming subscriber
+            poll_interval_ms (int): Time between polls for new events
+            gap_timeout_ms (int): Time delivery waits for a missing event ID
+            retention_seconds (int): Age at which events are pruned
+        """
+        self.replay_buffer_size = replay_buffer_size
+        self.poll_interval = poll_interval_ms / 1000
+        self.gap_timeout = gap_timeout_ms / 1000
+        self.retention_seconds = retention_seconds
+
+        # Guards the subscribers and the outbox
+        self._lock = threading.Lock()
+        # Serializes delivery, so events reach subscribers in ID order
+        self._deliver_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._outbox: List[Dict] = []
+        self._cursor: Optional[int] = None
+        self._gap_since: Optional[float] = None
+        self._last_prune = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def subscribe(self, course: str, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Start listening to a course.
+
+        Args:
+            course (str): Course code to listen to
+            last_event_id (Optional[int]): Last event the client saw; newer
+                events are replayed into the subscription
+
+        Returns:
+            Subscription: The new subscription; release it with ``unsubscribe``
+
+        Raises:
+            Exception: If the events could not be read
+        """
+        self._ensure_started()
+        subscription = Subscription(course)
+        with self._deliver_lock:
+            if self._cursor is None:
+                self._cursor = storage.events.latest_id()
+
+            # Events past the cursor are delivered by the relay, in order
+            if last_event_id is not None:
+                for row in storage.events.list_after(last_event_id, self.replay_buffer_size, course):
+                    if row['id'] > self._cursor:
+                        break
+                    subscription._offer((row['id'], row['event_type'], row['payload']))
+
+            with self._lock:
+                self._subscribers.setdefault(course, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop delivering events to a subscription"""
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.course)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.course]
+
+    def publish(self, course: str, event_type: str, data: Dict) -> None:
+        """
+        Queue an event for every worker's subscribers of a course.
+
+        Never blocks on the database: the relay thread writes queued events
+        right away, batching those raised while a write is in progress.
+
+        Args:
+            course (str): Course code the event belongs to
+            event_type (str): SSE event name, e.g. 'post_created'
+            data (Dict): JSON-serializable payload
+        """
+        payload = json.dumps(data, default=str, separators=(',', ':'))
+        self._ensure_started()
+        with self._lock:
+            self._outbox.append({'course': course, 'event_type': event_type, 'payload': payload})
+        self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Write the queued events with one insert.
+
+        Live events are best-effort: if the write fails they are dropped
+        (clients still see the changes on their next fetch).
+
+        Returns:
+            int: Number of events written
+        """
+        with self._lock:
+            events, self._outbox = self._outbox, []
+        if not events:
+            return 0
+
+        try:
+            storage.events.append_many(events)
+        except Exception as e:
+            logger.error("Dropped %d live events that could not be written: %s", len(events), e)
+            return 0
+        return len(events)
+
+    def poll(self) -> int:
+        """
+        Deliver new events from every worker to this worker's subscribers.
+
+        Returns:
+            int: Number of events delivered
+        """
+        with self._deliver_lock:
+            if not self.has_subscribers():
+                # Nobody to catch up; start from the newest event next time
+                self._cursor = None
+                self._gap_since = None
+                return 0
+            if self._cursor is None:
+                self._cursor = storage.events.latest_id()
+
+            delivered = 0
+            while True:
+                rows = storage.events.list_after(self._cursor, POLL_BATCH_SIZE)
+                count = self._deliver(rows)
+                delivered += count
+                if count < POLL_BATCH_SIZE:
+                    return delivered
+
+    def prune(self) -> int:
+        """Delete events older than the retention period and return how many"""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.retention_seconds)
+        return storage.events.prune(cutoff.isoformat())
+
+    def has_subscribers(self) -> bool:
+        """Whether anyone in this process is listening to any course"""
+        return bool(self._subscribers)
+
+    def subscriber_counts(self) -> Dict[str, int]:
+        """Number of subscribers per course"""
+        with self._lock:
+            return {course: len(subscribers) for course, subscribers in self._subscribers.items()}
+
+    def _deliver(self, rows: List[Dict]) -> int:
+        """
+        Dispatch rows following the cursor, stopping at a missing ID.
+
+        IDs are assigned before commit, so a later event can become visible
+        before an earlier one; delivery waits up to gap_timeout for it.
+        """
+        delivered = 0
+        for row in rows:
+            if row['id'] != self._cursor + 1:
+                now = time.monotonic()
+                if self._gap_since is None:
+                    self._gap_since = now
+                if now - self._gap_since < self.gap_timeout:
+                    break
+                logger.warning("Skipped live events %d to %d, which were never committed", self._cursor + 1, row['id'] - 1)
+
+            self._gap_since = None
+            self._cursor = row['id']
+            self._dispatch(row['course'], (row['id'], row['event_type'], row['payload']))
+            delivered += 1
+        return delivered
+
+    def _dispatch(self, course: str, event: Event) -> None:
+        """
+        Queue an event for each subscriber of a course.
+
+        Never blocks: subscribers whose queue is full are dropped and marked
+        as overflowed, so their stream ends and the client reconnects.
+        """
+        with self._lock:
+            subscribers = self._subscribers.get(course, set())
+            dropped = [subscription for subscription in subscribers if not subscription._offer(event)]
+            for subscription in dropped:
+                subscribers.discard(subscription)
+            if dropped and not subscribers:
+                del self._subscribers[course]
+
+        if dropped:
+            logger.warning("Dropped %d slow stream subscribers for course %s", len(dropped), course)
+
+    def _ensure_started(self) -> None:
+        """Start the relay thread in this process (again after a fork)"""
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='event-relay', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Relay loop: write queued events, deliver new ones, prune old ones"""
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                self.poll()
+                if time.monotonic() - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+                    self._last_prune = time.monotonic()
+                    self.prune()
+            except Exception as e:
+                logger.error("Error relaying live events: %s", e)
+
+
+def format_sse(event: Event) -> str:
+    """Serialize an event in text/event-stream format"""
+    event_id, event_type, payload = event
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+
+
+# Global hub shared by services and the stream route in this process
+event_hub = EventHub()
+
+# Write queued events when the worker shuts down
+atexit.register(event_hub.flush)
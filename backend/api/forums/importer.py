@@ -0,0 +1,309 @@
+"""
+Bulk import of forum posts and replies
+
+Rows are validated one at a time as they are read, so an import never holds
+more than one batch in memory, and valid rows are written with a single
+``create_many([...])`` per batch of FORUM_IMPORT_BATCH_SIZE rows. Invalid rows are
+reported with their row number and skipped; they never abort the import.
+
+Each row is a JSON object with a ``type``:
+
+- ``{"type": "post", "ref": "old-17", "title": ..., "content": ..., "course": ...,
+  "user_id": ..., "user_name": ..., "created_at": "2023-09-01T10:00:00Z"}``
+- ``{"type": "reply", "post_ref": "old-17" | "post_id": 42, "user_id": ...,
+  "user_name": ..., "content": ..., "created_at": ...}``
+
+``ref`` is an optional import-local name for a post, so replies in the same
+import can point at posts that do not have database IDs yet. ``created_at``
+is optional and preserves original timestamps when migrating a forum.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Set, Tuple
+
+from config.storage import storage
+from storage.base import RowsRejectedError
+from api.forums.cache import post_cache
+from api.forums.services import ForumPostService, ReplyService, SearchService
+
+logger = logging.getLogger(__name__)
+
+FORUM_IMPORT_BATCH_SIZE = int(os.getenv('FORUM_IMPORT_BATCH_SIZE', '500'))
+
+# Largest batch size a caller may request
+MAX_IMPORT_BATCH_SIZE = 1000
+
+# Row errors kept in the result; the count is always exact
+MAX_REPORTED_ERRORS = 1000
+
+# (row number, post ref or None, row to insert)
+PendingRow = Tuple[int, Optional[str], Dict]
+
+# Stands in for each row of a batch that was stored but not returned in full,
+# when there is no telling which returned row belongs to which input row
+STORED_NOT_RETURNED: Dict = {}
+
+
+def read_ndjson(stream: IO[bytes]) -> Iterator[Dict]:
+    """
+    Parse newline-delimited JSON lazily, one row per non-blank line.
+
+    Lines that are not JSON objects are yielded as ``{'_error': message}`` so
+    the importer can report them against their row number.
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield {'_error': f"Invalid JSON: {e}"}
+            continue
+        yield row if isinstance(row, dict) else {'_error': "Row must be a JSON object"}
+
+
+def parse_timestamp(value) -> str:
+    """
+    Validate an ISO 8601 timestamp and normalize it to UTC.
+
+    Naive timestamps are taken to be UTC.
+
+    Raises:
+        ValueError: If the value is not an ISO 8601 timestamp
+    """
+    if not isinstance(value, str):
+        raise ValueError("Field created_at must be an ISO 8601 timestamp")
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid created_at timestamp: {value}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+class ForumImporter:
+    """Validates and inserts a stream of post and reply rows in batches"""
+
+    def __init__(self, batch_size: int = FORUM_IMPORT_BATCH_SIZE):
+        """
+        Initialize an importer for one import run.
+
+        Args:
+            batch_size (int): Rows per insert statement
+
+        Raises:
+            ValueError: If the batch size is out of range
+        """
+        if batch_size < 1 or batch_size > MAX_IMPORT_BATCH_SIZE:
+            raise ValueError(f"Batch size must be between 1 and {MAX_IMPORT_BATCH_SIZE}")
+
+        self.batch_size = batch_size
+        self._post_ids: Dict[str, Optional[int]] = {}
+        # Refs of posts that were stored without their ID coming back
+        self._unlinked_refs: Set[str] = set()
+        self._pending_posts: List[PendingRow] = []
+        self._pending_replies: List[PendingRow] = []
+        self._errors: List[Dict] = []
+        self._error_count = 0
+        self._rows = 0
+        self._posts_created = 0
+        self._replies_created = 0
+        self._batches = 0
+
+    def run(self, rows: Iterable[Dict]) -> Dict:
+        """
+        Import every row.
+
+        Args:
+            rows (Iterable[Dict]): Post and reply rows, read lazily
+
+        Returns:
+            Dict: Summary with rows, posts_created, replies_created, batches,
+                error_count, errors (row number and message for each failed
+                row), elapsed_ms and rows_per_second
+
+        Raises:
+            Exception: If a batch failed other than by the database rejecting
+                its rows; batches before it stay imported
+        """
+        start = time.perf_counter()
+
+        try:
+            for number, row in enumerate(rows, 1):
+                self._rows = number
+                try:
+                    self._add(number, row)
+                except ValueError as e:
+                    self._error(number, str(e))
+
+            self._flush_posts()
+            self._flush_replies()
+        except Exception:
+            logger.error(
+                "Import stopped by row %d with %d posts and %d replies already stored",
+                self._rows, self._posts_created, self._replies_created
+            )
+            raise
+        finally:
+            # Imported rows change counts and pages in ways patching can't track
+            if self._posts_created or self._replies_created:
+                post_cache.clear()
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            "Imported %d posts and %d replies from %d rows in %.2fs (%d errors)",
+            self._posts_created, self._replies_created, self._rows, elapsed, self._error_count
+        )
+
+        return {
+            'rows': self._rows,
+            'posts_created': self._posts_created,
+            'replies_created': self._replies_created,
+            'batches': self._batches,
+            'error_count': self._error_count,
+            'errors': self._errors,
+            'elapsed_ms': round(elapsed * 1000, 1),
+            'rows_per_second': round(self._rows / elapsed) if elapsed > 0 else 0
+        }
+
+    def _add(self, number: int, row: Dict) -> None:
+        """Validate one row and queue it, flushing full batches"""
+        if not isinstance(row, dict):
+            raise ValueError("Row must be a JSON object")
+        if '_error' in row:
+            raise ValueError(row['_error'])
+
+        row_type = row.get('type')
+        if row_type == 'post':
+            post = ForumPostService.prepare_post(row)
+            if row.get('created_at'):
+                post['created_at'] = parse_timestamp(row['created_at'])
+
+            ref = row.get('ref')
+            if ref is not None:
+                ref = str(ref)
+                if ref in self._post_ids:
+                    raise ValueError(f"Duplicate post ref: {ref}")
+                # Reserved until the post is inserted
+                self._post_ids[ref] = None
+
+            self._pending_posts.append((number, ref, post))
+            if len(self._pending_posts) >= self.batch_size:
+                self._flush_posts()
+
+        elif row_type == 'reply':
+            post_ref = row.get('post_ref')
+            if post_ref is not None:
+                post_ref = str(post_ref)
+                if post_ref not in self._post_ids:
+                    raise ValueError(f"Unknown post_ref: {post_ref}")
+                # Resolved to a post ID when the batch is flushed
+                row = {**row, 'post_id': -1}
+
+            reply = ReplyService.prepare_reply(row)
+            if row.get('created_at'):
+                reply['created_at'] = parse_timestamp(row['created_at'])
+
+            self._pending_replies.append((number, post_ref, reply))
+            if len(self._pending_replies) >= self.batch_size:
+                self._flush_replies()
+
+        else:
+            raise ValueError("Field type must be 'post' or 'reply'")
+
+    def _flush_posts(self) -> None:
+        """Insert the queued posts and record the IDs of referenced ones"""
+        pending, self._pending_posts = self._pending_posts, []
+        for (number, ref, _), created in zip(pending, self._insert(storage.posts, pending)):
+            if created is None:
+                continue
+            self._posts_created += 1
+            if created is STORED_NOT_RETURNED:
+                if ref is not None:
+                    self._unlinked_refs.add(ref)
+                    self._error(number, f"Post {ref} was stored, but its ID was not returned; "
+                                        "replies can't reference it")
+                continue
+            if ref is not None:
+                self._post_ids[ref] = created['id']
+            SearchService.index_post(created)
+
+    def _flush_replies(self) -> None:
+        """Insert the queued replies once the posts they reference exist"""
+        if any(post_ref is not None for _, post_ref, _ in self._pending_replies):
+            self._flush_posts()
+
+        pending, self._pending_replies = self._pending_replies, []
+        resolved = []
+        for number, post_ref, reply in pending:
+            if post_ref is not None:
+                post_id = self._post_ids.get(post_ref)
+                if post_id is None:
+                    if post_ref in self._unlinked_refs:
+                        self._error(number, f"Post {post_ref} has no known ID")
+                    else:
+                        self._error(number, f"Post {post_ref} was not imported")
+                    continue
+                reply['post_id'] = post_id
+            resolved.append((number, post_ref, reply))
+
+        for created in self._insert(storage.replies, resolved):
+            if created is not None:
+                self._replies_created += 1
+                if created is not STORED_NOT_RETURNED:
+                    SearchService.index_reply(created)
+
+    def _insert(self, repository, pending: List[PendingRow]) -> List[Optional[Dict]]:
+        """
+        Insert rows with one statement, isolating failures by bisection.
+
+        A batch the database rejects (say, a reply to a post that does not
+        exist) is split in half and each half retried, so only the offending
+        rows are reported and the rest still land in a few statements. Any
+        other failure, like a timeout, is raised: the batch may have been
+        stored, and inserts are not idempotent, so retrying could duplicate it.
+
+        Args:
+            repository: ``storage.posts`` or ``storage.replies``
+            pending (List[PendingRow]): Rows to insert
+
+        Returns:
+            List[Optional[Dict]]: The created row for each pending row, None
+                where the row failed, or STORED_NOT_RETURNED for every row of
+                a batch the database stored but echoed only in part
+
+        Raises:
+            Exception: If the insert failed for a reason other than the rows
+        """
+        if not pending:
+            return []
+
+        try:
+            created = repository.create_many([row for _, _, row in pending])
+        except RowsRejectedError as e:
+            if len(pending) == 1:
+                self._error(pending[0][0], f"Insert failed: {e}")
+                return [None]
+
+            middle = len(pending) // 2
+            return self._insert(repository, pending[:middle]) + self._insert(repository, pending[middle:])
+
+        self._batches += 1
+        if len(created) != len(pending):
+            # Stored, but which returned row is which can't be told by
+            # position; never retry or the rows would duplicate
+            logger.warning("Insert returned %d of %d rows", len(created), len(pending))
+            return [STORED_NOT_RETURNED] * len(pending)
+        return created
+
+    def _error(self, number: int, message: str) -> None:
+        """Record a failed row"""
+        self._error_count += 1
+        if len(self._errors) < MAX_REPORTED_ERRORS:
+            self._errors.append({'row': number, 'error': message})
@@ -0,0 +1,52 @@
+"""
+Opaque keyset pagination cursors
+
+A cursor records the sort key of the last row a client has seen, e.g.
+``{'created_at': ..., 'id': ...}``, encoded as URL-safe base64 JSON. Clients
+must treat cursors as opaque strings and pass them back unchanged.
+"""
+
+import base64
+import binascii
+import json
+from typing import Dict, Iterable
+
+
+def encode_cursor(position: Dict) -> str:
+    """
+    Encode a row position as an opaque cursor string.
+
+    Args:
+        position (Dict): JSON-serializable sort key of the last row returned
+
+    Returns:
+        str: URL-safe cursor without base64 padding
+    """
+    raw = json.dumps(position, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, required_keys: Iterable[str]) -> Dict:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor (str): Cursor string received from a client
+        required_keys (Iterable[str]): Keys the decoded position must contain
+
+    Returns:
+        Dict: The decoded row position
+
+    Raises:
+        ValueError: If the cursor is malformed or missing required keys
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(position, dict) or any(key not in position for key in required_keys):
+        raise ValueError("Invalid cursor")
+
+    return position
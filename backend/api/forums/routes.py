@@ -1,58 +1,250 @@
 
 import logging
-from flask import Blueprint, request, jsonify
-from api.forums.services import CourseDataService, ForumPostService, UpvoteService, ReplyService
+import os
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from api.forums.catalog import course_catalog
+from api.forums.events import event_hub, format_sse
+from api.forums.importer import ForumImporter, read_ndjson, FORUM_IMPORT_BATCH_SIZE
+from api.forums.services import (
+    CourseDataService, ForumPostService, UpvoteService, ReplyService, SearchService,
+    DEFAULT_REPLY_PAGE_SIZE, MAX_REPLY_PAGE_SIZE
+)
+from api.responses import conditional_json, make_etag
 
 logger = logging.getLogger(__name__)
 forums_bp = Blueprint('forums', __name__)
 
+# Largest batch accepted by GET /posts/upvote-status (one page of posts)
+MAX_UPVOTE_STATUS_POSTS = 100
+
+# Largest number of results returned by GET /search
+MAX_SEARCH_RESULTS = 50
+
+# Seconds between keep-alive comments on idle event streams
+STREAM_HEARTBEAT_SECONDS = float(os.getenv('FORUM_STREAM_HEARTBEAT', '15'))
+
+# Seconds browsers and proxies may reuse a course list before revalidating
+COURSES_MAX_AGE = int(os.getenv('FORUM_COURSES_MAX_AGE', '60'))
+
 @forums_bp.route('/courses', methods=['GET'])
 def get_courses():
+    """
+    Get every course with its forum post count and latest post time.
+    
+    The response carries a strong ETag derived from the catalog content hash
+    and the per-course activity, so a client sending it back in
+    If-None-Match gets a 304 without the course list being rebuilt.
+    If the activity lookup fails, the courses are returned with zero counts
+    and no ETag, marked no-store.
+    
+    Returns:
+        JSON response with list of courses, or 304 Not Modified
+    """
     try:
         logger.info("Fetching courses for forums")
         
         courses = CourseDataService.load_course_data()
-        logger.info(f"Loaded {len(courses)} courses from service")
-        
-        courses_with_metadata = []
-        for course in courses:
-            course_code = course['course_code']
+        logger.info("Loaded %d courses from service", len(courses))
+        
+        # One grouped query for every course instead of two per course
+        activity = ForumPostService.get_course_activity()
+        activity_failed = activity is None
+        if activity_failed:
+            activity = {}
+        
+        def build_payload():
+            courses_with_metadata = []
+            for course in courses:
+                course_code = course['course_code']
+                course_activity = activity.get(course_code, {})
+                
+                courses_with_metadata.append({
+                    'course_code': course_code,
+                    'course_name': course['course_name'],
+                    'university': course.get('university', 'Unknown'),
+                    'post_count': course_activity.get('post_count', 0),
+                    'recent_activity': course_activity.get('recent_activity')
+                })
             
-            courses_with_metadata.append({
-                'course_code': course_code,
-                'course_name': course['course_name'],
-                'university': course.get('university', 'Unknown'),
-                'post_count': 0,
-                'recent_activity': None
-            })
+            logger.info("Successfully fetched %d courses", len(courses_with_metadata))
+            
+            return {
+                'success': True,
+                'data': courses_with_metadata
+            }
+        
+        if activity_failed:
+            # Serve the courses with zero counts, but never let a client,
+            # proxy or the response cache keep them past this request
+            response = jsonify(build_payload())
+            response.headers['Cache-Control'] = 'no-store'
+            return response
+        
+        etag = make_etag(
+            course_catalog.content_hash,
+            sorted((course, row['post_count'], row['recent_activity']) for course, row in activity.items())
+        )
+        return conditional_json(etag, build_payload, f'public, max-age={COURSES_MAX_AGE}')
+        
+    except Exception as e:
+        logger.error("Error fetching courses: %s", e)
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch courses',
+            'message': str(e)
+        }), 500
+
+@forums_bp.route('/search', methods=['GET'])
+def search_forums():
+    """
+    Full-text search across forum posts and replies.
+    
+    Query Parameters:
+        q (str): Search query; supports quoted phrases and -exclusions (required)
+        course (str): Only return results from this course (optional)
+        limit (int): Maximum number of results (default: 20, max: 50)
+    
+    Returns:
+        JSON response with ranked results; matches in title and snippet are
+        wrapped in <mark> tags
+        
+    Example Response:
+        {
+            "success": true,
+            "data": [
+                {
+                    "type": "reply",
+                    "id": 40,
+                    "post_id": 12,
+                    "course": "CSC 116",
+                    "title": "Help with <mark>recursion</mark>",
+                    "snippet": "Try drawing the <mark>recursion</mark> tree first...",
+                    "rank": 0.42,
+                    "created_at": "2024-01-15T10:30:00Z"
+                }
+            ]
+        }
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        course = request.args.get('course') or None
+        limit = int(request.args.get('limit', 20))
         
-        logger.info(f"Successfully fetched {len(courses_with_metadata)} courses")
+        if not query:
+            return jsonify({
+                'success': False,
+                'error': 'Missing required parameter',
+                'message': 'Query parameter q is required'
+            }), 400
+        
+        if limit < 1 or limit > MAX_SEARCH_RESULTS:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid parameter',
+                'message': f'Limit must be between 1 and {MAX_SEARCH_RESULTS}'
+            }), 400
+        
+        results = SearchService.search(query, course, limit)
         
         return jsonify({
             'success': True,
-            'data': courses_with_metadata
+            'data': results
         })
         
+    except ValueError as e:
+        logger.warning("Invalid parameter in search_forums: %s", e)
+        return jsonify({
+            'success': False,
+            'error': 'Invalid parameter',
+            'message': str(e)
+        }), 400
     except Exception as e:
-        logger.error(f"Error fetching courses: {e}")
+        logger.error("Error searching forums: %s", e)
         return jsonify({
             'success': False,
-            'error': 'Failed to fetch courses',
+            'error': 'Failed to search forums',
             'message': str(e)
         }), 500
 
+@forums_bp.route('/stream', methods=['GET'])
+def stream_course_events():
+    """
+    Stream live activity for a course as Server-Sent Events.
+    
+    Events are 'post_created' (the new post), 'reply_created' (the new reply)
+    and 'upvote_changed' ({"post_id", "upvotes"}), raised by any worker.
+    Clients that reconnect with a Last-Event-ID header receive the recent
+    events they missed.
+    
+    Query Parameters:
+        course (str): Course code (required)
+    
+    Returns:
+        text/event-stream response that stays open until the client leaves
+    """
+    course = request.args.get('course')
+    
+    if not course:
+        return jsonify({
+            'success': False,
+            'error': 'Missing required parameter',
+            'message': 'Course parameter is required'
+        }), 400
+    
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    try:
+        subscription = event_hub.subscribe(
+            course, int(last_event_id) if last_event_id.isdigit() else None
+        )
+    except Exception as e:
+        logger.error("Error opening stream for course %s: %s", course, e)
+        return jsonify({
+            'success': False,
+            'error': 'Failed to open event stream',
+            'message': str(e)
+        }), 500
+    logger.info("Stream opened for course %s", course)
+    
+    def generate():
+        try:
+            yield f"retry: {int(STREAM_HEARTBEAT_SECONDS * 1000)}\n\n"
+            while not subscription.overflowed:
+                event = subscription.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                yield format_sse(event) if event else ": keep-alive\n\n"
+        finally:
+            event_hub.unsubscribe(subscription)
+            logger.info("Stream closed for course %s", course)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @forums_bp.route('/posts', methods=['GET'])
 def get_posts():
     """
     Get posts for a specific course with pagination.
     
+    Pass the returned ``next_cursor`` back as ``cursor`` (with the same
+    ``sort``) to fetch the next page. Cursor pages stay stable while new posts
+    arrive and cost the same at any depth; ``offset`` is still accepted for
+    older clients.
+    
+    The ETag covers the request parameters and the version of every post on
+    the page (ID, update time, upvote and reply counts), so If-None-Match
+    gets a 304 while the page is unchanged.
+    
     Query Parameters:
         course (str): Course code (required)
         limit (int): Maximum number of posts to return (default: 20)
-        offset (int): Number of posts to skip (default: 0)
+        cursor (str): Opaque cursor from a previous response (optional)
+        offset (int): Number of posts to skip when no cursor is given (default: 0)
+        user_id (str): When given, each post includes whether this user upvoted it
+        sort (str): 'new' (default), 'top' (most upvoted) or 'hot' (upvotes and
+            replies, decaying with age)
     
     Returns:
-        JSON response with list of posts
+        JSON response with list of posts, or 304 Not Modified
         
     Example Response:
         {
@@ -66,9 +258,14 @@ def get_posts():
                     "user_id": "user123",
                     "user_name": "student1",
                     "upvotes": 5,
+                    "upvoted": false,
+                    "reply_count": 2,
+                    "last_reply_at": "2024-01-15T12:05:00Z",
+                    "hot_score": 4.27,
                     "created_at": "2024-01-15T10:30:00Z"
                 }
-            ]
+            ],
+            "next_cursor": "eyJjcmVhdGVkX2F0Ijoi..."
         }
     """
     try:
@@ -76,6 +273,9 @@ def get_posts():
         course = request.args.get('course')
         limit = int(request.args.get('limit', 20))
         offset = int(request.args.get('offset', 0))
+        cursor = request.args.get('cursor')
+        user_id = request.args.get('user_id')
+        sort = request.args.get('sort', 'new')
         
         if not course:
             return jsonify({
@@ -91,27 +291,51 @@ def get_posts():
                 'message': 'Limit must be between 1 and 100'
             }), 400
         
-        logger.info(f"Fetching posts for course: {course} (limit: {limit}, offset: {offset})")
+        if offset < 0:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid parameter',
+                'message': 'Offset must not be negative'
+            }), 400
+        
+        logger.info("Fetching posts for course: %s (sort: %s, limit: %s, offset: %s, cursor: %s)", course, sort, limit, offset, cursor)
         
         # Fetch posts using service layer
-        posts = ForumPostService.get_posts_for_course(course, limit, offset)
+        posts, next_cursor = ForumPostService.get_posts_for_course(course, limit, offset, cursor, sort)
         
-        logger.info(f"Successfully fetched {len(posts)} posts for course {course}")
+        if user_id:
+            upvoted_ids = UpvoteService.get_upvoted_post_ids([post['id'] for post in posts], user_id)
+            for post in posts:
+                post['upvoted'] = post['id'] in upvoted_ids
         
-        return jsonify({
+        logger.info("Successfully fetched %d posts for course %s", len(posts), course)
+        
+        etag = make_etag(
+            course, sort, limit, offset, cursor, user_id,
+            [
+                (post['id'], post.get('updated_at'), post.get('upvotes'), post.get('reply_count'),
+                 post.get('last_reply_at'), post.get('hot_score'), post.get('upvoted'))
+                for post in posts
+            ]
+        )
+        # Pages change with every vote: always revalidate, never share per-user pages
+        cache_control = 'private, no-cache' if user_id else 'public, no-cache'
+        
+        return conditional_json(etag, lambda: {
             'success': True,
-            'data': posts
-        })
+            'data': posts,
+            'next_cursor': next_cursor
+        }, cache_control)
         
     except ValueError as e:
-        logger.warning(f"Invalid parameter in get_posts: {e}")
+        logger.warning("Invalid parameter in get_posts: %s", e)
         return jsonify({
             'success': False,
             'error': 'Invalid parameter',
             'message': str(e)
         }), 400
     except Exception as e:
-        logger.error(f"Error fetching posts: {e}")
+        logger.error("Error fetching posts: %s", e)
         return jsonify({
             'success': False,
             'error': 'Failed to fetch posts',
@@ -160,12 +384,12 @@ def create_post():
                 'message': 'Request body is required'
             }), 400
         
-        logger.info(f"Creating new post for course: {data.get('course', 'unknown')}")
+        logger.info("Creating new post for course: %s", data.get('course', 'unknown'))
         
         # Create post using service layer
         created_post = ForumPostService.create_post(data)
         
-        logger.info(f"Successfully created post with ID: {created_post['id']}")
+        logger.info("Successfully created post with ID: %s", created_post['id'])
         
         return jsonify({
             'success': True,
@@ -173,14 +397,14 @@ def create_post():
         }), 201
         
     except ValueError as e:
-        logger.warning(f"Validation error in create_post: {e}")
+        logger.warning("Validation error in create_post: %s", e)
         return jsonify({
             'success': False,
             'error': 'Validation error',
             'message': str(e)
         }), 400
     except Exception as e:
-        logger.error(f"Error creating post: {e}")
+        logger.error("Error creating post: %s", e)
         return jsonify({
             'success': False,
             'error': 'Failed to create post',
@@ -201,13 +425,14 @@ def upvote_post(post_id):
         }
     
     Returns:
-        JSON response with upvote action and status
+        JSON response with upvote action, status and the post's new upvote count
         
     Example Response:
         {
             "success": true,
             "action": "added",
-            "upvoted": true
+            "upvoted": true,
+            "upvotes": 6
         }
     """
     try:
@@ -229,34 +454,104 @@ def upvote_post(post_id):
                 'message': 'User ID is required'
             }), 400
         
-        logger.info(f"Toggling upvote for post {post_id} by user {user_id}")
+        logger.info("Toggling upvote for post %s by user %s", post_id, user_id)
         
         # Toggle upvote using service layer
-        action, is_upvoted = UpvoteService.toggle_upvote(post_id, user_id)
+        action, is_upvoted, upvotes = UpvoteService.toggle_upvote(post_id, user_id)
         
-        logger.info(f"Successfully {action} upvote for post {post_id}")
+        logger.info("Successfully %s upvote for post %s", action, post_id)
         
         return jsonify({
             'success': True,
             'action': action,
-            'upvoted': is_upvoted
+            'upvoted': is_upvoted,
+            'upvotes': upvotes
         })
         
     except ValueError as e:
-        logger.warning(f"Validation error in upvote_post: {e}")
+        logger.warning("Validation error in upvote_post: %s", e)
         return jsonify({
             'success': False,
             'error': 'Validation error',
             'message': str(e)
         }), 400
     except Exception as e:
-        logger.error(f"Error toggling upvote for post {post_id}: {e}")
+        logger.error("Error toggling upvote for post %s: %s", post_id, e)
         return jsonify({
             'success': False,
             'error': 'Failed to toggle upvote',
             'message': str(e)
         }), 500
 
+@forums_bp.route('/posts/upvote-status', methods=['GET'])
+def get_upvote_statuses():
+    """
+    Check which of several posts a user has upvoted, in one request.
+    
+    Query Parameters:
+        user_id (str): The ID of the user (required)
+        post_ids (str): Comma-separated post IDs, at most 100 (required)
+    
+    Returns:
+        JSON response with the IDs of the posts the user has upvoted
+        
+    Example Response:
+        {
+            "success": true,
+            "upvoted": [1, 7]
+        }
+    """
+    try:
+        user_id = request.args.get('user_id')
+        raw_post_ids = request.args.get('post_ids', '')
+        
+        if not user_id:
+            return jsonify({
+                'success': False,
+                'error': 'Missing required parameter',
+                'message': 'User ID is required'
+            }), 400
+        
+        post_ids = [int(post_id) for post_id in raw_post_ids.split(',') if post_id.strip()]
+        
+        if not post_ids:
+            return jsonify({
+                'success': False,
+                'error': 'Missing required parameter',
+                'message': 'post_ids parameter is required'
+            }), 400
+        
+        if len(post_ids) > MAX_UPVOTE_STATUS_POSTS:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid parameter',
+                'message': f'At most {MAX_UPVOTE_STATUS_POSTS} post IDs can be checked at once'
+            }), 400
+        
+        logger.info("Checking upvote status for %d posts by user %s", len(post_ids), user_id)
+        
+        upvoted_ids = UpvoteService.get_upvoted_post_ids(post_ids, user_id)
+        
+        return jsonify({
+            'success': True,
+            'upvoted': sorted(upvoted_ids)
+        })
+        
+    except ValueError as e:
+        logger.warning("Invalid parameter in get_upvote_statuses: %s", e)
+        return jsonify({
+            'success': False,
+            'error': 'Invalid parameter',
+            'message': 'post_ids must be a comma-separated list of integers'
+        }), 400
+    except Exception as e:
+        logger.error("Error checking upvote statuses: %s", e)
+        return jsonify({
+            'success': False,
+            'error': 'Failed to check upvote status',
+            'message': str(e)
+        }), 500
+
 @forums_bp.route('/posts/<int:post_id>/upvote-status', methods=['GET'])
 def get_upvote_status(post_id):
     """
@@ -287,7 +582,7 @@ def get_upvote_status(post_id):
                 'message': 'User ID is required'
             }), 400
         
-        logger.info(f"Checking upvote status for post {post_id} by user {user_id}")
+        logger.info("Checking upvote status for post %s by user %s", post_id, user_id)
         
         # Check upvote status using service layer
         is_upvoted = UpvoteService.get_upvote_status(post_id, user_id)
@@ -298,7 +593,7 @@ def get_upvote_status(post_id):
         })
         
     except Exception as e:
-        logger.error(f"Error checking upvote status for post {post_id}: {e}")
+        logger.error("Error checking upvote status for post %s: %s", post_id, e)
         return jsonify({
             'success': False,
             'error': 'Failed to check upvote status',
@@ -307,18 +602,61 @@ def get_upvote_status(post_id):
 
 @forums_bp.route('/posts/<int:post_id>/replies', methods=['GET'])
 def get_replies(post_id):
+    """
+    Get one page of replies for a post, oldest first.
+    
+    Path Parameters:
+        post_id (int): The ID of the post
+    
+    Query Parameters:
+        limit (int): Maximum number of replies to return (default: 50, max: 100)
+        after (str): Return replies newer than this cursor (optional)
+        before (str): Return replies older than this cursor (optional)
+    
+    Returns:
+        JSON response with the page of replies, the thread's total reply
+        count and cursors for the neighbouring pages
+        
+    Example Response:
+        {
+            "success": true,
+            "data": [...],
+            "total": 240,
+            "next_cursor": "eyJjcmVhdGVkX2F0Ijoi...",
+            "prev_cursor": null
+        }
+    """
     try:
-        logger.info(f"Fetching replies for post {post_id}")
+        limit = int(request.args.get('limit', DEFAULT_REPLY_PAGE_SIZE))
+        after = request.args.get('after')
+        before = request.args.get('before')
         
-        replies = ReplyService.get_replies_for_post(post_id)
+        if limit < 1 or limit > MAX_REPLY_PAGE_SIZE:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid parameter',
+                'message': f'Limit must be between 1 and {MAX_REPLY_PAGE_SIZE}'
+            }), 400
+        
+        logger.info("Fetching replies for post %s", post_id)
+        
+        replies, page = ReplyService.get_replies_for_post(post_id, limit, after, before)
         
         return jsonify({
             'success': True,
-            'data': replies
+            'data': replies,
+            **page
         })
         
+    except ValueError as e:
+        logger.warning("Invalid parameter in get_replies: %s", e)
+        return jsonify({
+            'success': False,
+            'error': 'Invalid parameter',
+            'message': str(e)
+        }), 400
     except Exception as e:
-        logger.error(f"Error fetching replies for post {post_id}: {e}")
+        logger.error("Error fetching replies for post %s: %s", post_id, e)
         return jsonify({
             'success': False,
             'error': 'Failed to fetch replies',
@@ -361,16 +699,89 @@ def create_reply(post_id):
         }), 201
         
     except ValueError as e:
-        logger.warning(f"Invalid parameter in create_reply: {e}")
+        logger.warning("Invalid parameter in create_reply: %s", e)
         return jsonify({
             'success': False,
             'error': 'Invalid parameter',
             'message': str(e)
         }), 400
     except Exception as e:
-        logger.error(f"Error creating reply for post {post_id}: {e}")
+        logger.error("Error creating reply for post %s: %s", post_id, e)
         return jsonify({
             'success': False,
             'error': 'Failed to create reply',
             'message': str(e)
         }), 500
+
+@forums_bp.route('/import', methods=['POST'])
+def import_forum_data():
+    """
+    Bulk import posts and replies.
+    
+    Rows are validated as they are read and inserted in batches; invalid rows
+    are reported and skipped without aborting the import. See
+    ``api.forums.importer`` for the row format.
+    
+    Request Body:
+        Either newline-delimited JSON (Content-Type: application/x-ndjson),
+        one row per line and streamed, or {"rows": [...]}
+    
+    Query Parameters:
+        batch_size (int): Rows per insert statement (default: 500, max: 1000)
+    
+    Returns:
+        JSON response with the import summary
+        
+    Example Response:
+        {
+            "success": true,
+            "data": {
+                "rows": 3,
+                "posts_created": 1,
+                "replies_created": 1,
+                "batches": 2,
+                "error_count": 1,
+                "errors": [{"row": 3, "error": "Missing or empty required field: content"}],
+                "elapsed_ms": 84.2,
+                "rows_per_second": 36
+            }
+        }
+    """
+    try:
+        batch_size = int(request.args.get('batch_size', FORUM_IMPORT_BATCH_SIZE))
+        importer = ForumImporter(batch_size)
+        
+        if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+            rows = read_ndjson(request.stream)
+        else:
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict) or not isinstance(data.get('rows'), list):
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid request',
+                    'message': 'Request body must be NDJSON or {"rows": [...]}'
+                }), 400
+            rows = data['rows']
+        
+        logger.info("Starting forum import (batch size %s)", batch_size)
+        result = importer.run(rows)
+        
+        return jsonify({
+            'success': True,
+            'data': result
+        })
+        
+    except ValueError as e:
+        logger.warning("Invalid parameter in import_forum_data: %s", e)
+        return jsonify({
+            'success': False,
+            'error': 'Invalid parameter',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error("Error importing forum data: %s", e)
+        return jsonify({
+            'success': False,
+            'error': 'Failed to import forum data',
+            'message': str(e)
+        }), 500
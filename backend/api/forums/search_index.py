@@ -0,0 +1,267 @@
+"""
+In-process inverted index for forum search
+
+Used instead of Postgres full-text search when FORUM_SEARCH_BACKEND=memory,
+e.g. for a local stand-in database, offline development and tests. Matching
+mirrors ``websearch_to_tsquery``'s default: every query term must appear in
+the post or reply. Results are ranked with BM25, titles weigh more than
+bodies, and snippets highlight matches with ``<mark>`` like ``ts_headline``.
+"""
+
+import html
+import math
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have how i if in into is it its me my
+of on or so that the their then there these this to was we what when where which
+who why will with you your
+""".split())
+
+# Relative weight of a term occurring in a title vs a body
+TITLE_WEIGHT = 2.0
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Words of context shown around the first match in a snippet
+SNIPPET_WORDS = 25
+
+# (type, id) of an indexed document, e.g. ('post', 12) or ('reply', 40)
+DocKey = Tuple[str, int]
+
+
+def normalize(token: str) -> str:
+    """Reduce a lowercase token to a crude stem so plurals and tenses match"""
+    for suffix in ('ing', 'ed', 'es', 's'):
+        if len(token) > len(suffix) + 2 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized search terms, dropping stopwords"""
+    return [
+        normalize(token)
+        for token in TOKEN_RE.findall((text or '').lower())
+        if token not in STOPWORDS
+    ]
+
+
+def parse_query(query: str) -> Tuple[List[str], Set[str]]:
+    """
+    Split a web-search style query into required and excluded terms.
+
+    Returns:
+        Tuple[List[str], Set[str]]: (required terms in query order, excluded terms)
+    """
+    required: List[str] = []
+    excluded: Set[str] = set()
+    for word in (query or '').replace('"', ' ').split():
+        if word.startswith('-') and len(word) > 1:
+            excluded.update(tokenize(word[1:]))
+        else:
+            required.extend(tokenize(word))
+    return list(dict.fromkeys(required)), excluded
+
+
+class SearchIndex:
+    """Thread-safe inverted index over forum posts and replies"""
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[DocKey, float]] = {}
+        self._docs: Dict[DocKey, Dict] = {}
+        self._doc_terms: Dict[DocKey, Set[str]] = {}
+        self._total_length = 0.0
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add_post(self, post: Dict) -> None:
+        """Index (or re-index) a forum post"""
+        self._add(('post', post['id']), {
+            'type': 'post',
+            'id': post['id'],
+            'post_id': post['id'],
+            'course': post.get('course'),
+            'title': post.get('title', ''),
+            'content': post.get('content', ''),
+            'created_at': post.get('created_at')
+        }, title=post.get('title', ''))
+
+    def add_reply(self, reply: Dict, post: Optional[Dict] = None) -> None:
+        """
+        Index (or re-index) a reply.
+
+        Args:
+            reply (Dict): The reply row
+            post (Optional[Dict]): Its parent post; looked up in the index if omitted
+        """
+        if post is None:
+            post = self._docs.get(('post', reply['post_id']), {})
+        self._add(('reply', reply['id']), {
+            'type': 'reply',
+            'id': reply['id'],
+            'post_id': reply['post_id'],
+            'course': post.get('course'),
+            'title': post.get('title', ''),
+            'content': reply.get('content', ''),
+            'created_at': reply.get('created_at')
+        }, title='')
+
+    def remove(self, doc_type: str, doc_id: int) -> None:
+        """Remove a post or reply from the index if present"""
+        with self._lock:
+            self._remove((doc_type, doc_id))
+
+    def clear(self) -> None:
+        """Drop every indexed document"""
+        with self._lock:
+            self._postings.clear()
+            self._docs.clear()
+            self._doc_terms.clear()
+            self._total_length = 0.0
+            self.loaded = False
+
+    def search(self, query: str, course: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """
+        Find posts and replies containing every term of the query.
+
+        Terms prefixed with ``-`` exclude documents containing them. Quoted
+        phrases are matched as their individual terms.
+
+        Args:
+            query (str): Free-text query
+            course (Optional[str]): Only return results from this course
+            limit (int): Maximum number of results
+
+        Returns:
+            List[Dict]: Results ordered by rank, then newest first, each with
+                type, id, post_id, course, title, snippet, rank and created_at
+        """
+        terms, excluded = parse_query(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if not all(postings):
+                return []
+
+            # Intersect starting from the rarest term
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates &= posting.keys()
+                if not candidates:
+                    return []
+
+            for term in excluded:
+                candidates -= self._postings.get(term, {}).keys()
+
+            if course is not None:
+                candidates = {key for key in candidates if self._docs[key]['course'] == course}
+
+            doc_count = len(self._docs)
+            average_length = self._total_length / doc_count if doc_count else 1.0
+            scored = []
+            for key in candidates:
+                doc = self._docs[key]
+                score = 0.0
+                for posting in postings:
+                    frequency = posting[key]
+                    idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc['length'] / average_length)
+                    score += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                scored.append((score, doc))
+
+            scored.sort(key=lambda item: (item[0], item[1]['created_at'] or ''), reverse=True)
+
+            return [
+                {
+                    'type': doc['type'],
+                    'id': doc['id'],
+                    'post_id': doc['post_id'],
+                    'course': doc['course'],
+                    'title': highlight(doc['title'], set(terms)),
+                    'snippet': snippet(doc['content'], set(terms)),
+                    'rank': round(score, 6),
+                    'created_at': doc['created_at']
+                }
+                for score, doc in scored[:limit]
+            ]
+
+    def _add(self, key: DocKey, doc: Dict, title: str) -> None:
+        """Replace the postings for a document"""
+        frequencies: Dict[str, float] = {}
+        for term in tokenize(title):
+            frequencies[term] = frequencies.get(term, 0.0) + TITLE_WEIGHT
+        for term in tokenize(doc['content']):
+            frequencies[term] = frequencies.get(term, 0.0) + 1.0
+
+        doc['length'] = sum(frequencies.values())
+
+        with self._lock:
+            self._remove(key)
+            self._docs[key] = doc
+            self._doc_terms[key] = set(frequencies)
+            self._total_length += doc['length']
+            for term, frequency in frequencies.items():
+                self._postings.setdefault(term, {})[key] = frequency
+
+    def _remove(self, key: DocKey) -> None:
+        """Drop a document's postings; the caller holds the lock"""
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+
+        self._total_length -= doc['length']
+        for term in self._doc_terms.pop(key, ()):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self._postings[term]
+
+
+def highlight(text: str, terms: Iterable[str]) -> str:
+    """HTML-escape text and wrap every word matching a search term in <mark> tags"""
+    terms = set(terms)
+
+    def mark(match):
+        word = match.group(0)
+        if normalize(word.lower()) in terms:
+            return f"<mark>{word}</mark>"
+        return word
+
+    return re.sub(r"[A-Za-z0-9]+", mark, html.escape(text or ''))
+
+
+def snippet(text: str, terms: Iterable[str], words: int = SNIPPET_WORDS) -> str:
+    """Cut a window of text around the first matching word and highlight it"""
+    terms = set(terms)
+    tokens = (text or '').split()
+
+    first_match = 0
+    for index, token in enumerate(tokens):
+        if any(normalize(word) in terms for word in TOKEN_RE.findall(token.lower())):
+            first_match = index
+            break
+
+    start = max(0, first_match - words // 3)
+    window = ' '.join(tokens[start:start + words])
+    prefix = '… ' if start > 0 else ''
+    suffix = ' …' if start + words < len(tokens) else ''
+    return prefix + highlight(window, terms) + suffix
+
+
+# Global index used when FORUM_SEARCH_BACKEND=memory
+search_index = SearchIndex()
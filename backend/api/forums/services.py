@@ -1,88 +1,71 @@
 
-import json
-import os
 import logging
-from typing import List, Dict, Optional, Tuple
+import os
+import threading
+from typing import List, Dict, Optional, Set, Tuple
 from datetime import datetime, timezone
-from config.database import supabase
+from config.storage import storage
+from api.forums.cache import post_cache
+from api.forums.catalog import course_catalog
+from api.forums.pagination import encode_cursor, decode_cursor
+from api.forums.search_index import search_index
+from api.forums.events import event_hub
+from api.forums.upvote_aggregator import upvote_aggregator
+from storage.base import PostNotFoundError
 
 logger = logging.getLogger(__name__)
 
+# Column each post sort orders by (descending, ties broken by id)
+POST_SORT_COLUMNS = {
+    'new': 'created_at',
+    'top': 'upvotes',
+    'hot': 'hot_score'
+}
+
+# Sort key stored in reply cursors
+REPLY_CURSOR_KEYS = ('created_at', 'id')
+
+# Reply page sizes; the maximum is enforced server-side
+DEFAULT_REPLY_PAGE_SIZE = 50
+MAX_REPLY_PAGE_SIZE = 100
+
+# 'postgres' uses the search_forum database function; 'memory' uses the
+# in-process inverted index in api.forums.search_index
+SEARCH_BACKEND = os.getenv('FORUM_SEARCH_BACKEND', 'postgres').lower()
+
+# Rows per request when loading the in-process search index
+SEARCH_INDEX_LOAD_BATCH = 1000
+
+# Column limits of forum_posts / post_replies VARCHAR fields
+FIELD_MAX_LENGTHS = {
+    'title': 255,
+    'course': 50,
+    'user_id': 255,
+    'user_name': 255
+}
+
 class CourseDataService:
+    """Service for reading the course catalog"""
+    
     @staticmethod
     def load_course_data() -> List[Dict[str, str]]:
-        try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            college_data_dir = os.path.join(
-                current_dir, '../../../webscrape/college_data'
-            )
-            
-            university_files = [
-                'North Carolina State University.json',
-                'University of North Carolina at Chapel Hill.json',
-                'University of North Carolina at Charlotte.json'
-            ]
-            
-            logger.info(f"Loading course data from: {college_data_dir}")
-            
-            courses = set()
+        """
+        Get every course in the catalog.
+        
+        The catalog is parsed once per process and only refreshed when the
+        underlying college data files change (see ``api.forums.catalog``).
+        
+        Returns:
+            List[Dict[str, str]]: Read-only list of course dictionaries
             
-            for filename in university_files:
-                file_path = os.path.join(college_data_dir, filename)
-                university_name = filename.replace('.json', '')
-                
-                logger.info(f"Loading courses from: {university_name}")
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as file:
-                        data = json.load(file)
-                    
-                    majors_data = data.get('majors', [])
-                    
-                    for major in majors_data:
-                        for course in major.get('core_courses', []):
-                            course_code = course.get('course_code', '').strip()
-                            course_name = course.get('course_name', '').strip()
-                            if course_code and course_name:
-                                courses.add((course_code, course_name, university_name))
-                        
-                        for course in major.get('math_science_requirements', []):
-                            course_code = course.get('course_code', '').strip()
-                            course_name = course.get('course_name', '').strip()
-                            if course_code and course_name:
-                                courses.add((course_code, course_name, university_name))
-                        
-                        for course in major.get('elective_courses', []):
-                            course_code = course.get('course_code', '').strip()
-                            course_name = course.get('course_name', '').strip()
-                            if course_code and course_name:
-                                courses.add((course_code, course_name, university_name))
-                
-                except FileNotFoundError:
-                    logger.warning(f"University file not found: {file_path}")
-                    continue
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Invalid JSON in {filename}: {e}")
-                    continue
-            
-            course_list = []
-            seen_courses = set()
-            
-            for code, name, university in courses:
-                unique_key = f"{code}-{university}"
-                if unique_key not in seen_courses:
-                    seen_courses.add(unique_key)
-                    course_list.append({
-                        'course_code': code, 
-                        'course_name': name,
-                        'university': university
-                    })
-            
-            logger.info(f"Loaded {len(course_list)} unique courses from {len(university_files)} universities")
-            return course_list
+        Raises:
+            Exception: If the catalog cannot be loaded
+        """
+        try:
+            return course_catalog.get_courses()
             
         except Exception as e:
-            logger.error(f"Error loading course data: {e}")
+            logger.error("Error loading course data: %s", e)
             raise Exception(f"Failed to load course data: {e}")
 
 class ForumPostService:
@@ -92,41 +75,118 @@ class ForumPostService:
     def get_posts_for_course(
         course_code: str, 
         limit: int = 20, 
-        offset: int = 0
-    ) -> List[Dict]:
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        sort: str = 'new'
+    ) -> Tuple[List[Dict], Optional[str]]:
         """
-        Get posts for a specific course with pagination.
+        Get posts for a specific course in the requested order.
+        
+        ``new`` orders by creation time, ``top`` by upvotes and ``hot`` by
+        ``hot_score``, a generated column combining upvotes, replies and
+        age that the database recomputes whenever a post's counts change.
+        Each order has its own ``(course, key DESC, id DESC)`` index, so a
+        ranked page costs the same as a chronological one.
+        
+        With a cursor, the page is read by keyset (in Postgres, through
+        the ``list_course_posts`` database function), seeking directly to
+        ``(key, id)`` on the course index, so every page costs the same
+        as the first. Without a cursor, ``offset`` is used for backward
+        compatibility.
+        
+        Pages are served from ``post_cache`` when possible; writes through
+        this service keep it current (see ``api.forums.cache``).
         
         Args:
             course_code (str): The course code to get posts for
             limit (int): Maximum number of posts to return
-            offset (int): Number of posts to skip
+            offset (int): Number of posts to skip (ignored when cursor is given)
+            cursor (Optional[str]): Cursor returned with the previous page
+            sort (str): One of 'new', 'top' or 'hot'
             
         Returns:
-            List[Dict]: List of post dictionaries
+            Tuple[List[Dict], Optional[str]]: (posts, next_cursor) where
+                next_cursor is None on the last page. Each post carries
+                ``reply_count`` and ``last_reply_at``, which a trigger on
+                ``post_replies`` keeps up to date, so no reply query is needed.
             
         Raises:
+            ValueError: If the sort is unknown or the cursor is invalid for it
             Exception: If database query fails
         """
+        if sort not in POST_SORT_COLUMNS:
+            raise ValueError(f"Sort must be one of: {', '.join(POST_SORT_COLUMNS)}")
+        
+        sort_column = POST_SORT_COLUMNS[sort]
+        position = decode_cursor(cursor, (sort_column, 'id')) if cursor else None
+        
+        cache_key = (course_code, sort, cursor, 0 if cursor else offset, limit)
+        cached = post_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        generation = post_cache.generation(course_code)
+        
         try:
-            logger.info(f"Fetching posts for course: {course_code}")
+            logger.debug("Fetching posts for course: %s", course_code)
+            
+            # Fetch one extra row to find out whether another page exists
+            posts = storage.posts.list_for_course(course_code, sort_column, limit + 1, offset, position)
             
-            response = supabase.table('forum_posts')\
-                .select('*')\
-                .eq('course', course_code)\
-                .order('created_at', desc=True)\
-                .range(offset, offset + limit - 1)\
-                .execute()
+            next_cursor = None
+            if len(posts) > limit:
+                posts = posts[:limit]
+                last_post = posts[-1]
+                next_cursor = encode_cursor({
+                    sort_column: last_post[sort_column],
+                    'id': last_post['id']
+                })
             
-            posts = response.data if response.data else []
-            logger.info(f"Retrieved {len(posts)} posts for course {course_code}")
+            logger.info("Retrieved %d posts for course %s", len(posts), course_code)
             
-            return posts
+            post_cache.put(cache_key, posts, next_cursor, generation)
+            return posts, next_cursor
             
         except Exception as e:
-            logger.error(f"Error fetching posts for course {course_code}: {e}")
+            logger.error("Error fetching posts for course %s: %s", course_code, e)
             raise Exception(f"Failed to fetch posts: {e}")
     
+    @staticmethod
+    def prepare_post(post_data: Dict) -> Dict:
+        """
+        Validate post data and build the row to insert.
+        
+        Args:
+            post_data (Dict): Post data containing title, content, course, user_id, user_name
+            
+        Returns:
+            Dict: The forum_posts row, with whitespace trimmed and no upvotes
+            
+        Raises:
+            ValueError: If a required field is missing, empty or too long
+        """
+        required_fields = ['title', 'content', 'course', 'user_id', 'user_name']
+        for field in required_fields:
+            if field not in post_data or not post_data[field]:
+                raise ValueError(f"Missing or empty required field: {field}")
+            if not isinstance(post_data[field], str):
+                raise ValueError(f"Field must be a string: {field}")
+        
+        new_post = {
+            'title': post_data['title'].strip(),
+            'content': post_data['content'].strip(),
+            'course': post_data['course'].strip(),
+            'user_id': post_data['user_id'],
+            'user_name': post_data['user_name'].strip(),
+            'upvotes': 0,
+            'created_at': datetime.now(timezone.utc).isoformat()
+        }
+        
+        for field, max_length in FIELD_MAX_LENGTHS.items():
+            if len(new_post[field]) > max_length:
+                raise ValueError(f"Field {field} must be at most {max_length} characters")
+        
+        return new_post
+    
     @staticmethod
     def create_post(post_data: Dict) -> Dict:
         """
@@ -142,40 +202,24 @@ class ForumPostService:
             Exception: If post creation fails
         """
         try:
-            # Validate required fields
-            required_fields = ['title', 'content', 'course', 'user_id', 'user_name']
-            for field in required_fields:
-                if field not in post_data or not post_data[field]:
-                    raise ValueError(f"Missing or empty required field: {field}")
-            
-            # Prepare post data
-            new_post = {
-                'title': post_data['title'].strip(),
-                'content': post_data['content'].strip(),
-                'course': post_data['course'].strip(),
-                'user_id': post_data['user_id'],
-                'user_name': post_data['user_name'].strip(),
-                'upvotes': 0,
-                'created_at': datetime.now(timezone.utc).isoformat()
-            }
+            new_post = ForumPostService.prepare_post(post_data)
             
-            logger.info(f"Creating new post for course: {new_post['course']}")
+            logger.debug("Creating new post for course: %s", new_post['course'])
             
-            response = supabase.table('forum_posts').insert(new_post).execute()
+            created_post = storage.posts.create(new_post)
+            logger.debug("Successfully created post with ID: %s", created_post['id'])
             
-            if not response.data:
-                raise Exception("No data returned from post creation")
-            
-            created_post = response.data[0]
-            logger.info(f"Successfully created post with ID: {created_post['id']}")
+            SearchService.index_post(created_post)
+            post_cache.invalidate_course(created_post['course'])
+            event_hub.publish(created_post['course'], 'post_created', created_post)
             
             return created_post
             
         except ValueError as e:
-            logger.warning(f"Validation error in post creation: {e}")
+            logger.warning("Validation error in post creation: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Error creating post: {e}")
+            logger.error("Error creating post: %s", e)
             raise Exception(f"Failed to create post: {e}")
     
     @staticmethod
@@ -190,15 +234,10 @@ class ForumPostService:
             int: Number of posts for the course
         """
         try:
-            response = supabase.table('forum_posts')\
-                .select('id', count='exact')\
-                .eq('course', course_code)\
-                .execute()
-            
-            return response.count if response.count is not None else 0
+            return storage.posts.count_for_course(course_code)
             
         except Exception as e:
-            logger.error(f"Error getting post count for course {course_code}: {e}")
+            logger.error("Error getting post count for course %s: %s", course_code, e)
             return 0
     
     @staticmethod
@@ -213,24 +252,70 @@ class ForumPostService:
             Optional[str]: ISO timestamp of most recent post, or None if no posts
         """
         try:
-            response = supabase.table('forum_posts')\
-                .select('created_at')\
-                .eq('course', course_code)\
-                .order('created_at', desc=True)\
-                .limit(1)\
-                .execute()
-            
-            if response.data:
-                return response.data[0]['created_at']
+            return storage.posts.latest_for_course(course_code)
+            
+        except Exception as e:
+            logger.error("Error getting recent activity for course %s: %s", course_code, e)
             return None
+
+    @staticmethod
+    def get_course_activity() -> Optional[Dict[str, Dict]]:
+        """
+        Get the post count and most recent post timestamp for every course.
+        
+        The storage backend groups ``forum_posts`` by course (in Postgres,
+        the ``get_course_activity`` function), so the cost is a single round
+        trip regardless of how many courses exist.
+        
+        Returns:
+            Optional[Dict[str, Dict]]: Mapping of course code to
+                {'post_count': int, 'recent_activity': Optional[str]}, with
+                courses without posts omitted; None if the lookup failed
+        """
+        try:
+            return {
+                row['course']: {
+                    'post_count': row['post_count'],
+                    'recent_activity': row['recent_activity']
+                }
+                for row in storage.posts.course_activity()
+            }
             
         except Exception as e:
-            logger.error(f"Error getting recent activity for course {course_code}: {e}")
+            logger.error("Error getting course activity: %s", e)
             return None
 
 class ReplyService:
     """Service for managing post replies"""
     
+    @staticmethod
+    def prepare_reply(reply_data: Dict) -> Dict:
+        """
+        Validate reply data and build the row to insert.
+        
+        Args:
+            reply_data (Dict): Reply data containing post_id, user_id, user_name, content
+            
+        Returns:
+            Dict: The post_replies row
+            
+        Raises:
+            ValueError: If a required field is missing, empty or invalid
+        """
+        required_fields = ['post_id', 'user_id', 'user_name', 'content']
+        for field in required_fields:
+            if field not in reply_data or not reply_data[field]:
+                raise ValueError(f"Missing or empty required field: {field}")
+        
+        if not isinstance(reply_data['post_id'], int) or isinstance(reply_data['post_id'], bool):
+            raise ValueError("Field post_id must be an integer")
+        
+        for field in ('user_id', 'user_name'):
+            if len(str(reply_data[field])) > FIELD_MAX_LENGTHS[field]:
+                raise ValueError(f"Field {field} must be at most {FIELD_MAX_LENGTHS[field]} characters")
+        
+        return {field: reply_data[field] for field in required_fields}
+    
     @staticmethod
     def create_reply(reply_data: Dict) -> Dict:
         """
@@ -243,172 +328,335 @@ class ReplyService:
             Dict: The created reply data
             
         Raises:
+            ValueError: If the reply data is invalid
             Exception: If reply creation fails
         """
         try:
-            required_fields = ['post_id', 'user_id', 'user_name', 'content']
-            for field in required_fields:
-                if field not in reply_data or not reply_data[field]:
-                    raise ValueError(f"Missing or empty required field: {field}")
+            reply_data = ReplyService.prepare_reply(reply_data)
             
-            logger.info(f"Creating reply for post {reply_data['post_id']} by user {reply_data['user_id']}")
+            logger.info("Creating reply for post %s by user %s", reply_data['post_id'], reply_data['user_id'])
             
-            response = supabase.table('post_replies').insert(reply_data).execute()
+            reply = storage.replies.create(reply_data)
+            logger.info("Successfully created reply with ID: %s", reply['id'])
             
-            if response.data:
-                reply = response.data[0]
-                logger.info(f"Successfully created reply with ID: {reply['id']}")
-                return reply
-            else:
-                raise Exception("No data returned from reply creation")
-                
+            SearchService.index_reply(reply)
+            ReplyService._patch_cached_post(reply)
+            ReplyService._publish_reply(reply)
+            return reply
+            
+        except ValueError as e:
+            logger.warning("Validation error in reply creation: %s", e)
+            raise
         except Exception as e:
-            logger.error(f"Error creating reply: {e}")
+            logger.error("Error creating reply: %s", e)
             raise Exception(f"Failed to create reply: {e}")
     
     @staticmethod
-    def get_replies_for_post(post_id: int) -> List[Dict]:
+    def _patch_cached_post(reply: Dict) -> None:
+        """Apply a new reply's count and timestamp to cached pages of its post"""
+        def add_reply(post: Dict) -> None:
+            post['reply_count'] = (post.get('reply_count') or 0) + 1
+            post['last_reply_at'] = reply.get('created_at') or post.get('last_reply_at')
+        
+        post_cache.patch_post(reply['post_id'], add_reply)
+    
+    @staticmethod
+    def _publish_reply(reply: Dict) -> None:
+        """Publish a new reply to stream subscribers of its post's course"""
+        # Replies don't carry their course. Subscribers may be on any worker,
+        # so it is looked up even when nobody here is listening.
+        try:
+            course = storage.posts.get_course(reply['post_id'])
+            if course:
+                event_hub.publish(course, 'reply_created', reply)
+                
+        except Exception as e:
+            logger.warning("Could not publish reply %s to stream: %s", reply['id'], e)
+    
+    @staticmethod
+    def get_replies_for_post(
+        post_id: int,
+        limit: int = DEFAULT_REPLY_PAGE_SIZE,
+        after: Optional[str] = None,
+        before: Optional[str] = None
+    ) -> Tuple[List[Dict], Dict]:
         """
-        Get all replies for a specific post.
+        Get one page of replies for a post, oldest first.
+        
+        Pages are read by keyset on ``(created_at, id)``: ``after`` continues
+        towards newer replies and ``before`` goes back towards older ones, so a
+        page costs the same however long the thread is. The total comes from
+        the denormalized ``forum_posts.reply_count`` instead of a count scan,
+        and the Supabase backend fetches the page and the total concurrently.
         
         Args:
             post_id (int): The post ID to get replies for
+            limit (int): Maximum number of replies to return, capped at MAX_REPLY_PAGE_SIZE
+            after (Optional[str]): Cursor of the last reply already seen
+            before (Optional[str]): Cursor of the first reply already seen
             
         Returns:
-            List[Dict]: List of reply dictionaries
+            Tuple[List[Dict], Dict]: (replies, page) where page holds
+                ``total``, ``next_cursor`` and ``prev_cursor``; a cursor is
+                None when there is nothing further in that direction
             
         Raises:
+            ValueError: If both cursors are given or a cursor is invalid
             Exception: If database query fails
         """
+        limit, position, backward = ReplyService._reply_page_params(limit, after, before)
+        
         try:
-            logger.info(f"Fetching replies for post: {post_id}")
-            
-            response = supabase.table('post_replies')\
-                .select('*')\
-                .eq('post_id', post_id)\
-                .order('created_at', desc=False)\
-                .execute()
+            logger.debug("Fetching replies for post: %s", post_id)
             
-            replies = response.data if response.data else []
-            logger.info(f"Retrieved {len(replies)} replies for post {post_id}")
+            # Fetch one extra row to find out whether another page exists
+            replies, total = storage.replies.list_page(post_id, limit + 1, position, backward)
             
-            return replies
+            return ReplyService._build_reply_page(post_id, replies, total, limit, after, backward)
             
         except Exception as e:
-            logger.error(f"Error fetching replies for post {post_id}: {e}")
+            logger.error("Error fetching replies for post %s: %s", post_id, e)
             raise Exception(f"Failed to fetch replies: {e}")
+    
+    @staticmethod
+    def _reply_page_params(
+        limit: int,
+        after: Optional[str],
+        before: Optional[str]
+    ) -> Tuple[int, Optional[Dict], bool]:
+        """
+        Validate reply paging arguments.
+        
+        Returns:
+            Tuple[int, Optional[Dict], bool]: (capped limit, decoded cursor
+                position, whether paging backward)
+        
+        Raises:
+            ValueError: If both cursors are given or a cursor is invalid
+        """
+        if after and before:
+            raise ValueError("Only one of after and before may be given")
+        
+        limit = max(1, min(limit, MAX_REPLY_PAGE_SIZE))
+        cursor = after or before
+        position = decode_cursor(cursor, REPLY_CURSOR_KEYS) if cursor else None
+        return limit, position, bool(before)
+    
+    @staticmethod
+    def _build_reply_page(
+        post_id: int,
+        rows: List[Dict],
+        total: int,
+        limit: int,
+        after: Optional[str],
+        backward: bool
+    ) -> Tuple[List[Dict], Dict]:
+        """Turn the page and total query results into (replies, page)"""
+        replies = list(rows)
+        has_more = len(replies) > limit
+        replies = replies[:limit]
+        
+        if backward:
+            # Backward pages are read newest first
+            replies.reverse()
+        
+        # Whether replies exist past each end of this page
+        if backward:
+            more_before, more_after = has_more, True
+        else:
+            more_before, more_after = bool(after), has_more
+        
+        page = {
+            'total': total,
+            'next_cursor': ReplyService._reply_cursor(replies[-1]) if replies and more_after else None,
+            'prev_cursor': ReplyService._reply_cursor(replies[0]) if replies and more_before else None
+        }
+        
+        logger.info("Retrieved %d of %s replies for post %s", len(replies), total, post_id)
+        
+        return replies, page
+    
+    @staticmethod
+    def _reply_cursor(reply: Dict) -> str:
+        """Build the cursor pointing at a reply"""
+        return encode_cursor({'created_at': reply['created_at'], 'id': reply['id']})
 
 class UpvoteService:
     """Service for managing post upvote operations"""
     
     @staticmethod
-    def toggle_upvote(post_id: int, user_id: str) -> Tuple[str, bool]:
+    def toggle_upvote(post_id: int, user_id: str) -> Tuple[str, bool, int]:
         """
         Toggle upvote status for a post (add if not exists, remove if exists).
         
+        The storage backend flips the ``post_upvotes`` row and adjusts
+        ``forum_posts.upvotes`` in a single transaction (in Postgres, the
+        ``toggle_post_upvote`` function), so concurrent toggles never lose
+        counts and the whole operation is one round trip. With UPVOTE_DURABILITY=batched the count
+        change is handed to the write-behind ``upvote_aggregator`` instead.
+        
         Args:
             post_id (int): The ID of the post
             user_id (str): The ID of the user
             
         Returns:
-            Tuple[str, bool]: (action, is_upvoted) where action is 'added' or 'removed'
+            Tuple[str, bool, int]: (action, is_upvoted, upvotes) where action is
+                'added' or 'removed' and upvotes is the post's new count
             
         Raises:
+            ValueError: If the post does not exist
             Exception: If upvote operation fails
         """
         try:
-            logger.info(f"Toggling upvote for post {post_id} by user {user_id}")
-            
-            # Check if user has already upvoted this post
-            existing_upvote = supabase.table('post_upvotes')\
-                .select('*')\
-                .eq('post_id', post_id)\
-                .eq('user_id', user_id)\
-                .execute()
-            
-            if existing_upvote.data:
-                # Remove upvote
-                supabase.table('post_upvotes')\
-                    .delete()\
-                    .eq('post_id', post_id)\
-                    .eq('user_id', user_id)\
-                    .execute()
-                
-                # Decrease post upvote count
-                UpvoteService._update_post_upvote_count(post_id, -1)
-                
-                logger.info(f"Removed upvote for post {post_id}")
-                return 'removed', False
-            else:
-                # Add upvote
-                upvote_data = {
-                    'post_id': post_id,
-                    'user_id': user_id,
-                    'created_at': datetime.now(timezone.utc).isoformat()
-                }
-                supabase.table('post_upvotes').insert(upvote_data).execute()
-                
-                # Increase post upvote count
-                UpvoteService._update_post_upvote_count(post_id, 1)
-                
-                logger.info(f"Added upvote for post {post_id}")
-                return 'added', True
+            logger.debug("Toggling upvote for post %s by user %s", post_id, user_id)
+            
+            result = storage.upvotes.toggle(post_id, user_id, adjust_count=not upvote_aggregator.batched)
+            action = 'added' if result['upvoted'] else 'removed'
+            upvotes = result['upvotes']
+            
+            if upvote_aggregator.batched:
+                upvote_aggregator.add(post_id, 1 if result['upvoted'] else -1)
+                upvotes = max(0, upvotes + upvote_aggregator.pending_delta(post_id))
+            
+            post_cache.patch_post(post_id, lambda post: post.update(upvotes=upvotes), result['course'])
+            event_hub.publish(result['course'], 'upvote_changed', {
+                'post_id': post_id,
+                'upvotes': upvotes
+            })
+            
+            logger.info("%s upvote for post %s (%s upvotes)", action.capitalize(), post_id, upvotes)
+            return action, result['upvoted'], upvotes
                 
+        except PostNotFoundError:
+            raise ValueError(f"Post {post_id} not found")
         except Exception as e:
-            logger.error(f"Error toggling upvote for post {post_id}: {e}")
+            logger.error("Error toggling upvote for post %s: %s", post_id, e)
             raise Exception(f"Failed to toggle upvote: {e}")
     
     @staticmethod
-    def _update_post_upvote_count(post_id: int, change: int) -> None:
+    def get_upvote_status(post_id: int, user_id: str) -> bool:
         """
-        Update the upvote count for a post.
+        Check if a user has upvoted a specific post.
         
         Args:
             post_id (int): The ID of the post
-            change (int): The change in upvote count (positive or negative)
+            user_id (str): The ID of the user
+            
+        Returns:
+            bool: True if user has upvoted the post, False otherwise
         """
         try:
-            # Get current upvote count
-            post_response = supabase.table('forum_posts')\
-                .select('upvotes')\
-                .eq('id', post_id)\
-                .execute()
-            
-            if post_response.data:
-                current_upvotes = post_response.data[0]['upvotes']
-                new_upvotes = max(0, current_upvotes + change)  # Ensure non-negative
-                
-                supabase.table('forum_posts')\
-                    .update({'upvotes': new_upvotes})\
-                    .eq('id', post_id)\
-                    .execute()
-                
-                logger.info(f"Updated upvote count for post {post_id}: {current_upvotes} -> {new_upvotes}")
-                
+            return storage.upvotes.has_upvoted(post_id, user_id)
+            
         except Exception as e:
-            logger.error(f"Error updating upvote count for post {post_id}: {e}")
+            logger.error("Error checking upvote status for post %s: %s", post_id, e)
+            return False
     
     @staticmethod
-    def get_upvote_status(post_id: int, user_id: str) -> bool:
+    def get_upvoted_post_ids(post_ids: List[int], user_id: str) -> Set[int]:
         """
-        Check if a user has upvoted a specific post.
+        Find which of the given posts a user has upvoted, in a single query.
         
         Args:
-            post_id (int): The ID of the post
+            post_ids (List[int]): IDs of the posts to check
             user_id (str): The ID of the user
             
         Returns:
-            bool: True if user has upvoted the post, False otherwise
+            Set[int]: The subset of post_ids the user has upvoted
+            
+        Raises:
+            Exception: If database query fails
         """
+        if not post_ids:
+            return set()
+        
         try:
-            response = supabase.table('post_upvotes')\
-                .select('*')\
-                .eq('post_id', post_id)\
-                .eq('user_id', user_id)\
-                .execute()
+            return storage.upvotes.upvoted_post_ids(list(post_ids), user_id)
             
-            return len(response.data) > 0 if response.data else False
+        except Exception as e:
+            logger.error("Error checking upvote status for %d posts: %s", len(post_ids), e)
+            raise Exception(f"Failed to check upvote status: {e}")
+
+class SearchService:
+    """Service for full-text search across forum posts and replies"""
+    
+    _index_load_lock = threading.Lock()
+    
+    @staticmethod
+    def search(query: str, course: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """
+        Search posts and replies, best matches first.
+        
+        With the default ``postgres`` backend this is a single query on the
+        storage backend: the ``search_forum`` database function, which matches
+        against a GIN-indexed tsvector expression and highlights snippets with
+        ``ts_headline``, or the FTS5 tables of the SQLite backend.
+        
+        Args:
+            query (str): Free-text query (web search syntax)
+            course (Optional[str]): Only return results from this course
+            limit (int): Maximum number of results
+            
+        Returns:
+            List[Dict]: Results with type ('post' or 'reply'), id, post_id,
+                course, title, snippet, rank and created_at
+            
+        Raises:
+            Exception: If the search fails
+        """
+        try:
+            logger.debug("Searching forums for '%s' (course: %s)", query, course)
+            
+            if SEARCH_BACKEND == 'memory':
+                SearchService._ensure_index_loaded()
+                results = search_index.search(query, course, limit)
+            else:
+                results = storage.search(query, course, limit)
+            
+            logger.info("Found %d search results for '%s'", len(results), query)
+            return results
             
         except Exception as e:
-            logger.error(f"Error checking upvote status for post {post_id}: {e}")
-            return False
+            logger.error("Error searching forums for '%s': %s", query, e)
+            raise Exception(f"Failed to search forums: {e}")
+    
+    @staticmethod
+    def index_post(post: Dict) -> None:
+        """Add a newly created post to the in-process index, if it is in use"""
+        if SEARCH_BACKEND == 'memory' and search_index.loaded:
+            search_index.add_post(post)
+    
+    @staticmethod
+    def index_reply(reply: Dict) -> None:
+        """Add a newly created reply to the in-process index, if it is in use"""
+        if SEARCH_BACKEND == 'memory' and search_index.loaded:
+            search_index.add_reply(reply)
+    
+    @staticmethod
+    def _ensure_index_loaded() -> None:
+        """Build the in-process index from the database on first use"""
+        if search_index.loaded:
+            return
+        
+        with SearchService._index_load_lock:
+            if search_index.loaded:
+                return
+            
+            logger.info("Building in-process search index")
+            for post in SearchService._fetch_all(storage.posts):
+                search_index.add_post(post)
+            for reply in SearchService._fetch_all(storage.replies):
+                search_index.add_reply(reply)
+            
+            search_index.loaded = True
+            logger.info("Search index built with %d documents", len(search_index))
+    
+    @staticmethod
+    def _fetch_all(repository) -> List[Dict]:
+        """Read every row of a repository's table in id order, one batch per request"""
+        rows = []
+        while True:
+            batch = repository.list_after(rows[-1]['id'] if rows else 0, SEARCH_INDEX_LOAD_BATCH)
+            rows.extend(batch)
+            if len(batch) < SEARCH_INDEX_LOAD_BATCH:
+                return rows
@@ -0,0 +1,194 @@
+"""
+Write-behind aggregation of post upvote counts
+
+In ``batched`` durability mode an upvote toggle only flips the
+``post_upvotes`` row; the +1/-1 on ``forum_posts.upvotes`` (and on the
+author's ``user_stats.upvotes_received`` in Postgres) is collected here
+and applied for many posts at once by ``storage.posts.apply_upvote_deltas``
+(one statement in either backend), every UPVOTE_FLUSH_INTERVAL_MS or UPVOTE_FLUSH_MAX_EVENTS toggles,
+whichever comes first, and once more on shutdown. A burst of votes on a hot
+post becomes one UPDATE per flush instead of one per vote.
+
+In the default ``sync`` mode the aggregator is unused and the toggle adjusts
+the count in the same transaction. ``batched`` trades that for a window of
+at most one flush interval in which a crashed worker loses pending deltas
+(the upvote rows themselves are always written synchronously).
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from config.storage import storage
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_SYNC = 'sync'
+DURABILITY_BATCHED = 'batched'
+
+UPVOTE_DURABILITY = os.getenv('UPVOTE_DURABILITY', DURABILITY_SYNC).lower()
+UPVOTE_FLUSH_INTERVAL_MS = int(os.getenv('UPVOTE_FLUSH_INTERVAL_MS', '500'))
+UPVOTE_FLUSH_MAX_EVENTS = int(os.getenv('UPVOTE_FLUSH_MAX_EVENTS', '200'))
+
+
+class UpvoteAggregator:
+    """Collects per-post upvote deltas and flushes them in batches"""
+
+    def __init__(
+        self,
+        durability: str = UPVOTE_DURABILITY,
+        flush_interval_ms: int = UPVOTE_FLUSH_INTERVAL_MS,
+        flush_max_events: int = UPVOTE_FLUSH_MAX_EVENTS
+    ):
+        """
+        Initialize an aggregator. The flush thread starts on first use.
+
+        Args:
+            durability (str): 'sync' (aggregator unused) or 'batched'
+            flush_interval_ms (int): Maximum time a delta waits before flushing
+            flush_max_events (int): Pending toggles that trigger an early flush
+
+        Raises:
+            ValueError: If the durability mode is unknown
+        """
+        if durability not in (DURABILITY_SYNC, DURABILITY_BATCHED):
+            raise ValueError(f"Unknown UPVOTE_DURABILITY mode: {durability}")
+
+        self.durability = durability
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_events = flush_max_events
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending: Dict[int, int] = {}
+        self._in_flight: Dict[int, int] = {}
+        self._pending_events = 0
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+        self._flushes = 0
+        self._flushed_events = 0
+        self._failed_flushes = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._last_error: Optional[str] = None
+
+    @property
+    def batched(self) -> bool:
+        """Whether upvote counts are written behind"""
+        return self.durability == DURABILITY_BATCHED
+
+    def add(self, post_id: int, delta: int) -> None:
+        """
+        Record an upvote count change to be applied on the next flush.
+
+        Args:
+            post_id (int): The ID of the post
+            delta (int): +1 for an added upvote, -1 for a removed one
+        """
+        self._ensure_started()
+        with self._lock:
+            self._pending[post_id] = self._pending.get(post_id, 0) + delta
+            self._pending_events += 1
+            full = self._pending_events >= self.flush_max_events
+
+        if full:
+            self._wake.set()
+
+    def pending_delta(self, post_id: int) -> int:
+        """Change to a post's stored upvote count that has not been flushed yet"""
+        with self._lock:
+            return self._pending.get(post_id, 0) + self._in_flight.get(post_id, 0)
+
+    def flush(self) -> int:
+        """
+        Apply every pending delta in one database call.
+
+        On failure the deltas are put back and retried on the next flush.
+
+        Returns:
+            int: Number of posts whose counts were updated
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending = {post_id: delta for post_id, delta in self._pending.items() if delta}
+                events = self._pending_events
+                self._pending = {}
+                self._pending_events = 0
+                self._in_flight = pending
+
+            if not pending:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                storage.posts.apply_upvote_deltas(pending)
+            except Exception as e:
+                with self._lock:
+                    self._in_flight = {}
+                    for post_id, delta in pending.items():
+                        self._pending[post_id] = self._pending.get(post_id, 0) + delta
+                    self._pending_events += events
+                    self._failed_flushes += 1
+                    self._last_error = str(e)
+                logger.error("Error flushing upvote counts for %d posts: %s", len(pending), e)
+                return 0
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._in_flight = {}
+                self._flushes += 1
+                self._flushed_events += events
+                self._last_flush_ms = elapsed_ms
+                self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+                self._total_flush_ms += elapsed_ms
+
+            logger.debug("Flushed upvote counts for %d posts (%s toggles) in %.1f ms", len(pending), events, elapsed_ms)
+            return len(pending)
+
+    def metrics(self) -> Dict:
+        """Queue depth and flush statistics"""
+        with self._lock:
+            return {
+                'durability': self.durability,
+                'pending_posts': len(self._pending),
+                'pending_events': self._pending_events,
+                'flushes': self._flushes,
+                'flushed_events': self._flushed_events,
+                'failed_flushes': self._failed_flushes,
+                'last_flush_ms': round(self._last_flush_ms, 3),
+                'max_flush_ms': round(self._max_flush_ms, 3),
+                'avg_flush_ms': round(self._total_flush_ms / self._flushes, 3) if self._flushes else 0.0,
+                'last_error': self._last_error
+            }
+
+    def _ensure_started(self) -> None:
+        """Start the flush thread in this process (again after a fork)"""
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='upvote-aggregator', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Flush loop: wake on the interval or when enough toggles queue up"""
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+# Global aggregator for this process
+upvote_aggregator = UpvoteAggregator()
+
+# Apply pending deltas when the worker shuts down
+atexit.register(upvote_aggregator.flush)
@@ -0,0 +1,224 @@
+"""
+Background probing of the database
+
+A prober thread runs ``storage.ping()`` (the cheapest query against
+``forum_posts``) every DEPENDENCY_PROBE_INTERVAL seconds and keeps the last
+DEPENDENCY_PROBE_WINDOW results. Health routes read the rolling latency
+percentiles, bucket counts and error rate from memory, so no probe request
+ever waits on the database.
+
+Readiness fails while the window's error rate is above
+READY_MAX_ERROR_RATE or its p95 latency is above READY_MAX_P95_MS, and until
+the first probe has finished.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from config.metrics import DB_BUCKETS, registry
+from config.storage import storage
+
+logger = logging.getLogger(__name__)
+
+DEPENDENCY_PROBE_INTERVAL = float(os.getenv('DEPENDENCY_PROBE_INTERVAL', '10'))
+DEPENDENCY_PROBE_WINDOW = int(os.getenv('DEPENDENCY_PROBE_WINDOW', '30'))
+READY_MAX_ERROR_RATE = float(os.getenv('READY_MAX_ERROR_RATE', '0.5'))
+READY_MAX_P95_MS = float(os.getenv('READY_MAX_P95_MS', '2000'))
+
+PROBE_SECONDS = registry.histogram(
+    'dependency_probe_duration_seconds',
+    'Time taken by background dependency probes',
+    ('dependency',),
+    DB_BUCKETS
+)
+PROBE_FAILURES = registry.counter(
+    'dependency_probe_failures_total',
+    'Background dependency probes that failed',
+    ('dependency',)
+)
+DEPENDENCY_UP = registry.gauge(
+    'dependency_up',
+    'Whether the last probe of a dependency succeeded (1) or failed (0)',
+    ('dependency',)
+)
+
+# (seconds, succeeded)
+ProbeResult = Tuple[float, bool]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class DependencyProber:
+    """Periodically probes one dependency and summarizes recent results"""
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], None],
+        interval: float = DEPENDENCY_PROBE_INTERVAL,
+        window: int = DEPENDENCY_PROBE_WINDOW,
+        max_error_rate: float = READY_MAX_ERROR_RATE,
+        max_p95_ms: float = READY_MAX_P95_MS
+    ):
+        """
+        Initialize a prober. The probe thread starts on first use.
+
+        Args:
+            name (str): Dependency name used in responses and metric labels
+            probe (Callable[[], None]): Check that raises when the dependency is unhealthy
+            interval (float): Seconds between probes
+            window (int): Number of recent probes summarized
+            max_error_rate (float): Highest failed fraction of the window that is still ready
+            max_p95_ms (float): Highest p95 probe latency that is still ready
+        """
+        self.name = name
+        self.probe = probe
+        self.interval = interval
+        self.max_error_rate = max_error_rate
+        self.max_p95_ms = max_p95_ms
+
+        self._lock = threading.Lock()
+        self._results: Deque[ProbeResult] = deque(maxlen=window)
+        self._last_probe_at: Optional[str] = None
+        self._last_error: Optional[str] = None
+        self._probes = 0
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def run_probe(self) -> bool:
+        """
+        Probe the dependency once and record the result.
+
+        Returns:
+            bool: Whether the probe succeeded
+        """
+        start = time.perf_counter()
+        error = None
+        try:
+            self.probe()
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        seconds = time.perf_counter() - start
+
+        PROBE_SECONDS.observe(seconds, self.name)
+        DEPENDENCY_UP.set(self.name, value=0 if error else 1)
+        if error:
+            PROBE_FAILURES.inc(self.name)
+
+        with self._lock:
+            was_ok = self._results[-1][1] if self._results else True
+            self._results.append((seconds, error is None))
+            self._last_probe_at = datetime.now().isoformat()
+            self._probes += 1
+            if error:
+                self._last_error = error
+
+        # Log state changes only, so an outage doesn't log every interval
+        if error and was_ok:
+            logger.warning("Probe of %s failed after %.1f ms: %s", self.name, seconds * 1000, error)
+        elif not error and not was_ok:
+            logger.info("Probe of %s succeeded again", self.name)
+        return error is None
+
+    def status(self) -> Dict:
+        """
+        Summarize the recent probes without running one.
+
+        Returns:
+            Dict: ready, reason (why not ready, or None), probes in the
+                window, error_rate, latency_ms percentiles, a latency
+                histogram, last_probe_at and last_error
+        """
+        self._ensure_started()
+        with self._lock:
+            results = list(self._results)
+            last_probe_at = self._last_probe_at
+            last_error = self._last_error
+            probes = self._probes
+
+        summary = {
+            'ready': False,
+            'reason': None,
+            'window': len(results),
+            'probes': probes,
+            'error_rate': None,
+            'latency_ms': None,
+            'histogram_ms': None,
+            'last_probe_at': last_probe_at,
+            'last_error': last_error,
+            'thresholds': {'max_error_rate': self.max_error_rate, 'max_p95_ms': self.max_p95_ms}
+        }
+        if not results:
+            summary['reason'] = 'No probe has completed yet'
+            return summary
+
+        failures = sum(1 for _, ok in results if not ok)
+        latencies = sorted(seconds * 1000 for seconds, _ in results)
+        error_rate = failures / len(results)
+        p95 = percentile(latencies, 0.95)
+
+        summary['error_rate'] = round(error_rate, 3)
+        summary['latency_ms'] = {
+            'last': round(results[-1][0] * 1000, 3),
+            'p50': round(percentile(latencies, 0.5), 3),
+            'p95': round(p95, 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'max': round(latencies[-1], 3)
+        }
+        summary['histogram_ms'] = self._histogram(latencies)
+
+        if error_rate > self.max_error_rate:
+            summary['reason'] = f"Error rate {error_rate:.0%} is above {self.max_error_rate:.0%}"
+        elif p95 > self.max_p95_ms:
+            summary['reason'] = f"p95 latency {p95:.0f} ms is above {self.max_p95_ms:.0f} ms"
+        else:
+            summary['ready'] = True
+        return summary
+
+    @staticmethod
+    def _histogram(latencies_ms: List[float]) -> List[Dict]:
+        """Window latencies per bucket: {'le': upper bound in ms or '+Inf', 'count': n}"""
+        buckets = []
+        remaining = iter(latencies_ms)
+        value = next(remaining, None)
+        for bound in DB_BUCKETS + (math.inf,):
+            bound_ms = bound * 1000
+            count = 0
+            while value is not None and value <= bound_ms:
+                count += 1
+                value = next(remaining, None)
+            buckets.append({'le': '+Inf' if bound == math.inf else bound_ms, 'count': count})
+        return buckets
+
+    def _ensure_started(self) -> None:
+        """Start the probe thread in this process (again after a fork)"""
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._results.clear()
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-prober", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Probe loop; the first probe runs immediately"""
+        while True:
+            self.run_probe()
+            time.sleep(self.interval)
+
+
+# Global database prober for this process
+database_prober = DependencyProber('database', lambda: storage.ping())
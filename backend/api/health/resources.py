@@ -0,0 +1,152 @@
+"""
+Background sampling of host resource usage
+
+``psutil.cpu_percent(interval=1)`` blocks the caller for the whole interval,
+so the health endpoint used to hold a worker for a second per probe. A
+sampler thread now refreshes CPU, memory and disk usage every
+HEALTH_SAMPLE_INTERVAL seconds and health checks read the latest snapshot.
+CPU usage is measured between consecutive samples, so it is the average
+over the last interval rather than over a one-second window.
+"""
+
+import logging
+import os
+import platform
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+HEALTH_SAMPLE_INTERVAL = float(os.getenv('HEALTH_SAMPLE_INTERVAL', '5'))
+
+# A snapshot older than this means the sampler thread has stalled
+HEALTH_SAMPLE_MAX_AGE = float(os.getenv('HEALTH_SAMPLE_MAX_AGE', str(HEALTH_SAMPLE_INTERVAL * 3)))
+
+DISK_PATH = '/'
+
+
+class ResourceSampler:
+    """Keeps a recent snapshot of CPU, memory and disk usage"""
+
+    def __init__(self, interval: float = HEALTH_SAMPLE_INTERVAL, max_age: float = HEALTH_SAMPLE_MAX_AGE):
+        """
+        Initialize a sampler. The sampling thread starts on first use.
+
+        Args:
+            interval (float): Seconds between samples
+            max_age (float): Age in seconds beyond which a snapshot is stale
+        """
+        self.interval = interval
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._snapshot: Optional[Dict] = None
+        self._sampled_at = 0.0
+        self._system: Optional[Dict] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._samples = 0
+        self._last_error: Optional[str] = None
+
+    def snapshot(self) -> Dict:
+        """
+        Get the latest resource usage without blocking on a measurement.
+
+        The first call in a process takes one sample inline (without CPU
+        usage, which needs two samples to measure).
+
+        Returns:
+            Dict: cpu_percent (None until measured), memory_percent,
+                disk_percent, boot_time, sampled_at and age_seconds
+        """
+        self._ensure_started()
+        with self._lock:
+            snapshot = dict(self._snapshot or {})
+            sampled_at = self._sampled_at
+        snapshot['age_seconds'] = round(time.monotonic() - sampled_at, 3)
+        return snapshot
+
+    def system_info(self) -> Dict:
+        """Platform details, which never change while the process runs"""
+        if self._system is None:
+            # platform.processor() runs ``uname -p`` on Linux; do it once
+            self._system = {
+                'platform': platform.system(),
+                'platform_version': platform.version(),
+                'architecture': platform.architecture()[0],
+                'processor': platform.processor(),
+                'hostname': platform.node()
+            }
+        return self._system
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the sampler has produced a snapshot within ``max_age``"""
+        with self._lock:
+            return self._snapshot is not None and time.monotonic() - self._sampled_at <= self.max_age
+
+    def metrics(self) -> Dict:
+        """Sampler state for the internals endpoint"""
+        with self._lock:
+            return {
+                'interval_seconds': self.interval,
+                'samples': self._samples,
+                'age_seconds': round(time.monotonic() - self._sampled_at, 3) if self._snapshot else None,
+                'last_error': self._last_error
+            }
+
+    def sample(self) -> None:
+        """Take one measurement and replace the snapshot"""
+        try:
+            boot_time = psutil.boot_time()
+            snapshot = {
+                # Usage since the previous call; the first call has no baseline
+                'cpu_percent': psutil.cpu_percent(interval=None) if self._samples else None,
+                'memory_percent': psutil.virtual_memory().percent,
+                'disk_percent': psutil.disk_usage(DISK_PATH).percent,
+                'boot_time': datetime.fromtimestamp(boot_time).isoformat(),
+                'boot_timestamp': boot_time,
+                'sampled_at': datetime.now().isoformat()
+            }
+            if not self._samples:
+                psutil.cpu_percent(interval=None)
+        except Exception as e:
+            with self._lock:
+                self._last_error = str(e)
+            logger.warning("Error sampling resource usage: %s", e)
+            return
+
+        with self._lock:
+            self._snapshot = snapshot
+            self._sampled_at = time.monotonic()
+            self._samples += 1
+
+    def _ensure_started(self) -> None:
+        """Take a first sample and start the sampling thread in this process"""
+        if self._pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # The CPU baseline was the parent's
+            self._samples = 0
+            self.sample()
+            self._thread = threading.Thread(target=self._run, name='resource-sampler', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        """Sampling loop"""
+        while True:
+            time.sleep(self.interval)
+            self.sample()
+
+
+# Global sampler for this process
+resource_sampler = ResourceSampler()
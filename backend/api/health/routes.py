@@ -1,10 +1,24 @@
 """
 Health check API routes
+
+- ``/`` reports system details and the latest resource usage sample
+- ``/live`` answers as long as the process can serve a request
+- ``/ready`` answers 503 while this worker should not receive traffic
+- ``/dependencies`` reports recent database probe latency and errors
+
+None of them block on a measurement or a database call, so load balancer
+probes cost microseconds; the database is probed in the background.
 """
-import platform
-import psutil
 from datetime import datetime
 from flask import Blueprint, jsonify
+from config.async_database import async_db
+from config.database import db_config
+from config.storage import configuration_error, storage
+from api.forums.cache import post_cache
+from api.forums.upvote_aggregator import upvote_aggregator
+from api.health.dependencies import database_prober
+from api.health.resources import resource_sampler
+from api.responses import response_cache
 
 # Create blueprint for health routes
 health_bp = Blueprint('health', __name__)
@@ -13,27 +27,19 @@ health_bp = Blueprint('health', __name__)
 def health_check():
     """System health check endpoint"""
     try:
-        # Get system information
+        resources = resource_sampler.snapshot()
+        # Missing until the first sample succeeds
+        boot_timestamp = resources.pop('boot_timestamp', None)
+        boot_time = datetime.fromtimestamp(boot_timestamp) if boot_timestamp is not None else None
         system_info = {
             'status': 'healthy',
             'service': 'hacknc-backend',
             'timestamp': datetime.now().isoformat(),
-            'system': {
-                'platform': platform.system(),
-                'platform_version': platform.version(),
-                'architecture': platform.architecture()[0],
-                'processor': platform.processor(),
-                'hostname': platform.node()
-            },
-            'resources': {
-                'cpu_percent': psutil.cpu_percent(interval=1),
-                'memory_percent': psutil.virtual_memory().percent,
-                'disk_percent': psutil.disk_usage('/').percent,
-                'boot_time': datetime.fromtimestamp(psutil.boot_time()).isoformat()
-            },
+            'system': resource_sampler.system_info(),
+            'resources': resources,
             'uptime': {
-                'seconds': int(psutil.boot_time()),
-                'formatted': str(datetime.now() - datetime.fromtimestamp(psutil.boot_time()))
+                'seconds': int(boot_time.timestamp()) if boot_time else None,
+                'formatted': str(datetime.now() - boot_time) if boot_time else None
             }
         }
         return jsonify(system_info)
@@ -43,3 +49,56 @@ def health_check():
             'message': str(e),
             'timestamp': datetime.now().isoformat()
         }), 500
+
+@health_bp.route('/live')
+def live():
+    """Liveness probe: the process is up and serving requests"""
+    return jsonify({'status': 'alive'})
+
+@health_bp.route('/ready')
+def ready():
+    """Readiness probe: storage is configured, reachable and fast enough, and sampling is running"""
+    storage_error = configuration_error()
+    resource_sampler.snapshot()
+    database = database_prober.status()
+    checks = {
+        'storage': {'ok': storage_error is None, 'error': storage_error},
+        'database': {
+            'ok': database['ready'],
+            'error': database['reason'],
+            'error_rate': database['error_rate'],
+            'p95_ms': database['latency_ms']['p95'] if database['latency_ms'] else None
+        },
+        'resource_sampler': {'ok': resource_sampler.fresh}
+    }
+    is_ready = all(check['ok'] for check in checks.values())
+    return jsonify({
+        'status': 'ready' if is_ready else 'not_ready',
+        'checks': checks
+    }), 200 if is_ready else 503
+
+@health_bp.route('/dependencies')
+def dependencies():
+    """Rolling latency and error rate of the background database probes"""
+    return jsonify({
+        'timestamp': datetime.now().isoformat(),
+        'database': database_prober.status()
+    })
+
+@health_bp.route('/internals')
+def internals():
+    """In-process component metrics (queues, caches, background workers)"""
+    return jsonify({
+        'status': 'ok',
+        'timestamp': datetime.now().isoformat(),
+        'upvote_aggregator': upvote_aggregator.metrics(),
+        'post_cache': post_cache.metrics(),
+        'storage': storage.metrics(),
+        'resource_sampler': resource_sampler.metrics(),
+        'database_pool': {
+            'settings': db_config.pool_settings(),
+            'sync': db_config.pool_metrics(),
+            'async': async_db.pool_metrics()
+        },
+        'response_cache': response_cache.metrics()
+    })
@@ -0,0 +1,100 @@
+"""
+Request metrics and the Prometheus /metrics endpoint
+
+Every request is timed from routing to the finished response (including
+compression) and counted by method, route and status, with a gauge of the
+requests in flight. Routes are labelled by their URL rule, e.g.
+``/api/forums/posts/<int:post_id>/replies``, so label cardinality stays
+bounded however many posts exist. Database calls are timed separately by
+the storage backends (see ``config.metrics``).
+
+Disable everything with METRICS_ENABLED=false.
+"""
+
+import logging
+import time
+
+from flask import Flask, Response, g, request
+
+from config.metrics import METRICS_ENABLED, registry
+
+logger = logging.getLogger(__name__)
+
+# Label for requests that matched no route, so 404 probes don't add series
+UNMATCHED_ROUTE = 'unmatched'
+
+REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds',
+    'Time from routing a request to its finished response',
+    ('method', 'route')
+)
+REQUESTS = registry.counter(
+    'http_requests_total',
+    'Requests handled, by method, route and status code',
+    ('method', 'route', 'status')
+)
+IN_FLIGHT = registry.gauge(
+    'http_requests_in_flight',
+    'Requests currently being handled',
+    ('method', 'route')
+)
+
+
+def _route() -> str:
+    """The matched URL rule of the current request"""
+    return request.url_rule.rule if request.url_rule is not None else UNMATCHED_ROUTE
+
+
+def start_timer() -> None:
+    """Record the start of a request (``before_request`` hook)"""
+    g.metrics_labels = (request.method, _route())
+    g.metrics_start = time.perf_counter()
+    IN_FLIGHT.inc(*g.metrics_labels)
+
+
+def record_request(response: Response) -> Response:
+    """Record a request's duration and status (``after_request`` hook)"""
+    labels = g.pop('metrics_labels', None)
+    if labels is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - g.pop('metrics_start'), *labels)
+        REQUESTS.inc(*labels, str(response.status_code))
+        IN_FLIGHT.dec(*labels)
+    return response
+
+
+def finish_request(error=None) -> None:
+    """Settle requests that ended without a response (``teardown_request`` hook)"""
+    labels = g.pop('metrics_labels', None)
+    if labels is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - g.pop('metrics_start'), *labels)
+        REQUESTS.inc(*labels, '500')
+        IN_FLIGHT.dec(*labels)
+
+
+def metrics_endpoint() -> Response:
+    """Every metric of this process in the Prometheus text format"""
+    return Response(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+        headers={'Cache-Control': 'no-store'}
+    )
+
+
+def init_metrics(app: Flask) -> None:
+    """
+    Install the request hooks and the /metrics route on an app.
+
+    Call before other ``after_request`` hooks are registered: Flask runs them
+    in reverse order, so the timing then includes them.
+
+    Args:
+        app (Flask): Application to instrument
+    """
+    if not METRICS_ENABLED:
+        logger.info("Metrics disabled")
+        return
+
+    app.before_request(start_timer)
+    app.after_request(record_request)
+    app.teardown_request(finish_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
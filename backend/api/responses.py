@@ -0,0 +1,279 @@
+"""
+Response pipeline shared by the API blueprints
+
+- Conditional GET: routes compute a strong ETag from whatever identifies
+  their data (a content hash, a version, the rows of a page) *before*
+  building the response body. When the request's ``If-None-Match`` already
+  holds that ETag the client gets an empty 304, so unchanged payloads are
+  neither rebuilt nor serialized. The encoded body of every ETagged response
+  is cached, so a repeat request for the same version skips serialization.
+- Fast JSON: ``jsonify`` uses orjson when it is installed and falls back to
+  the standard library otherwise.
+- Compression: JSON bodies above RESPONSE_COMPRESS_MIN_BYTES are sent with
+  brotli (if installed) or gzip, whichever the client accepts. Compressed
+  bodies of ETagged responses are cached too.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Smallest body worth compressing; below this the headers dominate
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESS_MIN_BYTES', '1024'))
+
+# Levels favour speed: responses are compressed on the request path
+GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.getenv('RESPONSE_BROTLI_QUALITY', '5'))
+
+# Memory allowed for cached encoded and compressed bodies
+RESPONSE_CACHE_BYTES = int(os.getenv('RESPONSE_CACHE_BYTES', str(32 * 1024 * 1024)))
+
+COMPRESSIBLE_MIMETYPES = frozenset({'application/json', 'text/plain', 'text/html', 'text/csv'})
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson when available"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs.keys() - {'separators'}:
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # Pretty-printed debug output keeps the standard library's formatting
+        if orjson is None or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+    def _dumps_bytes(self, obj: Any) -> bytes:
+        """Serialize with orjson, using Flask's fallbacks for dates, decimals and UUIDs"""
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option)
+
+
+class ByteCache:
+    """Thread-safe LRU cache of response bodies, bounded by total size"""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_BYTES):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_bytes (int): Combined size of cached bodies before eviction
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple, bytes]' = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        """Get a cached body and mark it recently used"""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: Tuple, body: bytes) -> None:
+        """Cache a body, evicting the least recently used ones to fit"""
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        """Drop every cached body"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def metrics(self) -> Dict:
+        """Entry count, size and hit statistics"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Encoded and compressed bodies keyed by (path, ETag, content coding)
+response_cache = ByteCache()
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong entity tag from the values that determine a response.
+
+    Args:
+        *parts: Values whose ``repr`` identifies the response contents
+
+    Returns:
+        str: Unquoted tag, stable across processes for equal inputs
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()[:32]
+
+
+def conditional_json(etag: str, build_payload: Callable[[], Dict], cache_control: str) -> Response:
+    """
+    Return a 304 if the client's copy is current, otherwise the JSON payload.
+
+    The encoded body is cached under the ETag, so ``build_payload`` only runs
+    the first time this process serves a given version.
+
+    Args:
+        etag (str): Tag from ``make_etag`` for the current data
+        build_payload (Callable[[], Dict]): Produces the response body; only
+            called when neither the client nor the cache has this version
+        cache_control (str): Cache-Control header sent with either response
+
+    Returns:
+        Response: 304 Not Modified or 200 with the JSON body, both carrying
+            the ETag and Cache-Control headers
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        key = (request.path, etag, 'identity')
+        body = response_cache.get(key)
+        if body is None:
+            response = jsonify(build_payload())
+            response_cache.put(key, response.get_data())
+        else:
+            response = Response(body, mimetype='application/json')
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def negotiate_encoding(accept_encoding) -> Optional[str]:
+    """
+    Pick the best content coding the client accepts.
+
+    Args:
+        accept_encoding: The request's parsed Accept-Encoding header
+
+    Returns:
+        Optional[str]: 'br', 'gzip' or None for an uncompressed response
+    """
+    if brotli is not None and accept_encoding['br']:
+        return 'br'
+    if accept_encoding['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with the given content coding"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Compress a response body if the client accepts it and it is worth it.
+
+    Streaming responses (such as the SSE stream), non-200 responses and
+    responses that are already encoded pass through unchanged.
+
+    Args:
+        response (Response): Response produced by a view
+
+    Returns:
+        Response: The same response, possibly with a compressed body
+    """
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is None or (response.content_length or 0) < RESPONSE_COMPRESS_MIN_BYTES:
+        return response
+
+    etag, weak = response.get_etag()
+    key = (request.path, etag, encoding) if etag and not weak else None
+
+    body = response_cache.get(key) if key else None
+    if body is None:
+        body = compress(response.get_data(), encoding)
+        if key:
+            response_cache.put(key, body)
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        # The compressed bytes differ from the identity representation
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_response_pipeline(app: Flask) -> None:
+    """
+    Install the fast JSON provider and response compression on an app.
+
+    Args:
+        app (Flask): Application to configure
+    """
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
+
+    logger.info(
+        "Response pipeline: json=%s, encodings=%s, min_bytes=%d",
+        'orjson' if orjson else 'stdlib', 'br, gzip' if brotli else 'gzip', RESPONSE_COMPRESS_MIN_BYTES
+    )
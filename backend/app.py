@@ -7,15 +7,17 @@ from flask_cors import CORS
 from api.health.routes import health_bp
 from api.dashboard.routes import dashboard_bp
 from api.forums.routes import forums_bp
+from api.metrics import init_metrics
+from api.responses import init_response_pipeline
+from config.logging_setup import configure_logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 def create_app():
     app = Flask(__name__)
+    init_metrics(app)
+    init_response_pipeline(app)
     
     CORS(app, origins=[
         "http://localhost:3000",
@@ -37,7 +39,7 @@ def create_app():
     
     @app.errorhandler(500)
     def internal_error(error):
-        logger.error(f"Internal server error: {error}")
+        logger.error("Internal server error: %s", error)
         return jsonify({
             'success': False,
             'error': 'Internal server error',
@@ -62,11 +64,11 @@ if __name__ == '__main__':
     host = os.environ.get('HOST', '0.0.0.0')
     debug = os.environ.get('DEBUG', 'true').lower() == 'true'
     
-    logger.info(f"Starting StudyShare API server on {host}:{port}")
-    logger.info(f"Debug mode: {debug}")
+    logger.info("Starting StudyShare API server on %s:%s", host, port)
+    logger.info("Debug mode: %s", debug)
     
     try:
         app.run(host=host, port=port, debug=debug)
     except Exception as e:
-        logger.error(f"Failed to start server: {e}")
+        logger.error("Failed to start server: %s", e)
         raise
\ No newline at end of file
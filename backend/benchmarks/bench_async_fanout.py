@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark multi-query reads run sequentially vs gathered on the async client
+
+For a replies page this times each query on its own, both queries back to
+back (the old behaviour), and both gathered on the async client (the current
+behaviour). The gathered latency should track the slowest single query
+rather than their sum.
+
+For the dashboard stats it compares the two gathered count queries they used
+to cost with the single ``user_stats`` row lookup that replaced them.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_async_fanout --user-id USER --post-id 1 [--requests N]
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from config.async_database import async_db, run_async
+from api.dashboard.services import DashboardService
+from api.forums.services import ReplyService
+from storage.supabase_storage import SupabaseReplyRepository
+from benchmarks.bench_courses import summarize
+
+
+def time_calls(function, requests: int) -> list:
+    """Call a function repeatedly and return per-call latencies in ms"""
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        function()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def bench_stats(user_id: str, requests: int):
+    """Dashboard stats: gathered count queries vs the user_stats row"""
+    async def counts():
+        await asyncio.gather(
+            async_db.table('forum_posts').select('id', count='exact').eq('user_id', user_id).limit(1).execute(),
+            async_db.table('post_upvotes').select('id', count='exact').eq('user_id', user_id).limit(1).execute()
+        )
+
+    print(f"\n📊 GET /api/dashboard/stats (user {user_id})")
+    counted = summarize('counts', time_calls(lambda: run_async(counts()), requests))
+    row = summarize('row', time_calls(lambda: DashboardService.get_user_stats(user_id), requests))
+    print(f"   stats row p50 / gathered counts p50: {row / counted:.2f}")
+
+
+def bench_replies(post_id: int, requests: int):
+    """Replies page: page query and reply count"""
+    async def page_only():
+        await SupabaseReplyRepository.page_query(async_db, post_id, 51, None, False).execute()
+
+    async def total_only():
+        await SupabaseReplyRepository.total_query(async_db, post_id).execute()
+
+    print(f"\n💬 GET /api/forums/posts/{post_id}/replies")
+    slowest = max(
+        summarize('page', time_calls(lambda: run_async(page_only()), requests)),
+        summarize('total', time_calls(lambda: run_async(total_only()), requests))
+    )
+    def sequential():
+        run_async(page_only())
+        run_async(total_only())
+
+    summarize('seq', time_calls(sequential, requests))
+    gathered = summarize('gather', time_calls(lambda: ReplyService.get_replies_for_post(post_id), requests))
+    print(f"   gathered p50 / slowest single query p50: {gathered / slowest:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--user-id', default='test_user_123')
+    parser.add_argument('--post-id', type=int, default=1)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    # Warm up both clients' connections
+    run_async(asyncio.sleep(0))
+    DashboardService.get_user_stats(args.user_id)
+    ReplyService.get_replies_for_post(args.post_id)
+
+    print("🚀 Sequential vs gathered queries")
+    print("=" * 50)
+    bench_stats(args.user_id, args.requests)
+    bench_replies(args.post_id, args.requests)
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /api/forums/courses with a cold and a warm course catalog
+
+"Cold" invalidates the catalog before every request, which reproduces the old
+behaviour of re-reading and re-parsing every college data file per request.
+"Warm" serves the list from the in-memory catalog.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_courses [--requests N]
+"""
+import argparse
+import logging
+import statistics
+import time
+
+from app import create_app
+from api.forums.catalog import course_catalog
+
+
+def time_requests(client, requests: int, cold: bool) -> list:
+    """Issue GET /courses repeatedly and return per-request latencies in ms"""
+    latencies = []
+    for _ in range(requests):
+        if cold:
+            course_catalog.invalidate()
+        start = time.perf_counter()
+        response = client.get('/api/forums/courses')
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.status_code
+    return latencies
+
+
+def summarize(label: str, latencies: list) -> float:
+    """Print latency percentiles and return the median"""
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{label:<6} mean {statistics.mean(ordered):7.2f} ms | "
+          f"p50 {p50:7.2f} ms | p95 {p95:7.2f} ms | max {ordered[-1]:7.2f} ms")
+    return p50
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    client = create_app().test_client()
+
+    # Warm up the app and the catalog once
+    time_requests(client, 5, cold=False)
+
+    print(f"🚀 GET /api/forums/courses x {args.requests}")
+    print("=" * 50)
+    cold = summarize('cold', time_requests(client, args.requests, cold=True))
+    warm = summarize('warm', time_requests(client, args.requests, cold=False))
+    print("=" * 50)
+    print(f"✅ Median speedup: {cold / warm:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
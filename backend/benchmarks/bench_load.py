@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Load test the API with a mixed workload against a seeded SQLite database
+
+Seeds a local SQLite store (see ``storage.sqlite_storage``) with posts and
+replies spread over every catalog course with Zipfian popularity: a few
+courses, posts and users get most of the traffic, as on a real forum. Then
+drives the app with concurrent clients for a fixed time, each repeatedly
+picking a weighted operation (course list, post pages, replies, posting,
+upvoting, dashboard stats), and reports throughput and p50/p95/p99 latency
+per endpoint.
+
+Every run is saved as JSON (with the commit it ran on), and ``--compare``
+prints the change against an earlier run, so regressions show up between
+commits. Seeding is deterministic for a given ``--seed``, and an existing
+database file with the same seed parameters is reused.
+
+Clients call the app in-process through Flask test clients by default, which
+measures the app and storage without network noise; ``--url`` sends the same
+workload over HTTP to a running server instead (which must itself run with
+STORAGE_BACKEND=sqlite and the same SQLITE_DATABASE_PATH).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_load [--posts 100000] [--replies 200000] [--clients 16]
+        [--duration 30] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import itertools
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+from api.forums.cache import post_cache
+from api.forums.catalog import course_catalog
+from config.storage import set_storage
+from storage.sqlite_storage import SQLiteStorage
+
+# Relative frequency of each operation in the workload
+WORKLOAD = {
+    'GET /courses': 10,
+    'GET /posts': 30,
+    'GET /posts?cursor': 15,
+    'GET /posts/<id>/replies': 15,
+    'POST /posts/<id>/upvote': 15,
+    'POST /posts': 5,
+    'POST /posts/<id>/replies': 5,
+    'GET /dashboard/stats': 5
+}
+
+SORTS = ('new', 'new', 'top', 'hot')
+
+SEED_BATCH_SIZE = 1000
+
+# Seeded posts are spread over this many days before the seed time
+SEED_HISTORY_DAYS = 180
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+class Zipf:
+    """Sampler over a population where the k-th most popular item has weight 1/k^s"""
+
+    def __init__(self, population: Sequence, exponent: float, rng: random.Random):
+        """
+        Args:
+            population (Sequence): Items in popularity order, most popular first
+            exponent (float): Skew; ~1 matches typical forum traffic
+            rng (random.Random): Source of randomness
+        """
+        self.population = list(population)
+        self.cum_weights = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, len(self.population) + 1)))
+        self.rng = rng
+
+    def sample(self, rng: Optional[random.Random] = None):
+        """Draw one item"""
+        return (rng or self.rng).choices(self.population, cum_weights=self.cum_weights)[0]
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def git_commit() -> Optional[str]:
+    """Commit the benchmark runs on, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def seed_database(storage: SQLiteStorage, args, courses: List[str]) -> Dict:
+    """
+    Fill an empty database with posts, replies and user profiles.
+
+    Returns:
+        Dict: Row counts and seeding time
+    """
+    rng = random.Random(args.seed)
+    course_popularity = Zipf(rng.sample(courses, len(courses)), args.zipf, rng)
+    users = [f"loadtest_user_{n}" for n in range(args.users)]
+    user_popularity = Zipf(users, args.zipf, rng)
+    now = datetime.now(timezone.utc)
+    start = time.perf_counter()
+
+    print(f"🌱 Seeding {args.posts} posts and {args.replies} replies over {len(courses)} courses...")
+
+    post_ids = []
+    for batch_start in range(0, args.posts, SEED_BATCH_SIZE):
+        batch = []
+        for n in range(batch_start, min(batch_start + SEED_BATCH_SIZE, args.posts)):
+            user_id = user_popularity.sample()
+            created_at = now - timedelta(seconds=rng.uniform(0, SEED_HISTORY_DAYS * 86400))
+            batch.append({
+                'title': f"Question {n} about {rng.choice(('recursion', 'pointers', 'exams', 'homework', 'graphs'))}",
+                'content': f"Seeded post {n}. " + ' '.join(rng.choices(('lecture', 'midterm', 'project', 'office', 'hours', 'proof', 'tree', 'array'), k=30)),
+                'course': course_popularity.sample(),
+                'user_id': user_id,
+                'user_name': user_id,
+                'upvotes': int(rng.paretovariate(1.5)) - 1,
+                'created_at': created_at.isoformat()
+            })
+        post_ids.extend(post['id'] for post in storage.posts.create_many(batch))
+
+    # Replies concentrate on popular posts
+    post_popularity = Zipf(rng.sample(post_ids, len(post_ids)), args.zipf, rng)
+    for batch_start in range(0, args.replies, SEED_BATCH_SIZE):
+        batch = []
+        for n in range(batch_start, min(batch_start + SEED_BATCH_SIZE, args.replies)):
+            user_id = user_popularity.sample()
+            batch.append({
+                'post_id': post_popularity.sample(),
+                'user_id': user_id,
+                'user_name': user_id,
+                'content': f"Seeded reply {n}. " + ' '.join(rng.choices(('try', 'the', 'base', 'case', 'first', 'check', 'slides'), k=15)),
+                'created_at': (now - timedelta(seconds=rng.uniform(0, SEED_HISTORY_DAYS * 86400))).isoformat()
+            })
+        storage.replies.create_many(batch)
+
+    for user_id in users:
+        storage.users.create({'clerk_user_id': user_id, 'name': user_id, 'email': f"{user_id}@example.edu"})
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Seeded in {elapsed:.1f}s")
+    return {'posts': args.posts, 'replies': args.replies, 'users': args.users, 'seconds': round(elapsed, 1)}
+
+
+def open_database(args, courses: List[str]) -> SQLiteStorage:
+    """Open the benchmark database, seeding it unless it was seeded with the same parameters"""
+    path = args.db or os.path.join(
+        tempfile.gettempdir(), f"studyshare-load-{args.posts}-{args.replies}-{args.users}-{args.seed}.sqlite3"
+    )
+    if args.reseed and os.path.exists(path):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    storage = SQLiteStorage(path)
+    existing = storage.db.query_one("SELECT count(*) AS n FROM forum_posts")['n']
+    if existing:
+        print(f"♻️  Reusing {path} ({existing} posts)")
+    else:
+        seed_database(storage, args, courses)
+        with storage.db.connection() as conn:
+            conn.execute('PRAGMA optimize')
+    return storage
+
+
+class InProcessClient:
+    """Calls the app through a Flask test client"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method: str, path: str, **kwargs) -> tuple:
+        """Send a request; returns (status code, JSON body or None)"""
+        response = self.client.open(path, method=method, **kwargs)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HTTPClient:
+    """Calls a running server over HTTP with keep-alive"""
+
+    def __init__(self, url: str):
+        import httpx
+        self.client = httpx.Client(base_url=url, timeout=30)
+
+    def request(self, method: str, path: str, query_string=None, **kwargs) -> tuple:
+        """Send a request; returns (status code, JSON body or None)"""
+        response = self.client.request(method, path, params=query_string, **kwargs)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+
+
+class Worker:
+    """One simulated client running the weighted workload"""
+
+    def __init__(self, client, rng: random.Random, courses: Zipf, posts: Zipf, users: Zipf):
+        self.client = client
+        self.rng = rng
+        self.courses = courses
+        self.posts = posts
+        self.users = users
+        self.next_page: Optional[Dict] = None
+        self.operations: Dict[str, Callable[[], tuple]] = {
+            'GET /courses': self.list_courses,
+            'GET /posts': self.list_posts,
+            'GET /posts?cursor': self.next_posts,
+            'GET /posts/<id>/replies': self.list_replies,
+            'POST /posts/<id>/upvote': self.upvote,
+            'POST /posts': self.create_post,
+            'POST /posts/<id>/replies': self.create_reply,
+            'GET /dashboard/stats': self.dashboard_stats
+        }
+
+    def list_courses(self) -> tuple:
+        return self.client.request('GET', '/api/forums/courses')
+
+    def list_posts(self) -> tuple:
+        query = {'course': self.courses.sample(self.rng), 'sort': self.rng.choice(SORTS)}
+        status, body = self.client.request('GET', '/api/forums/posts', query_string=query)
+        if body and body.get('next_cursor'):
+            self.next_page = {**query, 'cursor': body['next_cursor']}
+        return status, body
+
+    def next_posts(self) -> tuple:
+        if self.next_page is None:
+            return self.list_posts()
+        status, body = self.client.request('GET', '/api/forums/posts', query_string=self.next_page)
+        cursor = body.get('next_cursor') if body else None
+        self.next_page = {**self.next_page, 'cursor': cursor} if cursor else None
+        return status, body
+
+    def list_replies(self) -> tuple:
+        return self.client.request('GET', f"/api/forums/posts/{self.posts.sample(self.rng)}/replies")
+
+    def upvote(self) -> tuple:
+        return self.client.request(
+            'POST', f"/api/forums/posts/{self.posts.sample(self.rng)}/upvote",
+            json={'user_id': self.users.sample(self.rng)}
+        )
+
+    def create_post(self) -> tuple:
+        user_id = self.users.sample(self.rng)
+        return self.client.request('POST', '/api/forums/posts', json={
+            'title': 'Load test question',
+            'content': 'Does anyone have notes from the last lecture?',
+            'course': self.courses.sample(self.rng),
+            'user_id': user_id,
+            'user_name': user_id
+        })
+
+    def create_reply(self) -> tuple:
+        user_id = self.users.sample(self.rng)
+        return self.client.request('POST', f"/api/forums/posts/{self.posts.sample(self.rng)}/replies", json={
+            'user_id': user_id,
+            'user_name': user_id,
+            'content': 'Check the slides from week three.'
+        })
+
+    def dashboard_stats(self) -> tuple:
+        return self.client.request('GET', '/api/dashboard/stats', query_string={'user_id': self.users.sample(self.rng)})
+
+    def run(self, deadline: float, samples: Dict[str, List[float]], errors: Dict[str, int]) -> None:
+        """Issue requests until the deadline, recording latencies per operation"""
+        names = list(WORKLOAD)
+        weights = list(WORKLOAD.values())
+        while time.perf_counter() < deadline:
+            name = self.rng.choices(names, weights=weights)[0]
+            start = time.perf_counter()
+            try:
+                status, _ = self.operations[name]()
+                failed = status >= 400
+            except Exception:
+                failed = True
+            samples[name].append((time.perf_counter() - start) * 1000)
+            if failed:
+                errors[name] += 1
+
+
+def run_load(make_client: Callable[[], object], args, courses: Zipf, posts: Zipf, users: Zipf, duration: float) -> Dict:
+    """
+    Run every client for a fixed time.
+
+    Returns:
+        Dict: Per-endpoint and overall statistics
+    """
+    workers = [
+        Worker(make_client(), random.Random(args.seed + n), courses, posts, users)
+        for n in range(args.clients)
+    ]
+    results = [({name: [] for name in WORKLOAD}, {name: 0 for name in WORKLOAD}) for _ in workers]
+
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=worker.run, args=(deadline, *result), name=f"load-client-{n}")
+        for n, (worker, result) in enumerate(zip(workers, results))
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    endpoints = {}
+    everything = []
+    total_errors = 0
+    for name in WORKLOAD:
+        latencies = sorted(itertools.chain.from_iterable(samples[name] for samples, _ in results))
+        failures = sum(errors[name] for _, errors in results)
+        everything.extend(latencies)
+        total_errors += failures
+        endpoints[name] = summarize_latencies(latencies, failures, elapsed)
+
+    return {
+        'seconds': round(elapsed, 2),
+        'overall': summarize_latencies(sorted(everything), total_errors, elapsed),
+        'endpoints': endpoints
+    }
+
+
+def summarize_latencies(ordered: List[float], errors: int, elapsed: float) -> Dict:
+    """Throughput and latency percentiles of one set of requests"""
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'throughput_rps': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 50), 3),
+        'p95_ms': round(percentile(ordered, 95), 3),
+        'p99_ms': round(percentile(ordered, 99), 3),
+        'max_ms': round(ordered[-1], 3) if ordered else 0.0
+    }
+
+
+def print_report(report: Dict, baseline: Optional[Dict] = None) -> None:
+    """Print the per-endpoint table, with changes against a baseline run"""
+    def change(name: str, metric: str, value: float) -> str:
+        if baseline is None:
+            return ''
+        before = (baseline['overall'] if name == 'overall' else baseline['endpoints'].get(name, {})).get(metric)
+        if not before:
+            return '        '
+        return f" ({(value - before) / before * 100:+5.1f}%)"
+
+    print(f"\n{'endpoint':<26} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    rows = list(report['endpoints'].items()) + [('overall', report['overall'])]
+    for name, stats in rows:
+        print(f"{name:<26} {stats['throughput_rps']:>8.1f} {stats['p50_ms']:>9.2f} "
+              f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['errors']:>7}")
+        if baseline is not None:
+            print(f"{'':<26} {change(name, 'throughput_rps', stats['throughput_rps']):>8} "
+                  f"{change(name, 'p50_ms', stats['p50_ms']):>9} {change(name, 'p95_ms', stats['p95_ms']):>9} "
+                  f"{change(name, 'p99_ms', stats['p99_ms']):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--replies', type=int, default=200000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--zipf', type=float, default=1.1, help="Popularity skew of courses, posts and users")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', help="SQLite file (default: a temp file named after the seed parameters)")
+    parser.add_argument('--reseed', action='store_true', help="Recreate the database even if it exists")
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=30, help="Seconds of measured load")
+    parser.add_argument('--warmup', type=float, default=3, help="Seconds of unmeasured load first")
+    parser.add_argument('--no-post-cache', action='store_true', help="Disable the post page cache")
+    parser.add_argument('--url', help="Load a running server instead of the in-process app")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/load-<commit>-<time>.json)")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    courses = [course['course_code'] for course in course_catalog.get_courses()]
+    storage = open_database(args, courses)
+    set_storage(storage)
+    if args.no_post_cache:
+        post_cache.ttl = 0
+
+    # Popularity used by the clients; independent of the seeding order
+    rng = random.Random(args.seed)
+    course_popularity = Zipf(rng.sample(courses, len(courses)), args.zipf, rng)
+    post_ids = [row['id'] for row in storage.db.query("SELECT id FROM forum_posts")]
+    post_popularity = Zipf(rng.sample(post_ids, len(post_ids)), args.zipf, rng)
+    user_popularity = Zipf([f"loadtest_user_{n}" for n in range(args.users)], args.zipf, rng)
+
+    if args.url:
+        make_client = lambda: HTTPClient(args.url)
+    else:
+        from app import create_app
+        app = create_app()
+        make_client = lambda: InProcessClient(app)
+
+    print(f"🚀 {args.clients} clients, {args.duration:.0f}s ({args.warmup:.0f}s warm-up), "
+          f"{'HTTP ' + args.url if args.url else 'in-process'}")
+    print("=" * 50)
+    if args.warmup:
+        run_load(make_client, args, course_popularity, post_popularity, user_popularity, args.warmup)
+    report = run_load(make_client, args, course_popularity, post_popularity, user_popularity, args.duration)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'parameters': {
+            key: getattr(args, key)
+            for key in ('posts', 'replies', 'users', 'zipf', 'seed', 'clients', 'duration', 'warmup', 'no_post_cache', 'url')
+        },
+        'workload': WORKLOAD,
+        **report
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        print(f"Compared with {baseline.get('commit')} ({baseline.get('timestamp')})")
+    print_report(report, baseline)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load-{report['commit'] or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print("=" * 50)
+    print(f"✅ Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /api/forums/posts for one course with and without the page cache
+
+"Uncached" clears the post page cache before every request, so each one is a
+Supabase round trip. "Cached" serves the first page of the course from
+memory, as a busy course would between writes.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_post_cache --course "CSC 116" [--requests N]
+"""
+import argparse
+import logging
+import time
+
+from app import create_app
+from api.forums.cache import post_cache
+from benchmarks.bench_courses import summarize
+
+
+def time_requests(client, course: str, requests: int, cached: bool) -> list:
+    """Issue GET /posts repeatedly and return per-request latencies in ms"""
+    latencies = []
+    for _ in range(requests):
+        if not cached:
+            post_cache.clear()
+        start = time.perf_counter()
+        response = client.get('/api/forums/posts', query_string={'course': course})
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.status_code
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--course', default='CSC 116')
+    parser.add_argument('--requests', type=int, default=100)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    client = create_app().test_client()
+
+    # Warm up the app and the connection
+    time_requests(client, args.course, 3, cached=False)
+
+    print(f"🚀 GET /api/forums/posts?course={args.course} x {args.requests}")
+    print("=" * 50)
+    uncached = summarize('uncached', time_requests(client, args.course, args.requests, cached=False))
+    cached = summarize('cached', time_requests(client, args.course, args.requests, cached=True))
+    print("=" * 50)
+    print(f"✅ Median speedup: {uncached / cached:.1f}x")
+    print(f"Cache: {post_cache.metrics()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON serialization and compression of forum responses
+
+Measures two payloads: the /courses list built from the real course catalog,
+and a synthetic 100-post page shaped like GET /posts. For each it reports
+serialization CPU time with Flask's standard library provider and with the
+orjson provider, and bytes on the wire (and compression CPU) for identity,
+gzip and brotli encodings.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_responses [--iterations N]
+"""
+import argparse
+import logging
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from api.forums.catalog import course_catalog
+from api.responses import FastJSONProvider, brotli, compress, orjson
+
+
+def courses_payload() -> dict:
+    """The /courses response body, with activity on every tenth course"""
+    return {
+        'success': True,
+        'data': [
+            {
+                'course_code': course['course_code'],
+                'course_name': course['course_name'],
+                'university': course['university'],
+                'post_count': 12 if index % 10 == 0 else 0,
+                'recent_activity': '2024-01-15T10:30:00.123456+00:00' if index % 10 == 0 else None
+            }
+            for index, course in enumerate(course_catalog.get_courses())
+        ]
+    }
+
+
+def posts_payload(posts: int = 100) -> dict:
+    """A GET /posts response body with the given number of posts"""
+    return {
+        'success': True,
+        'data': [
+            {
+                'id': 1000 + index,
+                'title': f"Question {index} about the recursion assignment",
+                'content': "I am stuck on the base case for the tree traversal. " * 6,
+                'course': 'CSC 116',
+                'user_id': f"user{index % 37}",
+                'user_name': f"student{index % 37}",
+                'upvotes': index * 7 % 50,
+                'upvoted': index % 3 == 0,
+                'reply_count': index % 9,
+                'last_reply_at': '2024-01-15T12:05:00.654321+00:00',
+                'hot_score': 412.5 - index * 0.37,
+                'created_at': '2024-01-15T10:30:00.123456+00:00',
+                'updated_at': '2024-01-15T10:30:00.123456+00:00'
+            }
+            for index in range(posts)
+        ],
+        'next_cursor': 'eyJjcmVhdGVkX2F0IjoiMjAyNC0wMS0xNVQxMDozMDowMCIsImlkIjoxMDAwfQ'
+    }
+
+
+def cpu_ms(function, iterations: int) -> float:
+    """Mean CPU milliseconds per call"""
+    start = time.process_time()
+    for _ in range(iterations):
+        function()
+    return (time.process_time() - start) * 1000 / iterations
+
+
+def report(label: str, payload: dict, app: Flask, iterations: int):
+    """Print serialization and compression results for one payload"""
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+
+    with app.app_context():
+        body = fast.response(payload).get_data()
+        stdlib_ms = cpu_ms(lambda: stdlib.response(payload).get_data(), iterations)
+        fast_ms = cpu_ms(lambda: fast.response(payload).get_data(), iterations)
+
+    print(f"\n📦 {label}")
+    print(f"  serialize  stdlib {stdlib_ms:7.3f} ms | "
+          f"{'orjson' if orjson else 'stdlib'} {fast_ms:7.3f} ms | {stdlib_ms / fast_ms:.1f}x")
+    print(f"  identity   {len(body):>9,} bytes")
+
+    for encoding in ('gzip', 'br'):
+        if encoding == 'br' and brotli is None:
+            print("  br         (brotli not installed)")
+            continue
+        compressed = compress(body, encoding)
+        compress_ms = cpu_ms(lambda: compress(body, encoding), max(1, iterations // 5))
+        print(f"  {encoding:<10} {len(compressed):>9,} bytes "
+              f"({len(compressed) / len(body):.1%}) | {compress_ms:7.3f} ms to compress")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    app = Flask(__name__)
+
+    print("🚀 Response serialization and compression")
+    print("=" * 50)
+    report('GET /api/forums/courses', courses_payload(), app, args.iterations)
+    report('GET /api/forums/posts (100 posts)', posts_payload(), app, args.iterations)
+    print("=" * 50)
+    print("Cached responses (ETag hits) skip both serialization and compression.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Asynchronous database client for concurrent Supabase queries
+
+Services that need several independent queries for one response run them as
+coroutines on an ``AsyncPostgrestClient`` and ``asyncio.gather`` them, so
+the response waits for the slowest query instead of the sum of all of them.
+
+The client lives on one long-lived event loop in a background thread per
+worker process, and synchronous Flask views hand it coroutines through
+``run_async``. That keeps the client's connection pool warm across requests,
+which per-request event loops (as used by ``async def`` Flask views) cannot.
+
+Author: StudyShare Team
+Version: 1.0.0
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, Optional
+
+from config.database import db_config
+
+if TYPE_CHECKING:
+    from postgrest import AsyncPostgrestClient
+    from config.http_transport import PoolStats
+
+logger = logging.getLogger(__name__)
+
+# Seconds a synchronous caller waits for a coroutine before giving up
+ASYNC_DB_TIMEOUT = float(os.getenv('ASYNC_DB_TIMEOUT', '15'))
+
+
+class AsyncDatabase:
+    """
+    Background event loop owning an asynchronous PostgREST client.
+
+    Coroutines that use ``client`` must run on this loop, i.e. be started
+    through ``run``.
+    """
+
+    def __init__(self, timeout: float = ASYNC_DB_TIMEOUT):
+        """
+        Initialize the database. The loop and client are created on first use,
+        with the credentials from ``db_config``.
+
+        Args:
+            timeout (float): Seconds ``run`` waits for a result
+        """
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional['AsyncPostgrestClient'] = None
+        self._pid: Optional[int] = None
+        self.pool_stats: Optional['PoolStats'] = None
+
+    @property
+    def client(self) -> 'AsyncPostgrestClient':
+        """The PostgREST client; only use it from coroutines run on this loop"""
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    def _create_client(self) -> 'AsyncPostgrestClient':
+        """Build the PostgREST client on the pooled, instrumented transport"""
+        db_config._validate_credentials()
+
+        # Deferred: postgrest and httpx dominate import time
+        from postgrest import AsyncPostgrestClient
+        from config.http_transport import PoolStats, create_async_http_client
+
+        self.pool_stats = PoolStats('async')
+        client = AsyncPostgrestClient(f"{db_config.url}/rest/v1", headers={
+            'apikey': db_config.service_key,
+            'Authorization': f"Bearer {db_config.service_key}",
+            'Accept': 'application/json',
+            'Content-Type': 'application/json'
+        })
+        # The default session has not connected yet, so it can simply be dropped
+        client.session = create_async_http_client(
+            str(client.session.base_url), dict(client.session.headers), self.pool_stats
+        )
+        return client
+
+    def table(self, name: str):
+        """Start a query on a table (see ``postgrest.AsyncRequestBuilder``)"""
+        return self.client.from_(name)
+
+    def rpc(self, function: str, params: dict):
+        """Start a call to a database function"""
+        return self.client.rpc(function, params)
+
+    def run(self, coroutine: Awaitable) -> Any:
+        """
+        Run a coroutine on the background loop and wait for its result.
+
+        Args:
+            coroutine (Awaitable): Coroutine to run; it may use ``client``
+
+        Returns:
+            Any: The coroutine's result
+
+        Raises:
+            TimeoutError: If the result takes longer than the timeout
+            Exception: Whatever the coroutine raises
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def pool_metrics(self) -> Dict:
+        """Connection pool utilisation of this process's async client"""
+        if self._pid != os.getpid() or self.pool_stats is None:
+            return {'client': 'async', 'initialized': False}
+        return self.pool_stats.metrics()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the event loop thread in this process (again after a fork)"""
+        if self._pid == os.getpid():
+            return self._loop
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked worker must not share the parent's loop or connections
+                self._client = None
+                self.pool_stats = None
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name='async-database', daemon=True
+                ).start()
+                self._pid = os.getpid()
+                logger.info("Started async database event loop")
+        return self._loop
+
+
+# Global async database for this process
+async_db = AsyncDatabase()
+
+
+def run_async(coroutine: Awaitable) -> Any:
+    """Run a coroutine on the shared async database loop and return its result"""
+    return async_db.run(coroutine)
@@ -2,7 +2,13 @@
 Database configuration and Supabase client initialization
 
 This module handles the connection to Supabase database and provides
-a centralized database client for the entire application.
+a centralized database client for the entire application. Each worker
+process gets its own client, whose PostgREST requests go through the pooled
+transport from ``config.http_transport``.
+
+Nothing is validated, imported or connected until the client is first used
+(``get_supabase()`` or any attribute of ``supabase``), so importing the app
+stays fast and works without credentials, e.g. for tooling and tests.
 
 Author: StudyShare Team
 Version: 1.0.0
@@ -10,10 +16,14 @@ Version: 1.0.0
 
 import os
 import logging
-from typing import Optional
-from supabase import create_client, Client
+import threading
+from typing import TYPE_CHECKING, Dict, Optional
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from supabase import Client
+    from config.http_transport import PoolStats
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -29,13 +39,13 @@ class DatabaseConfig:
     """
     
     def __init__(self):
-        """Initialize database configuration"""
+        """Read the database configuration; the client is created on first use"""
         self.url: Optional[str] = os.getenv("SUPABASE_URL")
         self.service_key: Optional[str] = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-        self.client: Optional[Client] = None
-        
-        self._validate_credentials()
-        self._initialize_client()
+        self.client: Optional['Client'] = None
+        self.pool_stats: Optional['PoolStats'] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
     
     def _validate_credentials(self) -> None:
         """
@@ -62,32 +72,97 @@ class DatabaseConfig:
         """
         Initialize the Supabase client with validated credentials.
         
+        PostgREST requests (``table`` and ``rpc``) are sent through a pooled
+        httpx client instead of the library default, so connections are kept
+        alive between requests within the configured limits.
+        
         Raises:
+            ValueError: If required credentials are missing
             Exception: If client initialization fails
         """
+        self._validate_credentials()
+        
+        # Deferred: the Supabase and httpx packages dominate import time
+        from supabase import create_client
+        from config.http_transport import PoolStats, create_http_client
+        
         try:
-            self.client = create_client(self.url, self.service_key)
-            logger.info("✅ Supabase client initialized successfully")
+            self.pool_stats = PoolStats('sync')
+            client = create_client(self.url, self.service_key)
+            
+            postgrest = client.postgrest
+            default_session = postgrest.session
+            postgrest.session = create_http_client(
+                str(default_session.base_url), dict(default_session.headers), self.pool_stats
+            )
+            default_session.close()
+            
+            self.client = client
+            self._pid = os.getpid()
+            logger.info("✅ Supabase client initialized successfully (pid %s)", self._pid)
         except Exception as e:
-            logger.error(f"Failed to initialize Supabase client: {e}")
+            logger.error("Failed to initialize Supabase client: %s", e)
             raise Exception(f"Database connection failed: {e}")
     
-    def get_client(self) -> Client:
+    def get_client(self) -> 'Client':
         """
-        Get the initialized Supabase client.
+        Get this process's Supabase client, creating it on first use.
+        
+        A process forked after the client was created (e.g. a gunicorn
+        worker of a preloaded app) gets a fresh client rather than sharing
+        the parent's sockets.
         
         Returns:
             Client: The Supabase client instance
             
         Raises:
-            Exception: If client is not initialized
+            ValueError: If required credentials are missing
+            Exception: If client initialization fails
         """
-        if not self.client:
-            raise Exception("Database client not initialized")
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._initialize_client()
+        
         return self.client
+    
+    @property
+    def initialized(self) -> bool:
+        """Whether this process has created its client yet"""
+        return self._pid == os.getpid()
+    
+    def pool_metrics(self) -> Dict:
+        """Connection pool utilisation of this process's client"""
+        if not self.initialized:
+            return {'client': 'sync', 'initialized': False}
+        return self.pool_stats.metrics()
+    
+    @staticmethod
+    def pool_settings() -> Dict:
+        """Effective connection pool settings"""
+        from config.http_transport import pool_settings
+        return pool_settings()
+
+
+class _ProcessClient:
+    """
+    Stand-in for the Supabase client that resolves to the calling process's
+    client on every attribute access, so modules can keep importing
+    ``supabase`` at load time and still be fork-safe.
+    """
+    
+    def __getattr__(self, name):
+        return getattr(db_config.get_client(), name)
+
 
 # Global database configuration instance
 db_config = DatabaseConfig()
 
+
+def get_supabase() -> 'Client':
+    """Get this process's Supabase client, creating it on first use"""
+    return db_config.get_client()
+
+
 # Export the client for use in other modules
-supabase: Client = db_config.get_client()
+supabase: 'Client' = _ProcessClient()
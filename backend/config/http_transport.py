@@ -0,0 +1,263 @@
+"""
+Pooled HTTP transport for the Supabase clients
+
+Builds the httpx clients the synchronous and asynchronous PostgREST clients
+send their requests through, with a bounded connection pool that keeps
+connections (and their TLS sessions) alive between requests, optional HTTP/2
+multiplexing, and separate connect/read/write/pool timeouts. Every client
+records pool utilisation so it can be reported on /api/health/internals, and
+times each request by table and operation for /metrics.
+
+Author: StudyShare Team
+Version: 1.0.0
+"""
+
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Dict
+
+import httpx
+
+from config.metrics import observe_db_call
+
+logger = logging.getLogger(__name__)
+
+SUPABASE_HTTP_MAX_CONNECTIONS = int(os.getenv('SUPABASE_HTTP_MAX_CONNECTIONS', '20'))
+SUPABASE_HTTP_MAX_KEEPALIVE = int(os.getenv('SUPABASE_HTTP_MAX_KEEPALIVE', '10'))
+SUPABASE_HTTP_KEEPALIVE_EXPIRY = float(os.getenv('SUPABASE_HTTP_KEEPALIVE_EXPIRY', '60'))
+SUPABASE_HTTP2 = os.getenv('SUPABASE_HTTP2', 'true').lower() == 'true'
+SUPABASE_HTTP_RETRIES = int(os.getenv('SUPABASE_HTTP_RETRIES', '1'))
+
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv('SUPABASE_CONNECT_TIMEOUT', '5'))
+SUPABASE_READ_TIMEOUT = float(os.getenv('SUPABASE_READ_TIMEOUT', '10'))
+SUPABASE_WRITE_TIMEOUT = float(os.getenv('SUPABASE_WRITE_TIMEOUT', '10'))
+SUPABASE_POOL_TIMEOUT = float(os.getenv('SUPABASE_POOL_TIMEOUT', '5'))
+
+
+@lru_cache(maxsize=None)
+def http2_enabled() -> bool:
+    """Whether HTTP/2 is requested and the ``h2`` package is installed"""
+    if not SUPABASE_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("SUPABASE_HTTP2 is enabled but the h2 package is missing; using HTTP/1.1")
+        return False
+
+
+def pool_limits() -> httpx.Limits:
+    """Connection pool bounds from the environment"""
+    return httpx.Limits(
+        max_connections=SUPABASE_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=SUPABASE_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=SUPABASE_HTTP_KEEPALIVE_EXPIRY
+    )
+
+
+def request_timeout() -> httpx.Timeout:
+    """Per-request timeouts from the environment"""
+    return httpx.Timeout(
+        connect=SUPABASE_CONNECT_TIMEOUT,
+        read=SUPABASE_READ_TIMEOUT,
+        write=SUPABASE_WRITE_TIMEOUT,
+        pool=SUPABASE_POOL_TIMEOUT
+    )
+
+
+class PoolStats:
+    """Request counters and connection pool state of one HTTP client"""
+
+    def __init__(self, name: str):
+        """
+        Initialize empty counters.
+
+        Args:
+            name (str): Label for the client, e.g. 'sync' or 'async'
+        """
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._requests = 0
+        self._errors = 0
+        self._total_ms = 0.0
+
+    def started(self) -> float:
+        """Record a request starting; returns its start time"""
+        with self._lock:
+            self._in_flight += 1
+            self._requests += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        return time.perf_counter()
+
+    def finished(self, started_at: float, failed: bool) -> float:
+        """Record a request finishing; returns its duration in seconds"""
+        elapsed = time.perf_counter() - started_at
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            self._in_flight -= 1
+            self._total_ms += elapsed_ms
+            if failed:
+                self._errors += 1
+        return elapsed
+
+    def metrics(self) -> Dict:
+        """Connection counts, utilisation and request statistics"""
+        connections = list(self.pool.connections) if self.pool is not None else []
+        idle = sum(1 for connection in connections if connection.is_idle())
+
+        with self._lock:
+            return {
+                'client': self.name,
+                'max_connections': SUPABASE_HTTP_MAX_CONNECTIONS,
+                'open_connections': len(connections),
+                'idle_connections': idle,
+                'active_connections': len(connections) - idle,
+                'utilisation': round((len(connections) - idle) / SUPABASE_HTTP_MAX_CONNECTIONS, 3),
+                'in_flight': self._in_flight,
+                'peak_in_flight': self._peak_in_flight,
+                'requests': self._requests,
+                'errors': self._errors,
+                'avg_request_ms': round(self._total_ms / self._requests, 3) if self._requests else 0.0
+            }
+
+
+# PostgREST operation of each HTTP method on a table
+POSTGREST_OPERATIONS = {
+    'GET': 'select',
+    'HEAD': 'count',
+    'POST': 'insert',
+    'PATCH': 'update',
+    'PUT': 'upsert',
+    'DELETE': 'delete'
+}
+
+
+def postgrest_call(request: httpx.Request) -> tuple:
+    """
+    Label a PostgREST request by what it does.
+
+    Returns:
+        tuple: (table, operation), e.g. ('forum_posts', 'select') or
+            ('toggle_post_upvote', 'rpc') for database functions
+    """
+    segments = request.url.path.rstrip('/').split('/')
+    if len(segments) >= 2 and segments[-2] == 'rpc':
+        return segments[-1], 'rpc'
+    return segments[-1] or 'unknown', POSTGREST_OPERATIONS.get(request.method, request.method.lower())
+
+
+def record_call(stats: PoolStats, request: httpx.Request, started_at: float, failed: bool) -> None:
+    """Record a finished request in the pool stats and the database call metrics"""
+    elapsed = stats.finished(started_at, failed)
+    observe_db_call('supabase', *postgrest_call(request), elapsed, failed)
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """Synchronous pooled transport that records ``PoolStats``"""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+        stats.pool = self._pool
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started_at = self.stats.started()
+        failed = True
+        try:
+            response = super().handle_request(request)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            record_call(self.stats, request, started_at, failed)
+
+
+class AsyncInstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Asynchronous pooled transport that records ``PoolStats``"""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+        stats.pool = self._pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started_at = self.stats.started()
+        failed = True
+        try:
+            response = await super().handle_async_request(request)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            record_call(self.stats, request, started_at, failed)
+
+
+def _transport_options() -> Dict:
+    """Keyword arguments shared by both transports"""
+    return {
+        'limits': pool_limits(),
+        'http2': http2_enabled(),
+        'retries': SUPABASE_HTTP_RETRIES
+    }
+
+
+def create_http_client(base_url: str, headers: Dict[str, str], stats: PoolStats) -> httpx.Client:
+    """
+    Build a pooled synchronous httpx client.
+
+    Args:
+        base_url (str): URL requests are relative to, e.g. the PostgREST endpoint
+        headers (Dict[str, str]): Headers sent with every request
+        stats (PoolStats): Counters the transport records into
+
+    Returns:
+        httpx.Client: Client using an ``InstrumentedTransport``
+    """
+    return httpx.Client(
+        base_url=base_url,
+        headers=headers,
+        timeout=request_timeout(),
+        transport=InstrumentedTransport(stats, **_transport_options())
+    )
+
+
+def create_async_http_client(base_url: str, headers: Dict[str, str], stats: PoolStats) -> httpx.AsyncClient:
+    """
+    Build a pooled asynchronous httpx client.
+
+    Args:
+        base_url (str): URL requests are relative to, e.g. the PostgREST endpoint
+        headers (Dict[str, str]): Headers sent with every request
+        stats (PoolStats): Counters the transport records into
+
+    Returns:
+        httpx.AsyncClient: Client using an ``AsyncInstrumentedTransport``
+    """
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        timeout=request_timeout(),
+        transport=AsyncInstrumentedTransport(stats, **_transport_options())
+    )
+
+
+def pool_settings() -> Dict:
+    """Effective transport settings, for diagnostics"""
+    return {
+        'max_connections': SUPABASE_HTTP_MAX_CONNECTIONS,
+        'max_keepalive_connections': SUPABASE_HTTP_MAX_KEEPALIVE,
+        'keepalive_expiry_seconds': SUPABASE_HTTP_KEEPALIVE_EXPIRY,
+        'http2': http2_enabled(),
+        'retries': SUPABASE_HTTP_RETRIES,
+        'timeouts': {
+            'connect': SUPABASE_CONNECT_TIMEOUT,
+            'read': SUPABASE_READ_TIMEOUT,
+            'write': SUPABASE_WRITE_TIMEOUT,
+            'pool': SUPABASE_POOL_TIMEOUT
+        }
+    }
@@ -0,0 +1,208 @@
+"""
+Off-thread application logging
+
+Request threads only put log records on an in-memory queue; a
+``QueueListener`` thread formats them and writes them out. Records are
+queued unformatted, so with %-style calls (``logger.info("... %s", value)``)
+the message string is only built on the listener thread, and never at all
+for records that are filtered out.
+
+- LOG_LEVEL: minimum level (default: INFO)
+- LOG_FORMAT: ``text`` (default) or ``json``, one object per line
+- LOG_SAMPLE_RATES: per-logger fraction of DEBUG/INFO records to keep,
+  e.g. ``api.forums.routes=0.1,api.forums.services=0.05``. A rate applies
+  to the named logger and its children; warnings and errors are never
+  sampled out.
+
+Author: StudyShare Team
+Version: 1.0.0
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()
+LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+
+# Records buffered for the listener; beyond this the oldest are dropped
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed with ``extra``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """
+    Parse ``logger=rate,...`` into a mapping.
+
+    Raises:
+        ValueError: If an entry is malformed or a rate is outside 0..1
+    """
+    rates = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, rate = entry.partition('=')
+        value = float(rate)
+        if not name or not 0 <= value <= 1:
+            raise ValueError(f"Invalid LOG_SAMPLE_RATES entry: {entry}")
+        rates[name.strip()] = value
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of low-severity records from chosen loggers"""
+
+    def __init__(self, rates: Dict[str, float], max_level: int = logging.INFO):
+        """
+        Args:
+            rates (Dict[str, float]): Fraction to keep per logger name prefix
+            max_level (int): Highest level that is sampled
+        """
+        super().__init__()
+        self.rates = rates
+        self.max_level = max_level
+        self._resolved: Dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        """Rate of the most specific configured logger covering ``name``"""
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition('.')[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1 or random.random() < rate
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, with any ``extra`` fields included"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.threadName
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+
+        if orjson is not None:
+            return orjson.dumps(entry, default=str).decode('utf-8')
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock handler formats here, on the logging thread. The queue
+        # never leaves the process, so the record can be passed as is.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block a request on logging; shed the oldest record instead
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                # Other threads refilled the freed slot; drop this record
+                pass
+
+
+def configure_logging(
+    level: str = LOG_LEVEL,
+    log_format: str = LOG_FORMAT,
+    sample_rates: str = LOG_SAMPLE_RATES
+) -> None:
+    """
+    Route the root logger through a queue to a background writer thread.
+
+    Safe to call more than once; later calls replace the configuration.
+
+    Args:
+        level (str): Minimum level name
+        log_format (str): 'text' or 'json'
+        sample_rates (str): LOG_SAMPLE_RATES-style sampling spec
+    """
+    global _listener
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JSONFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    records: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    handler = DeferredQueueHandler(records)
+    rates = parse_sample_rates(sample_rates)
+    if rates:
+        handler.addFilter(SamplingFilter(rates))
+
+    root = logging.getLogger()
+    if _listener is not None:
+        _listener.stop()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_in_child() -> None:
+    """Start a fresh listener in a forked child; the parent's thread is not copied"""
+    global _listener
+    if _listener is not None:
+        _listener = logging.handlers.QueueListener(
+            _listener.queue, *_listener.handlers, respect_handler_level=True
+        )
+        _listener.start()
+
+
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_restart_in_child)
@@ -0,0 +1,239 @@
+"""
+In-process metrics in the Prometheus text exposition format
+
+A small, dependency-free registry of counters, gauges and histograms. Each
+metric keeps one lock and a dictionary of label values, so recording is a
+dictionary lookup and, for histograms, a bisect into the bucket bounds;
+cheap enough to leave on for every request and database call.
+
+Metrics are per process: under gunicorn every worker exports its own
+series on /metrics, so scrape workers individually or aggregate with
+``sum without (instance)``.
+
+Author: StudyShare Team
+Version: 1.0.0
+"""
+
+import bisect
+import math
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+# Seconds; request latencies span sub-millisecond cache hits to slow queries
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text format"""
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value; integers without a decimal point"""
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Base class holding the name, help text, label names and lock"""
+
+    type_name = 'untyped'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        """
+        Args:
+            name (str): Metric name, e.g. 'http_requests_total'
+            documentation (str): HELP text
+            label_names (Sequence[str]): Names of the labels every sample carries
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _labels(self, label_values: LabelValues, extra: str = '') -> str:
+        """Render ``{name="value",...}`` for a sample"""
+        pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(self.label_names, label_values)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def samples(self) -> Iterable[str]:
+        """Sample lines of this metric"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """HELP, TYPE and sample lines"""
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self.samples()
+        ]
+
+
+class Counter(Metric):
+    """Monotonically increasing count per label set"""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Add to the count of one label set"""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Current count of one label set"""
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            yield f"{self.name}{self._labels(label_values)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down"""
+
+    type_name = 'gauge'
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        """Subtract from the value of one label set"""
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, *label_values: str, value: float) -> None:
+        """Set the value of one label set"""
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets, per label set"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = REQUEST_BUCKETS):
+        """
+        Args:
+            buckets (Sequence[float]): Ascending upper bounds; +Inf is implied
+        """
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record one value for a label set"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *label_values: str) -> int:
+        """Number of observations of one label set"""
+        with self._lock:
+            series = self._values.get(label_values)
+            return sum(series[0]) if series else 0
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._values.items())
+        for label_values, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{self._labels(label_values, le)} {cumulative}"
+            yield f"{self.name}_sum{self._labels(label_values)} {_format_value(total)}"
+            yield f"{self.name}_count{self._labels(label_values)} {cumulative}"
+
+
+class MetricsRegistry:
+    """The set of metrics exported together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric; registering a name twice returns the existing metric"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        """Create and register a counter"""
+        return self.register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        """Create and register a gauge"""
+        return self.register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = REQUEST_BUCKETS) -> Histogram:
+        """Create and register a histogram"""
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def get(self, name: str) -> Optional[Metric]:
+        """Look up a metric by name"""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Global registry for this process
+registry = MetricsRegistry()
+
+DB_QUERY_SECONDS = registry.histogram(
+    'db_query_duration_seconds',
+    'Time spent on each database call, by backend, table (or function) and operation',
+    ('backend', 'table', 'operation'),
+    DB_BUCKETS
+)
+DB_QUERY_ERRORS = registry.counter(
+    'db_query_errors_total',
+    'Database calls that failed, by backend, table (or function) and operation',
+    ('backend', 'table', 'operation')
+)
+
+
+def observe_db_call(backend: str, table: str, operation: str, seconds: float, failed: bool = False) -> None:
+    """
+    Record the duration of one database call.
+
+    Args:
+        backend (str): 'supabase' or 'sqlite'
+        table (str): Table, or database function for RPCs
+        operation (str): 'select', 'insert', 'update', 'delete', 'rpc', ...
+        seconds (float): Wall time of the call
+        failed (bool): Whether the call raised or returned a server error
+    """
+    if not METRICS_ENABLED:
+        return
+    DB_QUERY_SECONDS.observe(seconds, backend, table, operation)
+    if failed:
+        DB_QUERY_ERRORS.inc(backend, table, operation)
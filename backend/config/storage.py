@@ -0,0 +1,102 @@
+"""
+Storage backend selection
+
+STORAGE_BACKEND picks where forum data lives:
+
+- ``supabase`` (default): the Supabase Postgres database (``config.database``)
+- ``sqlite``: a local SQLite file at SQLITE_DATABASE_PATH, for benchmarks and
+  load tests without a Supabase project, or small single-host deployments
+
+Services use the ``storage`` object exported here. Like the Supabase client,
+the backend is only imported and created on first use.
+
+Author: StudyShare Team
+Version: 1.0.0
+"""
+
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from storage.base import Storage
+
+logger = logging.getLogger(__name__)
+
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'supabase').lower()
+
+STORAGE_BACKENDS = ('supabase', 'sqlite')
+
+_storage: Optional['Storage'] = None
+_storage_lock = threading.Lock()
+
+
+def create_storage(backend: str = STORAGE_BACKEND) -> 'Storage':
+    """
+    Create a storage backend.
+
+    Args:
+        backend (str): One of STORAGE_BACKENDS
+
+    Returns:
+        Storage: A new backend instance
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend == 'supabase':
+        from storage.supabase_storage import SupabaseStorage
+        return SupabaseStorage()
+    if backend == 'sqlite':
+        from storage.sqlite_storage import SQLiteStorage
+        return SQLiteStorage()
+    raise ValueError(f"STORAGE_BACKEND must be one of: {', '.join(STORAGE_BACKENDS)}")
+
+
+def get_storage() -> 'Storage':
+    """Get the configured storage backend, creating it on first use"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage()
+                logger.info("Using %s storage", _storage.name)
+    return _storage
+
+
+def configuration_error(backend: str = STORAGE_BACKEND) -> Optional[str]:
+    """
+    Check the storage configuration without connecting to anything.
+
+    Args:
+        backend (str): Backend to check
+
+    Returns:
+        Optional[str]: What is wrong, or None if the backend is usable
+    """
+    if backend not in STORAGE_BACKENDS:
+        return f"STORAGE_BACKEND must be one of: {', '.join(STORAGE_BACKENDS)}"
+    if backend == 'supabase':
+        from config.database import db_config
+        if not db_config.url or not db_config.service_key:
+            return "Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY"
+    return None
+
+
+def set_storage(backend: 'Storage') -> None:
+    """Replace the storage backend, e.g. with a SQLite file in benchmarks"""
+    global _storage
+    with _storage_lock:
+        _storage = backend
+
+
+class _StorageProxy:
+    """Stand-in for the configured backend that resolves it on attribute access"""
+
+    def __getattr__(self, name):
+        return getattr(get_storage(), name)
+
+
+# Export the storage backend for use in other modules
+storage: 'Storage' = _StorageProxy()
@@ -0,0 +1,12 @@
+"""
+pytest fixtures for the test scripts, which also run standalone
+"""
+import pytest
+
+from storage.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """An empty SQLite storage backend in a temporary directory"""
+    return SQLiteStorage(str(tmp_path / 'forum.sqlite3'))
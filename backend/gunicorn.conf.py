@@ -0,0 +1,33 @@
+"""
+Gunicorn configuration for the StudyShare API
+
+gevent workers serve each request on a greenlet, so long-lived SSE
+connections (GET /api/forums/stream) sit idle without holding an OS thread.
+Live events reach streams on every worker through the forum_events table
+(see api/forums/events.py), so any number of workers may serve them.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+"""
+import multiprocessing
+import os
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
+
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gevent'
+
+# Concurrent connections (including open event streams) per worker
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', '1000'))
+
+# Event streams stay open; only the heartbeat keeps them busy
+timeout = int(os.environ.get('WORKER_TIMEOUT', '60'))
+keepalive = 5
+
+
+def worker_exit(server, worker):
+    """Flush write-behind upvote counts and queued live events before a worker goes away"""
+    from api.forums.events import event_hub
+    from api.forums.upvote_aggregator import upvote_aggregator
+    upvote_aggregator.flush()
+    event_hub.flush()
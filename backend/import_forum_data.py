@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Bulk import forum posts and replies from a file
+
+Accepts newline-delimited JSON (.ndjson / .jsonl, streamed row by row) or a
+JSON document holding a list of rows or {"rows": [...]}. See
+api/forums/importer.py for the row format.
+
+Usage:
+    python import_forum_data.py data/fall-2024.ndjson [--batch-size N]
+"""
+import argparse
+import json
+import logging
+import sys
+
+from api.forums.importer import ForumImporter, read_ndjson, FORUM_IMPORT_BATCH_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', help="NDJSON or JSON file of post and reply rows")
+    parser.add_argument('--batch-size', type=int, default=FORUM_IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    try:
+        importer = ForumImporter(args.batch_size)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"📥 Importing {args.path} (batch size {args.batch_size})...")
+
+    with open(args.path, 'rb') as file:
+        if args.path.endswith(('.ndjson', '.jsonl')):
+            rows = read_ndjson(file)
+        else:
+            try:
+                data = json.load(file)
+            except ValueError as e:
+                parser.error(f"{args.path} is not valid JSON: {e}")
+            rows = data.get('rows') if isinstance(data, dict) else data
+            if not isinstance(rows, list):
+                parser.error(f"{args.path} must hold a list of rows or {{\"rows\": [...]}}")
+        result = importer.run(rows)
+
+    print(f"✅ Created {result['posts_created']} posts and {result['replies_created']} replies "
+          f"from {result['rows']} rows in {result['elapsed_ms'] / 1000:.2f}s "
+          f"({result['rows_per_second']} rows/s, {result['batches']} batches)")
+
+    if result['error_count']:
+        print(f"⚠️  {result['error_count']} rows failed:")
+        for error in result['errors']:
+            print(f"   row {error['row']}: {error['error']}")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Recount per-user dashboard statistics exactly
+
+Triggers keep user_stats current as posts, replies and upvotes are written;
+this recounts every user from the forum tables and fixes any counters that
+drifted (e.g. after rows were edited by hand or restored from a backup).
+Writes to the forum tables wait while it runs, so schedule it off-peak,
+e.g. nightly from cron.
+
+With UPVOTE_DURABILITY=batched, each worker buffers upvote deltas and adds
+them to upvotes_received when it flushes. Until then post_upvotes already
+counts them, so a recount would apply them twice; upvotes_received is left
+as stored in that mode. Pass --include-received to recount it anyway, only
+once no worker holds unflushed deltas (workers stopped, or switched to sync).
+
+Usage:
+    python reconcile_user_stats.py [--include-received]
+"""
+import argparse
+import logging
+import sys
+import time
+
+from config.storage import storage
+from api.forums.upvote_aggregator import DURABILITY_BATCHED, UPVOTE_DURABILITY
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--include-received', action='store_true',
+                        help="Recount upvotes_received even with UPVOTE_DURABILITY=batched")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    include_received = args.include_received or UPVOTE_DURABILITY != DURABILITY_BATCHED
+    print(f"🔄 Reconciling user stats ({storage.name} storage)...")
+    if not include_received:
+        print("⏭️  Upvotes are batched; leaving upvotes_received as stored")
+    start = time.perf_counter()
+    try:
+        corrected = storage.users.reconcile_stats(include_received)
+    except Exception as e:
+        print(f"❌ Reconcile failed: {e}")
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+    if corrected:
+        print(f"⚠️  Corrected {corrected} users' stats in {elapsed:.2f}s")
+    else:
+        print(f"✅ All user stats were exact ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -66,13 +66,413 @@ def create_post_upvotes_table():
         print(f"❌ Error creating post_upvotes table: {e}")
         return False
 
+def create_post_replies_table():
+    """Create the post_replies table"""
+    sql = """
+    CREATE TABLE IF NOT EXISTS post_replies (
+        id SERIAL PRIMARY KEY,
+        post_id INTEGER REFERENCES forum_posts(id) ON DELETE CASCADE,
+        user_id VARCHAR(255) NOT NULL,
+        user_name VARCHAR(255) NOT NULL,
+        content TEXT NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    );
+    """
+    
+    try:
+        result = supabase.rpc('exec_sql', {'sql': sql}).execute()
+        print("✅ Created post_replies table")
+        return True
+    except Exception as e:
+        print(f"❌ Error creating post_replies table: {e}")
+        return False
+
+def create_reply_stats():
+    """
+    Add denormalized reply_count / last_reply_at columns to forum_posts,
+    backfill them, and keep them in sync with a trigger on post_replies
+    """
+    statements = [
+        ('reply_count column', """
+        ALTER TABLE forum_posts ADD COLUMN IF NOT EXISTS reply_count INTEGER NOT NULL DEFAULT 0;
+        """),
+        ('last_reply_at column', """
+        ALTER TABLE forum_posts ADD COLUMN IF NOT EXISTS last_reply_at TIMESTAMP WITH TIME ZONE;
+        """),
+        ('sync_post_reply_stats function', """
+        CREATE OR REPLACE FUNCTION sync_post_reply_stats()
+        RETURNS TRIGGER
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE forum_posts
+                SET reply_count = reply_count + 1,
+                    last_reply_at = GREATEST(last_reply_at, NEW.created_at)
+                WHERE id = NEW.post_id;
+                RETURN NEW;
+            END IF;
+
+            UPDATE forum_posts
+            SET reply_count = GREATEST(reply_count - 1, 0),
+                last_reply_at = (SELECT MAX(created_at) FROM post_replies WHERE post_id = OLD.post_id)
+            WHERE id = OLD.post_id;
+            RETURN OLD;
+        END;
+        $$;
+        """),
+        ('trg_post_replies_stats trigger', """
+        DROP TRIGGER IF EXISTS trg_post_replies_stats ON post_replies;
+        CREATE TRIGGER trg_post_replies_stats
+        AFTER INSERT OR DELETE ON post_replies
+        FOR EACH ROW EXECUTE FUNCTION sync_post_reply_stats();
+        """),
+        ('reply stats backfill', """
+        UPDATE forum_posts p
+        SET reply_count = r.reply_count,
+            last_reply_at = r.last_reply_at
+        FROM (
+            SELECT post_id, COUNT(*) AS reply_count, MAX(created_at) AS last_reply_at
+            FROM post_replies
+            GROUP BY post_id
+        ) r
+        WHERE p.id = r.post_id;
+        """),
+    ]
+    
+    success = True
+    for name, sql in statements:
+        try:
+            supabase.rpc('exec_sql', {'sql': sql}).execute()
+            print(f"✅ Created {name}")
+        except Exception as e:
+            print(f"❌ Error creating {name}: {e}")
+            success = False
+    return success
+
+def create_search():
+    """
+    Create the full-text search document function and its GIN indexes.
+    
+    The tsvector is an indexed expression rather than a stored column so that
+    select('*') listings never ship it to clients.
+    """
+    statements = [
+        ('forum_search_document function', """
+        CREATE OR REPLACE FUNCTION forum_search_document(p_title TEXT, p_content TEXT)
+        RETURNS tsvector
+        LANGUAGE sql IMMUTABLE AS $$
+            SELECT setweight(to_tsvector('english', coalesce(p_title, '')), 'A')
+                || setweight(to_tsvector('english', coalesce(p_content, '')), 'B');
+        $$;
+        """),
+        ('idx_forum_posts_search index', """
+        CREATE INDEX IF NOT EXISTS idx_forum_posts_search ON forum_posts USING GIN (forum_search_document(title, content));
+        """),
+        ('idx_post_replies_search index', """
+        CREATE INDEX IF NOT EXISTS idx_post_replies_search ON post_replies USING GIN (forum_search_document(NULL, content));
+        """),
+    ]
+    
+    success = True
+    for name, sql in statements:
+        try:
+            supabase.rpc('exec_sql', {'sql': sql}).execute()
+            print(f"✅ Created {name}")
+        except Exception as e:
+            print(f"❌ Error creating {name}: {e}")
+            success = False
+    return success
+
+def create_hot_score():
+    """
+    Add the generated hot_score column to forum_posts.
+    
+    Postgres recomputes it whenever upvotes or reply_count change, so ranked
+    feeds stay current without a background job.
+    """
+    statements = [
+        ('forum_hot_score function', """
+        CREATE OR REPLACE FUNCTION forum_hot_score(p_upvotes INTEGER, p_reply_count INTEGER, p_created_at TIMESTAMP WITH TIME ZONE)
+        RETURNS DOUBLE PRECISION
+        LANGUAGE sql IMMUTABLE AS $$
+            -- log-scaled engagement plus creation time: a post needs 10x the
+            -- engagement to outrank one 12.5 hours newer, and scores never need
+            -- recomputing as posts age
+            SELECT LOG(GREATEST(COALESCE(p_upvotes, 0) + 2 * COALESCE(p_reply_count, 0), 1))
+                + (EXTRACT(EPOCH FROM p_created_at) - 1704067200) / 45000.0;
+        $$;
+        """),
+        ('hot_score column', """
+        ALTER TABLE forum_posts ADD COLUMN IF NOT EXISTS hot_score DOUBLE PRECISION
+            GENERATED ALWAYS AS (forum_hot_score(upvotes, reply_count, created_at)) STORED;
+        """),
+    ]
+    
+    success = True
+    for name, sql in statements:
+        try:
+            supabase.rpc('exec_sql', {'sql': sql}).execute()
+            print(f"✅ Created {name}")
+        except Exception as e:
+            print(f"❌ Error creating {name}: {e}")
+            success = False
+    return success
+
+def create_user_stats():
+    """
+    Create the user_stats table, the triggers that keep it in sync with
+    posts, replies and upvotes, and the reconcile function, then backfill it
+    """
+    statements = [
+        ('user_stats table', """
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id VARCHAR(255) PRIMARY KEY,
+            forum_posts INTEGER NOT NULL DEFAULT 0,
+            forum_replies INTEGER NOT NULL DEFAULT 0,
+            upvotes_received INTEGER NOT NULL DEFAULT 0,
+            upvotes_given INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        );
+        """),
+        ('bump_user_stats function', """
+        CREATE OR REPLACE FUNCTION bump_user_stats(
+            p_user_id VARCHAR,
+            p_posts INTEGER DEFAULT 0,
+            p_replies INTEGER DEFAULT 0,
+            p_received INTEGER DEFAULT 0,
+            p_given INTEGER DEFAULT 0
+        )
+        RETURNS VOID
+        -- Runs as the owner so triggers work for every role allowed to write the
+        -- forum tables, while clients can only read user_stats
+        LANGUAGE sql SECURITY DEFINER SET search_path = public AS $$
+            INSERT INTO user_stats AS s (user_id, forum_posts, forum_replies, upvotes_received, upvotes_given)
+            VALUES (p_user_id, GREATEST(p_posts, 0), GREATEST(p_replies, 0), GREATEST(p_received, 0), GREATEST(p_given, 0))
+            ON CONFLICT (user_id) DO UPDATE
+            SET forum_posts = GREATEST(s.forum_posts + p_posts, 0),
+                forum_replies = GREATEST(s.forum_replies + p_replies, 0),
+                upvotes_received = GREATEST(s.upvotes_received + p_received, 0),
+                upvotes_given = GREATEST(s.upvotes_given + p_given, 0),
+                updated_at = NOW();
+        $$;
+        """),
+        ('sync_user_post_stats function', """
+        CREATE OR REPLACE FUNCTION sync_user_post_stats()
+        RETURNS TRIGGER
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM bump_user_stats(NEW.user_id, p_posts => 1);
+                RETURN NEW;
+            END IF;
+
+            -- Before the delete, while the post's upvotes still exist: the cascade
+            -- removes them once the post is gone, when their owner can't be looked up
+            PERFORM bump_user_stats(
+                OLD.user_id,
+                p_posts => -1,
+                p_received => -(SELECT COUNT(*) FROM post_upvotes WHERE post_id = OLD.id)::INTEGER
+            );
+            RETURN OLD;
+        END;
+        $$;
+        """),
+        ('sync_user_reply_stats function', """
+        CREATE OR REPLACE FUNCTION sync_user_reply_stats()
+        RETURNS TRIGGER
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM bump_user_stats(NEW.user_id, p_replies => 1);
+                RETURN NEW;
+            END IF;
+
+            PERFORM bump_user_stats(OLD.user_id, p_replies => -1);
+            RETURN OLD;
+        END;
+        $$;
+        """),
+        ('sync_user_upvote_stats function', """
+        CREATE OR REPLACE FUNCTION sync_user_upvote_stats()
+        RETURNS TRIGGER
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            v_delta INTEGER := CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END;
+            v_vote post_upvotes%ROWTYPE;
+            v_owner VARCHAR;
+            v_row RECORD;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                v_vote := NEW;
+            ELSE
+                v_vote := OLD;
+            END IF;
+
+            -- In write-behind mode apply_upvote_deltas() counts the owner's
+            -- upvotes_received with the post's batch, off the toggle's path.
+            -- Otherwise the owner is missing only when the post itself is being
+            -- deleted (already counted there).
+            IF current_setting('forum.upvote_write_behind', true) IS DISTINCT FROM 'on' THEN
+                SELECT user_id INTO v_owner FROM forum_posts WHERE id = v_vote.post_id;
+            END IF;
+
+            -- Lock the voter's and owner's rows in user_id order, so votes between
+            -- the same two users in opposite directions can't deadlock
+            FOR v_row IN
+                SELECT b.user_id, SUM(b.received)::INTEGER AS received, SUM(b.given)::INTEGER AS given
+                FROM (VALUES (v_vote.user_id, 0, v_delta), (v_owner, v_delta, 0)) AS b(user_id, received, given)
+                WHERE b.user_id IS NOT NULL
+                GROUP BY b.user_id
+                ORDER BY b.user_id
+            LOOP
+                PERFORM bump_user_stats(v_row.user_id, p_received => v_row.received, p_given => v_row.given);
+            END LOOP;
+            RETURN v_vote;
+        END;
+        $$;
+        """),
+        ('user stats triggers', """
+        DROP TRIGGER IF EXISTS trg_forum_posts_user_stats_insert ON forum_posts;
+        CREATE TRIGGER trg_forum_posts_user_stats_insert
+        AFTER INSERT ON forum_posts
+        FOR EACH ROW EXECUTE FUNCTION sync_user_post_stats();
+
+        DROP TRIGGER IF EXISTS trg_forum_posts_user_stats_delete ON forum_posts;
+        CREATE TRIGGER trg_forum_posts_user_stats_delete
+        BEFORE DELETE ON forum_posts
+        FOR EACH ROW EXECUTE FUNCTION sync_user_post_stats();
+
+        DROP TRIGGER IF EXISTS trg_post_replies_user_stats ON post_replies;
+        CREATE TRIGGER trg_post_replies_user_stats
+        AFTER INSERT OR DELETE ON post_replies
+        FOR EACH ROW EXECUTE FUNCTION sync_user_reply_stats();
+
+        DROP TRIGGER IF EXISTS trg_post_upvotes_user_stats ON post_upvotes;
+        CREATE TRIGGER trg_post_upvotes_user_stats
+        AFTER INSERT OR DELETE ON post_upvotes
+        FOR EACH ROW EXECUTE FUNCTION sync_user_upvote_stats();
+        """),
+        ('reconcile_user_stats function', """
+        DROP FUNCTION IF EXISTS reconcile_user_stats();
+        CREATE OR REPLACE FUNCTION reconcile_user_stats(p_include_received BOOLEAN DEFAULT TRUE)
+        RETURNS INTEGER
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            v_upserted INTEGER;
+            v_zeroed INTEGER;
+        BEGIN
+            LOCK TABLE forum_posts, post_replies, post_upvotes IN SHARE MODE;
+
+            CREATE TEMP TABLE actual_user_stats ON COMMIT DROP AS
+            SELECT user_id,
+                   SUM(forum_posts)::INTEGER AS forum_posts,
+                   SUM(forum_replies)::INTEGER AS forum_replies,
+                   SUM(upvotes_received)::INTEGER AS upvotes_received,
+                   SUM(upvotes_given)::INTEGER AS upvotes_given
+            FROM (
+                SELECT user_id, COUNT(*) AS forum_posts, 0 AS forum_replies, 0 AS upvotes_received, 0 AS upvotes_given
+                FROM forum_posts GROUP BY user_id
+                UNION ALL
+                SELECT user_id, 0, COUNT(*), 0, 0 FROM post_replies GROUP BY user_id
+                UNION ALL
+                SELECT p.user_id, 0, 0, COUNT(*), 0
+                FROM post_upvotes u JOIN forum_posts p ON p.id = u.post_id GROUP BY p.user_id
+                UNION ALL
+                SELECT user_id, 0, 0, 0, COUNT(*) FROM post_upvotes GROUP BY user_id
+            ) counts
+            GROUP BY user_id;
+
+            IF NOT p_include_received THEN
+                UPDATE actual_user_stats a
+                SET upvotes_received = COALESCE((SELECT s.upvotes_received FROM user_stats s WHERE s.user_id = a.user_id), 0);
+            END IF;
+
+            INSERT INTO user_stats AS s (user_id, forum_posts, forum_replies, upvotes_received, upvotes_given)
+            SELECT user_id, forum_posts, forum_replies, upvotes_received, upvotes_given FROM actual_user_stats
+            ON CONFLICT (user_id) DO UPDATE
+            SET forum_posts = EXCLUDED.forum_posts,
+                forum_replies = EXCLUDED.forum_replies,
+                upvotes_received = EXCLUDED.upvotes_received,
+                upvotes_given = EXCLUDED.upvotes_given,
+                updated_at = NOW()
+            WHERE (s.forum_posts, s.forum_replies, s.upvotes_received, s.upvotes_given)
+                IS DISTINCT FROM (EXCLUDED.forum_posts, EXCLUDED.forum_replies, EXCLUDED.upvotes_received, EXCLUDED.upvotes_given);
+            GET DIAGNOSTICS v_upserted = ROW_COUNT;
+
+            UPDATE user_stats s
+            SET forum_posts = 0, forum_replies = 0, upvotes_received = 0, upvotes_given = 0, updated_at = NOW()
+            WHERE NOT EXISTS (SELECT 1 FROM actual_user_stats a WHERE a.user_id = s.user_id)
+              AND (s.forum_posts, s.forum_replies, s.upvotes_received, s.upvotes_given) <> (0, 0, 0, 0);
+            GET DIAGNOSTICS v_zeroed = ROW_COUNT;
+
+            DROP TABLE actual_user_stats;
+            RETURN v_upserted + v_zeroed;
+        END;
+        $$;
+        """),
+        ('user stats backfill', """
+        SELECT reconcile_user_stats();
+        """),
+    ]
+    
+    success = True
+    for name, sql in statements:
+        try:
+            supabase.rpc('exec_sql', {'sql': sql}).execute()
+            print(f"✅ Created {name}")
+        except Exception as e:
+            print(f"❌ Error creating {name}: {e}")
+            success = False
+    return success
+
+def create_forum_events():
+    """
+    Create the forum_events table that carries live updates between API
+    workers; only the service role can read it
+    """
+    statements = [
+        ('forum_events table', """
+        CREATE TABLE IF NOT EXISTS forum_events (
+            id BIGSERIAL PRIMARY KEY,
+            course VARCHAR(50) NOT NULL,
+            event_type VARCHAR(50) NOT NULL,
+            payload TEXT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+        );
+        """),
+        ('forum_events indexes', """
+        CREATE INDEX IF NOT EXISTS idx_forum_events_course ON forum_events(course, id);
+        CREATE INDEX IF NOT EXISTS idx_forum_events_created_at ON forum_events(created_at);
+        """),
+        ('forum_events row level security', """
+        ALTER TABLE forum_events ENABLE ROW LEVEL SECURITY;
+        """),
+    ]
+    
+    success = True
+    for name, sql in statements:
+        try:
+            supabase.rpc('exec_sql', {'sql': sql}).execute()
+            print(f"✅ Created {name}")
+        except Exception as e:
+            print(f"❌ Error creating {name}: {e}")
+            success = False
+    return success
+
 def create_indexes():
     """Create indexes for better performance"""
     indexes = [
         "CREATE INDEX IF NOT EXISTS idx_forum_posts_course ON forum_posts(course);",
         "CREATE INDEX IF NOT EXISTS idx_forum_posts_created_at ON forum_posts(created_at DESC);",
+        "CREATE INDEX IF NOT EXISTS idx_forum_posts_course_created_at ON forum_posts(course, created_at DESC, id DESC);",
+        "CREATE INDEX IF NOT EXISTS idx_forum_posts_course_upvotes ON forum_posts(course, upvotes DESC, id DESC);",
+        "CREATE INDEX IF NOT EXISTS idx_forum_posts_course_hot ON forum_posts(course, hot_score DESC, id DESC);",
         "CREATE INDEX IF NOT EXISTS idx_post_upvotes_post_id ON post_upvotes(post_id);",
-        "CREATE INDEX IF NOT EXISTS idx_post_upvotes_user_id ON post_upvotes(user_id);"
+        "CREATE INDEX IF NOT EXISTS idx_post_upvotes_user_id ON post_upvotes(user_id);",
+        "CREATE INDEX IF NOT EXISTS idx_post_replies_post_id ON post_replies(post_id);",
+        "CREATE INDEX IF NOT EXISTS idx_post_replies_created_at ON post_replies(created_at DESC);",
+        "CREATE INDEX IF NOT EXISTS idx_post_replies_post_created_at ON post_replies(post_id, created_at, id);"
     ]
     
     for index_sql in indexes:
@@ -82,6 +482,222 @@ def create_indexes():
         except Exception as e:
             print(f"❌ Error creating index: {e}")
 
+def create_functions():
+    """Create database functions used by the API"""
+    functions = {
+        'get_course_activity': """
+        CREATE OR REPLACE FUNCTION get_course_activity()
+        RETURNS TABLE (course VARCHAR, post_count BIGINT, recent_activity TIMESTAMP WITH TIME ZONE)
+        LANGUAGE sql STABLE AS $$
+            SELECT course, COUNT(*) AS post_count, MAX(created_at) AS recent_activity
+            FROM forum_posts
+            GROUP BY course;
+        $$;
+        """,
+        'list_course_posts': """
+        DROP FUNCTION IF EXISTS list_course_posts(VARCHAR, INTEGER, TIMESTAMP WITH TIME ZONE, INTEGER);
+        CREATE OR REPLACE FUNCTION list_course_posts(
+            p_course VARCHAR,
+            p_limit INTEGER,
+            p_sort TEXT DEFAULT 'new',
+            p_before_created_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+            p_before_score DOUBLE PRECISION DEFAULT NULL,
+            p_before_id INTEGER DEFAULT NULL
+        )
+        RETURNS SETOF forum_posts
+        LANGUAGE plpgsql STABLE AS $$
+        BEGIN
+            IF p_sort = 'top' THEN
+                RETURN QUERY
+                SELECT * FROM forum_posts
+                WHERE course = p_course
+                  AND (p_before_id IS NULL OR (upvotes, id) < (p_before_score::INTEGER, p_before_id))
+                ORDER BY upvotes DESC, id DESC
+                LIMIT p_limit;
+            ELSIF p_sort = 'hot' THEN
+                RETURN QUERY
+                SELECT * FROM forum_posts
+                WHERE course = p_course
+                  AND (p_before_id IS NULL OR (hot_score, id) < (p_before_score, p_before_id))
+                ORDER BY hot_score DESC, id DESC
+                LIMIT p_limit;
+            ELSE
+                RETURN QUERY
+                SELECT * FROM forum_posts
+                WHERE course = p_course
+                  AND (p_before_id IS NULL OR (created_at, id) < (p_before_created_at, p_before_id))
+                ORDER BY created_at DESC, id DESC
+                LIMIT p_limit;
+            END IF;
+        END;
+        $$;
+        """,
+        'list_post_replies': """
+        CREATE OR REPLACE FUNCTION list_post_replies(
+            p_post_id INTEGER,
+            p_limit INTEGER,
+            p_created_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+            p_id INTEGER DEFAULT NULL,
+            p_backward BOOLEAN DEFAULT FALSE
+        )
+        RETURNS SETOF post_replies
+        LANGUAGE sql STABLE AS $$
+            (SELECT * FROM post_replies
+             WHERE NOT p_backward AND post_id = p_post_id
+               AND (p_created_at IS NULL OR (created_at, id) > (p_created_at, p_id))
+             ORDER BY created_at, id
+             LIMIT p_limit)
+            UNION ALL
+            (SELECT * FROM post_replies
+             WHERE p_backward AND post_id = p_post_id
+               AND (p_created_at IS NULL OR (created_at, id) < (p_created_at, p_id))
+             ORDER BY created_at DESC, id DESC
+             LIMIT p_limit);
+        $$;
+        """,
+        'search_forum': """
+        CREATE OR REPLACE FUNCTION search_forum(
+            p_query TEXT,
+            p_course VARCHAR DEFAULT NULL,
+            p_limit INTEGER DEFAULT 20
+        )
+        RETURNS TABLE (
+            type TEXT,
+            id INTEGER,
+            post_id INTEGER,
+            course VARCHAR,
+            title TEXT,
+            snippet TEXT,
+            rank REAL,
+            created_at TIMESTAMP WITH TIME ZONE
+        )
+        LANGUAGE sql STABLE AS $$
+            WITH query AS (
+                SELECT websearch_to_tsquery('english', p_query) AS q
+            ),
+            matches AS (
+                SELECT 'post'::TEXT AS type, p.id, p.id AS post_id, p.course, p.title::TEXT AS title,
+                       p.content, ts_rank(forum_search_document(p.title, p.content), query.q) AS rank,
+                       p.created_at
+                FROM forum_posts p, query
+                WHERE forum_search_document(p.title, p.content) @@ query.q
+                  AND (p_course IS NULL OR p.course = p_course)
+                UNION ALL
+                SELECT 'reply'::TEXT, r.id, r.post_id, p.course, p.title::TEXT,
+                       r.content, ts_rank(forum_search_document(NULL, r.content), query.q),
+                       r.created_at
+                FROM post_replies r
+                JOIN forum_posts p ON p.id = r.post_id, query
+                WHERE forum_search_document(NULL, r.content) @@ query.q
+                  AND (p_course IS NULL OR p.course = p_course)
+                ORDER BY rank DESC, created_at DESC
+                LIMIT p_limit
+            )
+            -- Only the returned page pays for ts_headline. Matches are delimited by
+            -- U+E000/U+E001, not tags: the text is raw user input, and the storage
+            -- layer HTML-escapes it before turning the delimiters into <mark>
+            SELECT m.type, m.id, m.post_id, m.course,
+                   ts_headline('english', m.title, query.q,
+                       format('StartSel=%s, StopSel=%s, HighlightAll=true', chr(57344), chr(57345))),
+                   ts_headline('english', m.content, query.q,
+                       format('StartSel=%s, StopSel=%s, MaxWords=25, MinWords=10, MaxFragments=2', chr(57344), chr(57345))),
+                   m.rank, m.created_at
+            FROM matches m, query
+            ORDER BY m.rank DESC, m.created_at DESC;
+        $$;
+        """,
+        'toggle_post_upvote': """
+        DROP FUNCTION IF EXISTS toggle_post_upvote(INTEGER, VARCHAR);
+        CREATE OR REPLACE FUNCTION toggle_post_upvote(
+            p_post_id INTEGER,
+            p_user_id VARCHAR,
+            p_adjust_count BOOLEAN DEFAULT TRUE
+        )
+        RETURNS TABLE (upvoted BOOLEAN, upvotes INTEGER, course VARCHAR)
+        LANGUAGE plpgsql AS $$
+        #variable_conflict use_column
+        DECLARE
+            v_removed INTEGER;
+        BEGIN
+            -- Lock the post so concurrent toggles on it are serialized
+            PERFORM 1 FROM forum_posts WHERE id = p_post_id FOR UPDATE;
+            IF NOT FOUND THEN
+                RAISE EXCEPTION 'Post % not found', p_post_id USING ERRCODE = 'P0002';
+            END IF;
+
+            DELETE FROM post_upvotes WHERE post_id = p_post_id AND user_id = p_user_id;
+            GET DIAGNOSTICS v_removed = ROW_COUNT;
+
+            -- Read by sync_user_upvote_stats(); local to this transaction
+            PERFORM set_config('forum.upvote_write_behind', CASE WHEN p_adjust_count THEN 'off' ELSE 'on' END, true);
+
+            IF v_removed = 0 THEN
+                INSERT INTO post_upvotes (post_id, user_id) VALUES (p_post_id, p_user_id);
+            END IF;
+
+            IF NOT p_adjust_count THEN
+                -- Write-behind mode: the caller batches the count change
+                RETURN QUERY
+                SELECT v_removed = 0, upvotes, course FROM forum_posts WHERE id = p_post_id;
+            ELSIF v_removed > 0 THEN
+                RETURN QUERY
+                UPDATE forum_posts SET upvotes = GREATEST(upvotes - 1, 0)
+                WHERE id = p_post_id
+                RETURNING FALSE, upvotes, course;
+            ELSE
+                RETURN QUERY
+                UPDATE forum_posts SET upvotes = upvotes + 1
+                WHERE id = p_post_id
+                RETURNING TRUE, upvotes, course;
+            END IF;
+        END;
+        $$;
+        """,
+        'apply_upvote_deltas': """
+        CREATE OR REPLACE FUNCTION apply_upvote_deltas(p_deltas JSONB)
+        RETURNS INTEGER
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            v_updated INTEGER;
+            v_owner RECORD;
+        BEGIN
+            -- Lock the posts in id order, so flushes from several workers can't deadlock
+            PERFORM 1 FROM forum_posts
+            WHERE id IN (SELECT key::INTEGER FROM jsonb_object_keys(p_deltas) AS key)
+            ORDER BY id
+            FOR UPDATE;
+
+            UPDATE forum_posts p
+            SET upvotes = GREATEST(p.upvotes + d.delta::INTEGER, 0)
+            FROM jsonb_each_text(p_deltas) AS d(post_id, delta)
+            WHERE p.id = d.post_id::INTEGER;
+            GET DIAGNOSTICS v_updated = ROW_COUNT;
+
+            -- sync_user_upvote_stats() leaves these to the batch in write-behind
+            -- mode; bumped in user_id order like the trigger's rows
+            FOR v_owner IN
+                SELECT p.user_id, SUM(d.delta::INTEGER)::INTEGER AS delta
+                FROM jsonb_each_text(p_deltas) AS d(post_id, delta)
+                JOIN forum_posts p ON p.id = d.post_id::INTEGER
+                GROUP BY p.user_id
+                HAVING SUM(d.delta::INTEGER) <> 0
+                ORDER BY p.user_id
+            LOOP
+                PERFORM bump_user_stats(v_owner.user_id, p_received => v_owner.delta);
+            END LOOP;
+            RETURN v_updated;
+        END;
+        $$;
+        """,
+    }
+    
+    for name, function_sql in functions.items():
+        try:
+            supabase.rpc('exec_sql', {'sql': function_sql}).execute()
+            print(f"✅ Created function: {name}")
+        except Exception as e:
+            print(f"❌ Error creating function {name}: {e}")
+
 def test_tables():
     """Test that tables were created successfully"""
     try:
@@ -93,6 +709,10 @@ def test_tables():
         result = supabase.table('post_upvotes').select('*').limit(1).execute()
         print("✅ post_upvotes table is accessible")
         
+        # Test post_replies table
+        result = supabase.table('post_replies').select('*').limit(1).execute()
+        print("✅ post_replies table is accessible")
+        
         return True
     except Exception as e:
         print(f"❌ Error testing tables: {e}")
@@ -111,10 +731,42 @@ def main():
     if not create_post_upvotes_table():
         success = False
     
+    if not create_post_replies_table():
+        success = False
+    
+    # Denormalized reply stats on forum_posts
+    print("\n💬 Creating reply stats...")
+    if not create_reply_stats():
+        success = False
+    
+    # Hot ranking (after reply stats, which it depends on)
+    print("\n🔥 Creating hot ranking...")
+    if not create_hot_score():
+        success = False
+    
+    # Full-text search
+    print("\n🔎 Creating full-text search...")
+    if not create_search():
+        success = False
+    
+    # Denormalized per-user counters for the dashboard
+    print("\n📈 Creating user stats...")
+    if not create_user_stats():
+        success = False
+    
+    # Live updates shared by every API worker
+    print("\n📡 Creating live event log...")
+    if not create_forum_events():
+        success = False
+    
     # Create indexes
     print("\n📊 Creating indexes...")
     create_indexes()
     
+    # Create functions
+    print("\n⚙️  Creating functions...")
+    create_functions()
+    
     # Test tables
     print("\n🧪 Testing tables...")
     if not test_tables():
@@ -0,0 +1 @@
+# Storage backends package initialization
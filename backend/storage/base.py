@@ -0,0 +1,294 @@
+"""
+Storage interface for forum data
+
+Services read and write posts, replies, upvotes, users and live events
+through these repositories instead of a particular database client, so the
+same service code runs against Supabase in production and an embedded SQLite
+file for benchmarks, load tests and small deployments (see ``config.storage``).
+
+Rows are plain dictionaries with the columns of the Postgres schema, and
+timestamps are ISO 8601 strings, whichever backend produced them.
+"""
+
+import html
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# Counters kept per user in ``user_stats``
+USER_STAT_COLUMNS = ('forum_posts', 'forum_replies', 'upvotes_received', 'upvotes_given')
+
+
+# Private-use characters the database search functions put around matches in
+# place of tags, since the text around them is raw user input
+MATCH_START = '\ue000'
+MATCH_END = '\ue001'
+
+
+def highlighted_results(results: List[Dict]) -> List[Dict]:
+    """HTML-escape search results' title and snippet, then mark their matches with <mark>"""
+    for result in results:
+        for field in ('title', 'snippet'):
+            result[field] = html.escape(result.get(field) or '')\
+                .replace(MATCH_START, '<mark>')\
+                .replace(MATCH_END, '</mark>')
+    return results
+
+
+class PostNotFoundError(LookupError):
+    """Raised when an operation targets a post that does not exist"""
+
+
+class RowsRejectedError(Exception):
+    """Raised when the database refuses rows it was asked to write, e.g. for a constraint"""
+
+
+class PostRepository(ABC):
+    """Queries on ``forum_posts``"""
+
+    @abstractmethod
+    def list_for_course(
+        self,
+        course: str,
+        sort_column: str,
+        limit: int,
+        offset: int = 0,
+        position: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Get a page of a course's posts, highest ``sort_column`` first.
+
+        Args:
+            course (str): Course code
+            sort_column (str): 'created_at', 'upvotes' or 'hot_score'
+            limit (int): Maximum number of posts
+            offset (int): Posts to skip; ignored when position is given
+            position (Optional[Dict]): ``{sort_column: ..., 'id': ...}`` of the
+                last post already seen, to read the page after it by keyset
+
+        Returns:
+            List[Dict]: Posts in ``(sort_column, id)`` descending order
+        """
+
+    @abstractmethod
+    def get_course(self, post_id: int) -> Optional[str]:
+        """Get the course a post belongs to, or None if it does not exist"""
+
+    @abstractmethod
+    def create(self, post: Dict) -> Dict:
+        """Insert a post and return the stored row"""
+
+    @abstractmethod
+    def create_many(self, posts: List[Dict]) -> List[Dict]:
+        """
+        Insert posts in one statement; either all of them are stored or none.
+
+        Returns:
+            List[Dict]: The stored rows, in input order
+
+        Raises:
+            RowsRejectedError: If the database refused the rows
+        """
+
+    @abstractmethod
+    def count_for_course(self, course: str) -> int:
+        """Number of posts in a course"""
+
+    @abstractmethod
+    def latest_for_course(self, course: str) -> Optional[str]:
+        """Creation time of a course's newest post, or None without posts"""
+
+    @abstractmethod
+    def course_activity(self) -> List[Dict]:
+        """Post count and newest post time per course, as rows of course,
+        post_count and recent_activity; courses without posts are omitted"""
+
+    @abstractmethod
+    def list_for_user(self, user_id: str, limit: int) -> List[Dict]:
+        """A user's newest posts, newest first"""
+
+    @abstractmethod
+    def list_after(self, after_id: int, limit: int) -> List[Dict]:
+        """Posts with an ID above after_id in ID order, for full scans"""
+
+    @abstractmethod
+    def apply_upvote_deltas(self, deltas: Dict[int, int]) -> int:
+        """
+        Add a change to the upvote count of each post, never going below 0,
+        and to its author's upvotes_received unless the backend counted
+        those when the votes were toggled.
+
+        Returns:
+            int: Number of posts updated
+        """
+
+
+class ReplyRepository(ABC):
+    """Queries on ``post_replies``"""
+
+    @abstractmethod
+    def list_page(
+        self,
+        post_id: int,
+        limit: int,
+        position: Optional[Dict] = None,
+        backward: bool = False
+    ) -> Tuple[List[Dict], int]:
+        """
+        Get a page of a post's replies by keyset on ``(created_at, id)``.
+
+        Args:
+            post_id (int): The post
+            limit (int): Maximum number of replies
+            position (Optional[Dict]): ``{'created_at': ..., 'id': ...}`` of the
+                reply to start after (or before, when paging backward)
+            backward (bool): Read towards older replies, newest first
+
+        Returns:
+            Tuple[List[Dict], int]: (replies, the post's total reply count)
+        """
+
+    @abstractmethod
+    def create(self, reply: Dict) -> Dict:
+        """Insert a reply and return the stored row"""
+
+    @abstractmethod
+    def create_many(self, replies: List[Dict]) -> List[Dict]:
+        """
+        Insert replies in one statement and return the stored rows.
+
+        Raises:
+            RowsRejectedError: If the database refused the rows
+        """
+
+    @abstractmethod
+    def list_after(self, after_id: int, limit: int) -> List[Dict]:
+        """Replies with an ID above after_id in ID order, for full scans"""
+
+
+class UpvoteRepository(ABC):
+    """Queries on ``post_upvotes``"""
+
+    @abstractmethod
+    def toggle(self, post_id: int, user_id: str, adjust_count: bool = True) -> Dict:
+        """
+        Add the user's upvote on a post, or remove it if present, atomically.
+
+        Args:
+            post_id (int): The post
+            user_id (str): The voting user
+            adjust_count (bool): Also change ``forum_posts.upvotes`` in the
+                same transaction (False when counts are written behind)
+
+        Returns:
+            Dict: ``upvoted`` (the new state), ``upvotes`` (the post's stored
+                count) and ``course``
+
+        Raises:
+            PostNotFoundError: If the post does not exist
+        """
+
+    @abstractmethod
+    def has_upvoted(self, post_id: int, user_id: str) -> bool:
+        """Whether a user has upvoted a post"""
+
+    @abstractmethod
+    def upvoted_post_ids(self, post_ids: List[int], user_id: str) -> Set[int]:
+        """The subset of post_ids a user has upvoted"""
+
+
+class UserRepository(ABC):
+    """Queries on ``users`` and per-user activity"""
+
+    @abstractmethod
+    def get(self, clerk_user_id: str) -> Optional[Dict]:
+        """Get a user's profile, or None if there is none"""
+
+    @abstractmethod
+    def create(self, user: Dict) -> Optional[Dict]:
+        """Insert a profile and return the stored row"""
+
+    @abstractmethod
+    def update(self, clerk_user_id: str, changes: Dict) -> Optional[Dict]:
+        """Update a profile and return the stored row, or None if there is none"""
+
+    @abstractmethod
+    def stats(self, user_id: str) -> Dict[str, int]:
+        """
+        A user's counters from ``user_stats``: one row read, however much
+        the user has written. Database triggers keep them current.
+
+        Returns:
+            Dict[str, int]: USER_STAT_COLUMNS, all 0 for a user with no activity
+        """
+
+    @abstractmethod
+    def reconcile_stats(self, include_received: bool = True) -> int:
+        """
+        Recount every user's counters from the forum tables and fix any
+        that drifted.
+
+        Args:
+            include_received (bool): Recount ``upvotes_received`` too. Pass
+                False while upvotes are batched: deltas still buffered in a
+                worker are already in ``post_upvotes`` and would be counted
+                again when they flush.
+
+        Returns:
+            int: Number of users whose counters were corrected
+        """
+
+
+class EventRepository(ABC):
+    """Queries on ``forum_events``, the live update log every worker reads"""
+
+    @abstractmethod
+    def append_many(self, events: List[Dict]) -> None:
+        """Insert events (course, event_type and JSON-encoded payload) with one statement"""
+
+    @abstractmethod
+    def list_after(self, after_id: int, limit: int, course: Optional[str] = None) -> List[Dict]:
+        """Events with an ID above after_id in ID order, optionally only one course's"""
+
+    @abstractmethod
+    def latest_id(self) -> int:
+        """The highest event ID, or 0 if there are no events"""
+
+    @abstractmethod
+    def prune(self, before: str) -> int:
+        """Delete events created before an ISO 8601 timestamp and return how many"""
+
+
+class Storage(ABC):
+    """One storage backend: a repository per table plus forum search"""
+
+    name: str
+    posts: PostRepository
+    replies: ReplyRepository
+    upvotes: UpvoteRepository
+    users: UserRepository
+    events: EventRepository
+
+    @abstractmethod
+    def search(self, query: str, course: Optional[str], limit: int) -> List[Dict]:
+        """
+        Full-text search across posts and replies, best matches first.
+
+        Returns:
+            List[Dict]: Results with type ('post' or 'reply'), id, post_id,
+                course, title, snippet (HTML-escaped, matches wrapped in
+                ``<mark>``), rank and created_at
+        """
+
+    @abstractmethod
+    def ping(self) -> None:
+        """
+        Run the cheapest possible query against ``forum_posts``.
+
+        Raises:
+            Exception: Whatever the backend raises when it is unreachable
+        """
+
+    def metrics(self) -> Dict:
+        """Backend-specific diagnostics for /api/health/internals"""
+        return {'backend': self.name}
@@ -0,0 +1,823 @@
+"""
+SQLite storage backend
+
+Keeps the forum in a single local database file, for benchmarks and load
+tests without a Supabase project and for small single-host deployments. The
+schema mirrors create_tables_sql.sql: the same indexes back the same keyset
+queries, triggers maintain ``reply_count`` / ``last_reply_at`` and
+``user_stats``, ``hot_score`` is a stored generated column, and FTS5 tables replace the tsvector search.
+
+The file is opened in WAL mode, so readers never block the writer, and each
+thread (or greenlet) gets its own connection. Writes that must be atomic run
+in ``BEGIN IMMEDIATE`` transactions, which serialize them across processes.
+"""
+
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from config.metrics import observe_db_call
+from storage.base import (
+    USER_STAT_COLUMNS, MATCH_END, MATCH_START, PostNotFoundError, RowsRejectedError,
+    highlighted_results, PostRepository, ReplyRepository, UpvoteRepository, UserRepository, EventRepository, Storage
+)
+
+logger = logging.getLogger(__name__)
+
+SQLITE_DATABASE_PATH = os.getenv('SQLITE_DATABASE_PATH', 'studyshare.sqlite3')
+
+# Milliseconds a connection waits for another writer before failing
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+
+# Connections each process keeps open; further callers wait for one to be
+# returned (up to SQLITE_BUSY_TIMEOUT_MS)
+SQLITE_POOL_SIZE = int(os.getenv('SQLITE_POOL_SIZE', '8'))
+
+# Same constants as forum_hot_score() in create_tables_sql.sql
+HOT_SCORE_EPOCH = 1704067200
+HOT_SCORE_DECAY_SECONDS = 45000.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS forum_posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    course TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    user_name TEXT NOT NULL,
+    upvotes INTEGER NOT NULL DEFAULT 0,
+    reply_count INTEGER NOT NULL DEFAULT 0,
+    last_reply_at TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now')),
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now')),
+    hot_score REAL GENERATED ALWAYS AS (forum_hot_score(upvotes, reply_count, created_at)) STORED
+);
+
+CREATE TABLE IF NOT EXISTS post_upvotes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    post_id INTEGER NOT NULL REFERENCES forum_posts(id) ON DELETE CASCADE,
+    user_id TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now')),
+    UNIQUE(post_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS post_replies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    post_id INTEGER NOT NULL REFERENCES forum_posts(id) ON DELETE CASCADE,
+    user_id TEXT NOT NULL,
+    user_name TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now')),
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    clerk_user_id TEXT NOT NULL UNIQUE,
+    name TEXT,
+    email TEXT,
+    university TEXT,
+    major TEXT,
+    location TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now')),
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_forum_posts_course_created_at ON forum_posts(course, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_forum_posts_course_upvotes ON forum_posts(course, upvotes DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_forum_posts_course_hot ON forum_posts(course, hot_score DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_forum_posts_user_created_at ON forum_posts(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_post_upvotes_user_id ON post_upvotes(user_id, post_id);
+CREATE INDEX IF NOT EXISTS idx_post_replies_post_created_at ON post_replies(post_id, created_at, id);
+
+-- Keep forum_posts.reply_count / last_reply_at in sync with post_replies
+CREATE TRIGGER IF NOT EXISTS trg_post_replies_stats_insert
+AFTER INSERT ON post_replies
+BEGIN
+    UPDATE forum_posts
+    SET reply_count = reply_count + 1,
+        last_reply_at = CASE
+            WHEN last_reply_at IS NULL OR NEW.created_at > last_reply_at THEN NEW.created_at
+            ELSE last_reply_at
+        END
+    WHERE id = NEW.post_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_post_replies_stats_delete
+AFTER DELETE ON post_replies
+BEGIN
+    UPDATE forum_posts
+    SET reply_count = max(reply_count - 1, 0),
+        last_reply_at = (SELECT max(created_at) FROM post_replies WHERE post_id = OLD.post_id)
+    WHERE id = OLD.post_id;
+END;
+
+-- Per-user counters for the dashboard, kept in sync with posts, replies and upvotes
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id TEXT PRIMARY KEY,
+    forum_posts INTEGER NOT NULL DEFAULT 0,
+    forum_replies INTEGER NOT NULL DEFAULT 0,
+    upvotes_received INTEGER NOT NULL DEFAULT 0,
+    upvotes_given INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now'))
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_forum_posts_user_stats_insert AFTER INSERT ON forum_posts BEGIN
+    INSERT INTO user_stats (user_id, forum_posts) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET forum_posts = forum_posts + 1, updated_at = excluded.updated_at;
+END;
+
+-- Before the delete, while the post's upvotes still exist: the cascade removes
+-- them once the post is gone, when their owner can't be looked up
+CREATE TRIGGER IF NOT EXISTS trg_forum_posts_user_stats_delete BEFORE DELETE ON forum_posts BEGIN
+    UPDATE user_stats
+    SET forum_posts = max(forum_posts - 1, 0),
+        upvotes_received = max(upvotes_received - (SELECT count(*) FROM post_upvotes WHERE post_id = OLD.id), 0),
+        updated_at = strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now')
+    WHERE user_id = OLD.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_post_replies_user_stats_insert AFTER INSERT ON post_replies BEGIN
+    INSERT INTO user_stats (user_id, forum_replies) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET forum_replies = forum_replies + 1, updated_at = excluded.updated_at;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_post_replies_user_stats_delete AFTER DELETE ON post_replies BEGIN
+    UPDATE user_stats
+    SET forum_replies = max(forum_replies - 1, 0), updated_at = strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now')
+    WHERE user_id = OLD.user_id;
+END;
+
+-- Unlike Postgres, upvotes_received is counted here in write-behind mode too:
+-- writers are serialized anyway, so deferring it would not save any waiting
+CREATE TRIGGER IF NOT EXISTS trg_post_upvotes_user_stats_insert AFTER INSERT ON post_upvotes BEGIN
+    INSERT INTO user_stats (user_id, upvotes_given) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET upvotes_given = upvotes_given + 1, updated_at = excluded.updated_at;
+    INSERT INTO user_stats (user_id, upvotes_received)
+    SELECT user_id, 1 FROM forum_posts WHERE id = NEW.post_id
+    ON CONFLICT (user_id) DO UPDATE SET upvotes_received = upvotes_received + 1, updated_at = excluded.updated_at;
+END;
+
+-- The owner lookup finds nothing when the post itself is being deleted
+-- (already counted there)
+CREATE TRIGGER IF NOT EXISTS trg_post_upvotes_user_stats_delete AFTER DELETE ON post_upvotes BEGIN
+    UPDATE user_stats
+    SET upvotes_given = max(upvotes_given - 1, 0), updated_at = strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now')
+    WHERE user_id = OLD.user_id;
+    UPDATE user_stats
+    SET upvotes_received = max(upvotes_received - 1, 0), updated_at = strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now')
+    WHERE user_id = (SELECT user_id FROM forum_posts WHERE id = OLD.post_id);
+END;
+
+-- Live update log; every worker appends its events and polls for the others'
+CREATE TABLE IF NOT EXISTS forum_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_forum_events_course ON forum_events(course, id);
+CREATE INDEX IF NOT EXISTS idx_forum_events_created_at ON forum_events(created_at);
+
+-- Full-text search; the FTS tables index the base tables' text without copying it
+CREATE VIRTUAL TABLE IF NOT EXISTS forum_posts_fts USING fts5(
+    title, content, content='forum_posts', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS post_replies_fts USING fts5(
+    content, content='post_replies', content_rowid='id', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_forum_posts_fts_insert AFTER INSERT ON forum_posts BEGIN
+    INSERT INTO forum_posts_fts(rowid, title, content) VALUES (NEW.id, NEW.title, NEW.content);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_forum_posts_fts_delete AFTER DELETE ON forum_posts BEGIN
+    INSERT INTO forum_posts_fts(forum_posts_fts, rowid, title, content) VALUES ('delete', OLD.id, OLD.title, OLD.content);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_forum_posts_fts_update AFTER UPDATE OF title, content ON forum_posts BEGIN
+    INSERT INTO forum_posts_fts(forum_posts_fts, rowid, title, content) VALUES ('delete', OLD.id, OLD.title, OLD.content);
+    INSERT INTO forum_posts_fts(rowid, title, content) VALUES (NEW.id, NEW.title, NEW.content);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_post_replies_fts_insert AFTER INSERT ON post_replies BEGIN
+    INSERT INTO post_replies_fts(rowid, content) VALUES (NEW.id, NEW.content);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_post_replies_fts_delete AFTER DELETE ON post_replies BEGIN
+    INSERT INTO post_replies_fts(post_replies_fts, rowid, content) VALUES ('delete', OLD.id, OLD.content);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_post_replies_fts_update AFTER UPDATE OF content ON post_replies BEGIN
+    INSERT INTO post_replies_fts(post_replies_fts, rowid, content) VALUES ('delete', OLD.id, OLD.content);
+    INSERT INTO post_replies_fts(rowid, content) VALUES (NEW.id, NEW.content);
+END;
+"""
+
+# Columns callers may write, per table; anything else is rejected
+WRITABLE_COLUMNS = {
+    'forum_posts': {'title', 'content', 'course', 'user_id', 'user_name', 'upvotes', 'created_at'},
+    'post_replies': {'post_id', 'user_id', 'user_name', 'content', 'created_at'},
+    'users': {'clerk_user_id', 'name', 'email', 'university', 'major', 'location'}
+}
+
+TIMESTAMP_COLUMNS = ('created_at', 'updated_at', 'last_reply_at')
+
+# Matches are delimited with MATCH_START / MATCH_END, which highlighted_results()
+# turns into <mark> after escaping the user text around them
+SEARCH_SQL = """
+SELECT type, id, post_id, course, title, snippet, rank, created_at FROM (
+    SELECT 'post' AS type, p.id, p.id AS post_id, p.course,
+           highlight(forum_posts_fts, 0, :start, :end) AS title,
+           snippet(forum_posts_fts, 1, :start, :end, '...', 25) AS snippet,
+           -bm25(forum_posts_fts, 2.0, 1.0) AS rank, p.created_at
+    FROM forum_posts_fts
+    JOIN forum_posts p ON p.id = forum_posts_fts.rowid
+    WHERE forum_posts_fts MATCH :query AND (:course IS NULL OR p.course = :course)
+    UNION ALL
+    SELECT 'reply', r.id, r.post_id, p.course, p.title,
+           snippet(post_replies_fts, 0, :start, :end, '...', 25),
+           -bm25(post_replies_fts), r.created_at
+    FROM post_replies_fts
+    JOIN post_replies r ON r.id = post_replies_fts.rowid
+    JOIN forum_posts p ON p.id = r.post_id
+    WHERE post_replies_fts MATCH :query AND (:course IS NULL OR p.course = :course)
+)
+ORDER BY rank DESC, created_at DESC
+LIMIT :limit
+"""
+
+# Exact recount of user_stats; run in one write transaction by reconcile_stats
+RECONCILE_USER_STATS_SQL = ("""
+CREATE TEMP TABLE actual_user_stats AS
+SELECT user_id,
+       sum(forum_posts) AS forum_posts,
+       sum(forum_replies) AS forum_replies,
+       sum(upvotes_received) AS upvotes_received,
+       sum(upvotes_given) AS upvotes_given
+FROM (
+    SELECT user_id, count(*) AS forum_posts, 0 AS forum_replies, 0 AS upvotes_received, 0 AS upvotes_given
+    FROM forum_posts GROUP BY user_id
+    UNION ALL
+    SELECT user_id, 0, count(*), 0, 0 FROM post_replies GROUP BY user_id
+    UNION ALL
+    SELECT p.user_id, 0, 0, count(*), 0 FROM post_upvotes u JOIN forum_posts p ON p.id = u.post_id GROUP BY p.user_id
+    UNION ALL
+    SELECT user_id, 0, 0, 0, count(*) FROM post_upvotes GROUP BY user_id
+)
+GROUP BY user_id
+""", """
+INSERT INTO user_stats (user_id, forum_posts, forum_replies, upvotes_received, upvotes_given)
+SELECT user_id, forum_posts, forum_replies, upvotes_received, upvotes_given FROM actual_user_stats WHERE true
+ON CONFLICT (user_id) DO UPDATE
+SET forum_posts = excluded.forum_posts,
+    forum_replies = excluded.forum_replies,
+    upvotes_received = excluded.upvotes_received,
+    upvotes_given = excluded.upvotes_given,
+    updated_at = excluded.updated_at
+WHERE (forum_posts, forum_replies, upvotes_received, upvotes_given)
+    <> (excluded.forum_posts, excluded.forum_replies, excluded.upvotes_received, excluded.upvotes_given)
+""", """
+UPDATE user_stats
+SET forum_posts = 0, forum_replies = 0, upvotes_received = 0, upvotes_given = 0,
+    updated_at = strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now')
+WHERE user_id NOT IN (SELECT user_id FROM actual_user_stats)
+  AND (forum_posts, forum_replies, upvotes_received, upvotes_given) <> (0, 0, 0, 0)
+""", """
+DROP TABLE actual_user_stats
+""")
+
+# Run after the recount when upvotes_received is left as stored
+KEEP_UPVOTES_RECEIVED_SQL = """
+UPDATE actual_user_stats
+SET upvotes_received = coalesce(
+    (SELECT upvotes_received FROM user_stats s WHERE s.user_id = actual_user_stats.user_id), 0
+)
+"""
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp, treating a missing offset as UTC"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def normalize_timestamp(value: Optional[str]) -> Optional[str]:
+    """
+    Convert an ISO 8601 timestamp to UTC with microseconds.
+
+    Timestamps are stored as text, so they must share one format for keyset
+    comparisons and ORDER BY to follow time order.
+    """
+    if value is None:
+        return None
+    return parse_timestamp(value).astimezone(timezone.utc).isoformat(timespec='microseconds')
+
+
+def forum_hot_score(upvotes: Optional[int], reply_count: Optional[int], created_at: Optional[str]) -> Optional[float]:
+    """Python twin of the ``forum_hot_score`` database function"""
+    if created_at is None:
+        return None
+    engagement = max((upvotes or 0) + 2 * (reply_count or 0), 1)
+    age = parse_timestamp(created_at).timestamp() - HOT_SCORE_EPOCH
+    return math.log10(engagement) + age / HOT_SCORE_DECAY_SECONDS
+
+
+def fts_query(query: str) -> str:
+    """
+    Turn a free-text query into an FTS5 expression matching every term.
+
+    Quoted phrases are kept as phrases; everything else is split into words,
+    so user input can never be parsed as FTS5 syntax.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\w+)', query):
+        text = ' '.join(re.findall(r'\w+', phrase)) if phrase else word
+        if text:
+            terms.append(f'"{text}"')
+    return ' '.join(terms)
+
+
+@lru_cache(maxsize=256)
+def sql_call(sql: str) -> tuple:
+    """Label a statement by its first table and its verb, for the query metrics"""
+    target = re.search(r'\b(?:FROM|INTO|UPDATE)\s+(\w+)', sql, re.IGNORECASE)
+    return target.group(1) if target else 'unknown', sql.split(None, 1)[0].lower()
+
+
+class SQLiteDatabase:
+    """A bounded pool of connections to one SQLite file, opened on first use"""
+
+    def __init__(self, path: str, pool_size: int = SQLITE_POOL_SIZE):
+        """
+        Initialize the database. The schema is created by the first connection.
+
+        Args:
+            path (str): Database file, created if missing
+            pool_size (int): Most connections open at once in this process
+        """
+        self.path = path
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self._reset_pool()
+
+    def _reset_pool(self) -> None:
+        """Start with no connections, in a new process or a new database"""
+        self._pid = os.getpid()
+        self._idle: List[sqlite3.Connection] = []
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._connections = 0
+        self._in_use = 0
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a pooled connection for the duration of the block.
+
+        Connections are shared by whichever thread or greenlet borrows them
+        next, so a gevent worker opens at most pool_size of them however many
+        requests it serves.
+
+        Raises:
+            sqlite3.OperationalError: If none is returned within SQLITE_BUSY_TIMEOUT_MS
+        """
+        if self._pid != os.getpid():
+            # A forked worker must open its own connections
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset_pool()
+
+        slots = self._slots
+        if not slots.acquire(timeout=SQLITE_BUSY_TIMEOUT_MS / 1000):
+            raise sqlite3.OperationalError(f"All {self.pool_size} SQLite connections are busy")
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._connect()
+            with self._lock:
+                self._in_use += 1
+            try:
+                yield conn
+            finally:
+                self._release(conn, slots)
+        finally:
+            slots.release()
+
+    def _release(self, conn: sqlite3.Connection, slots: threading.BoundedSemaphore) -> None:
+        """Return a borrowed connection to the pool, or close it if it can't be reused"""
+        if slots is not self._slots:
+            # Borrowed before a fork reset the pool; leave it to the parent
+            return
+
+        reusable = True
+        if conn.in_transaction:
+            # Left mid-transaction (e.g. ROLLBACK itself failed)
+            try:
+                conn.execute('ROLLBACK')
+            except sqlite3.Error:
+                reusable = False
+
+        with self._lock:
+            self._in_use -= 1
+            if reusable:
+                self._idle.append(conn)
+                return
+            self._connections -= 1
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a connection, creating the schema if needed"""
+        # Autocommit; write transactions are opened explicitly by ``transaction``
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.create_function('forum_hot_score', 3, forum_hot_score, deterministic=True)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute('PRAGMA foreign_keys = ON')
+        conn.execute(f'PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}')
+        conn.execute('PRAGMA temp_store = MEMORY')
+
+        with self._lock:
+            if not self._schema_ready:
+                has_user_stats = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_stats'"
+                ).fetchone()
+                conn.executescript(SCHEMA)
+                if not has_user_stats:
+                    # A file from before user_stats existed; count its history once
+                    conn.execute('BEGIN IMMEDIATE')
+                    self._reconcile_user_stats(conn)
+                    conn.execute('COMMIT')
+                self._schema_ready = True
+                logger.info("✅ SQLite database ready at %s", self.path)
+            self._connections += 1
+        return conn
+
+    @contextmanager
+    def transaction(self, table: str, operation: str) -> Iterator[sqlite3.Connection]:
+        """
+        Run statements in a write transaction, rolling back on error.
+
+        Args:
+            table (str): Main table written, for the query metrics
+            operation (str): What the transaction does, e.g. 'insert'
+        """
+        start = time.perf_counter()
+        with self.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                observe_db_call('sqlite', table, operation, time.perf_counter() - start, failed=True)
+                raise
+            conn.execute('COMMIT')
+        observe_db_call('sqlite', table, operation, time.perf_counter() - start)
+
+    def query(self, sql: str, params=()) -> List[Dict]:
+        """Run a read and return its rows as dictionaries"""
+        start = time.perf_counter()
+        try:
+            with self.connection() as conn:
+                rows = [dict(row) for row in conn.execute(sql, params)]
+        except Exception:
+            observe_db_call('sqlite', *sql_call(sql), time.perf_counter() - start, failed=True)
+            raise
+        observe_db_call('sqlite', *sql_call(sql), time.perf_counter() - start)
+        return rows
+
+    def query_one(self, sql: str, params=()) -> Optional[Dict]:
+        """Run a read and return its first row, or None"""
+        rows = self.query(sql, params)
+        return rows[0] if rows else None
+
+    def insert(self, conn: sqlite3.Connection, table: str, row: Dict) -> Dict:
+        """
+        Insert one row and return it as stored.
+
+        Raises:
+            ValueError: If the row has a column callers may not write
+        """
+        unknown = set(row) - WRITABLE_COLUMNS[table]
+        if unknown:
+            raise ValueError(f"Unknown column(s) for {table}: {', '.join(sorted(unknown))}")
+
+        values = {
+            column: normalize_timestamp(value) if column in TIMESTAMP_COLUMNS else value
+            for column, value in row.items()
+        }
+        columns = ', '.join(values)
+        placeholders = ', '.join(f':{column}' for column in values)
+        sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) RETURNING *"
+        return dict(conn.execute(sql, values).fetchone())
+
+    def reconcile_user_stats(self, include_received: bool = True) -> int:
+        """
+        Recount ``user_stats`` from the forum tables and fix drifted rows.
+
+        Runs in one write transaction, so no trigger update can slip in
+        between the count and the fix.
+
+        Args:
+            include_received (bool): Recount ``upvotes_received`` too, rather
+                than keeping the stored counts
+
+        Returns:
+            int: Number of rows corrected
+        """
+        with self.transaction('user_stats', 'reconcile') as conn:
+            return self._reconcile_user_stats(conn, include_received)
+
+    @staticmethod
+    def _reconcile_user_stats(conn: sqlite3.Connection, include_received: bool = True) -> int:
+        """Run the reconcile statements on a connection inside a transaction"""
+        recount, *fixes = RECONCILE_USER_STATS_SQL
+        conn.execute(recount)
+        if not include_received:
+            conn.execute(KEEP_UPVOTES_RECEIVED_SQL)
+        return sum(max(conn.execute(sql).rowcount, 0) for sql in fixes)
+
+    def metrics(self) -> Dict:
+        """File size, journal mode and pooled connections"""
+        with self.connection() as conn:
+            page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+            page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+            journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        return {
+            'path': os.path.abspath(self.path),
+            'journal_mode': journal_mode,
+            'size_bytes': page_count * page_size,
+            'connections': self._connections,
+            'connections_in_use': self._in_use,
+            'pool_size': self.pool_size
+        }
+
+
+class SQLitePostRepository(PostRepository):
+    """``forum_posts`` in SQLite"""
+
+    # Sort columns are interpolated into SQL, so only these are accepted
+    SORT_COLUMNS = ('created_at', 'upvotes', 'hot_score')
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    def list_for_course(self, course, sort_column, limit, offset=0, position=None):
+        if sort_column not in self.SORT_COLUMNS:
+            raise ValueError(f"Cannot sort posts by {sort_column}")
+
+        if position:
+            return self.db.query(
+                f"SELECT * FROM forum_posts WHERE course = ? AND ({sort_column}, id) < (?, ?) "
+                f"ORDER BY {sort_column} DESC, id DESC LIMIT ?",
+                (course, position[sort_column], position['id'], limit)
+            )
+        return self.db.query(
+            f"SELECT * FROM forum_posts WHERE course = ? ORDER BY {sort_column} DESC, id DESC LIMIT ? OFFSET ?",
+            (course, limit, offset)
+        )
+
+    def get_course(self, post_id):
+        row = self.db.query_one("SELECT course FROM forum_posts WHERE id = ?", (post_id,))
+        return row['course'] if row else None
+
+    def create(self, post):
+        with self.db.transaction('forum_posts', 'insert') as conn:
+            return self.db.insert(conn, 'forum_posts', post)
+
+    def create_many(self, posts):
+        try:
+            with self.db.transaction('forum_posts', 'insert') as conn:
+                return [self.db.insert(conn, 'forum_posts', post) for post in posts]
+        except sqlite3.IntegrityError as e:
+            raise RowsRejectedError(str(e)) from e
+
+    def count_for_course(self, course):
+        return self.db.query_one("SELECT count(*) AS n FROM forum_posts WHERE course = ?", (course,))['n']
+
+    def latest_for_course(self, course):
+        row = self.db.query_one(
+            "SELECT created_at FROM forum_posts WHERE course = ? ORDER BY created_at DESC LIMIT 1", (course,)
+        )
+        return row['created_at'] if row else None
+
+    def course_activity(self):
+        return self.db.query(
+            "SELECT course, count(*) AS post_count, max(created_at) AS recent_activity "
+            "FROM forum_posts GROUP BY course"
+        )
+
+    def list_for_user(self, user_id, limit):
+        return self.db.query(
+            "SELECT * FROM forum_posts WHERE user_id = ? ORDER BY created_at DESC LIMIT ?", (user_id, limit)
+        )
+
+    def list_after(self, after_id, limit):
+        return self.db.query("SELECT * FROM forum_posts WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit))
+
+    def apply_upvote_deltas(self, deltas):
+        with self.db.transaction('forum_posts', 'update') as conn:
+            cursor = conn.executemany(
+                "UPDATE forum_posts SET upvotes = max(upvotes + ?, 0) WHERE id = ?",
+                [(delta, post_id) for post_id, delta in deltas.items()]
+            )
+            return cursor.rowcount
+
+
+class SQLiteReplyRepository(ReplyRepository):
+    """``post_replies`` in SQLite"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    def list_page(self, post_id, limit, position=None, backward=False):
+        if position is None:
+            replies = self.db.query(
+                "SELECT * FROM post_replies WHERE post_id = ? ORDER BY created_at, id LIMIT ?", (post_id, limit)
+            )
+        elif backward:
+            replies = self.db.query(
+                "SELECT * FROM post_replies WHERE post_id = ? AND (created_at, id) < (?, ?) "
+                "ORDER BY created_at DESC, id DESC LIMIT ?",
+                (post_id, position['created_at'], position['id'], limit)
+            )
+        else:
+            replies = self.db.query(
+                "SELECT * FROM post_replies WHERE post_id = ? AND (created_at, id) > (?, ?) "
+                "ORDER BY created_at, id LIMIT ?",
+                (post_id, position['created_at'], position['id'], limit)
+            )
+
+        post = self.db.query_one("SELECT reply_count FROM forum_posts WHERE id = ?", (post_id,))
+        return replies, post['reply_count'] if post else 0
+
+    def create(self, reply):
+        with self.db.transaction('post_replies', 'insert') as conn:
+            return self.db.insert(conn, 'post_replies', reply)
+
+    def create_many(self, replies):
+        try:
+            with self.db.transaction('post_replies', 'insert') as conn:
+                return [self.db.insert(conn, 'post_replies', reply) for reply in replies]
+        except sqlite3.IntegrityError as e:
+            raise RowsRejectedError(str(e)) from e
+
+    def list_after(self, after_id, limit):
+        return self.db.query("SELECT * FROM post_replies WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit))
+
+
+class SQLiteUpvoteRepository(UpvoteRepository):
+    """``post_upvotes`` in SQLite"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    def toggle(self, post_id, user_id, adjust_count=True):
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent toggles
+        # are serialized like the row lock in toggle_post_upvote()
+        with self.db.transaction('post_upvotes', 'toggle') as conn:
+            post = conn.execute("SELECT upvotes, course FROM forum_posts WHERE id = ?", (post_id,)).fetchone()
+            if post is None:
+                raise PostNotFoundError(f"Post {post_id} not found")
+
+            removed = conn.execute(
+                "DELETE FROM post_upvotes WHERE post_id = ? AND user_id = ?", (post_id, user_id)
+            ).rowcount
+            if not removed:
+                conn.execute("INSERT INTO post_upvotes (post_id, user_id) VALUES (?, ?)", (post_id, user_id))
+
+            if adjust_count:
+                post = conn.execute(
+                    "UPDATE forum_posts SET upvotes = max(upvotes + ?, 0) WHERE id = ? RETURNING upvotes, course",
+                    (-1 if removed else 1, post_id)
+                ).fetchone()
+
+            return {'upvoted': not removed, 'upvotes': post['upvotes'], 'course': post['course']}
+
+    def has_upvoted(self, post_id, user_id):
+        return self.db.query_one(
+            "SELECT 1 AS upvoted FROM post_upvotes WHERE post_id = ? AND user_id = ?", (post_id, user_id)
+        ) is not None
+
+    def upvoted_post_ids(self, post_ids, user_id):
+        if not post_ids:
+            return set()
+
+        placeholders = ', '.join('?' for _ in post_ids)
+        rows = self.db.query(
+            f"SELECT post_id FROM post_upvotes WHERE user_id = ? AND post_id IN ({placeholders})",
+            (user_id, *post_ids)
+        )
+        return {row['post_id'] for row in rows}
+
+
+class SQLiteUserRepository(UserRepository):
+    """``users`` in SQLite"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    def get(self, clerk_user_id):
+        return self.db.query_one("SELECT * FROM users WHERE clerk_user_id = ?", (clerk_user_id,))
+
+    def create(self, user):
+        with self.db.transaction('users', 'insert') as conn:
+            return self.db.insert(conn, 'users', user)
+
+    def update(self, clerk_user_id, changes):
+        unknown = set(changes) - WRITABLE_COLUMNS['users']
+        if unknown:
+            raise ValueError(f"Unknown column(s) for users: {', '.join(sorted(unknown))}")
+        if not changes:
+            return self.get(clerk_user_id)
+
+        assignments = ', '.join(f"{column} = :{column}" for column in changes)
+        with self.db.transaction('users', 'update') as conn:
+            row = conn.execute(
+                f"UPDATE users SET {assignments}, updated_at = strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now') "
+                f"WHERE clerk_user_id = :clerk_user_id_key RETURNING *",
+                {**changes, 'clerk_user_id_key': clerk_user_id}
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def stats(self, user_id):
+        row = self.db.query_one(
+            'SELECT forum_posts, forum_replies, upvotes_received, upvotes_given FROM user_stats WHERE user_id = ?',
+            (user_id,)
+        )
+        return row or dict.fromkeys(USER_STAT_COLUMNS, 0)
+
+    def reconcile_stats(self, include_received=True):
+        return self.db.reconcile_user_stats(include_received)
+
+
+class SQLiteEventRepository(EventRepository):
+    """``forum_events`` in SQLite"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    def append_many(self, events):
+        with self.db.transaction('forum_events', 'insert') as conn:
+            conn.executemany(
+                "INSERT INTO forum_events (course, event_type, payload) VALUES (:course, :event_type, :payload)",
+                events
+            )
+
+    def list_after(self, after_id, limit, course=None):
+        if course is not None:
+            return self.db.query(
+                "SELECT * FROM forum_events WHERE course = ? AND id > ? ORDER BY id LIMIT ?", (course, after_id, limit)
+            )
+        return self.db.query("SELECT * FROM forum_events WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit))
+
+    def latest_id(self):
+        return self.db.query_one("SELECT coalesce(max(id), 0) AS id FROM forum_events")['id']
+
+    def prune(self, before):
+        with self.db.transaction('forum_events', 'delete') as conn:
+            return conn.execute(
+                "DELETE FROM forum_events WHERE created_at < ?", (normalize_timestamp(before),)
+            ).rowcount
+
+
+class SQLiteStorage(Storage):
+    """Forum data in a local SQLite file"""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str = SQLITE_DATABASE_PATH):
+        """
+        Initialize the storage. Nothing is opened until the first query.
+
+        Args:
+            path (str): Database file, created with the schema if missing
+        """
+        self.db = SQLiteDatabase(path)
+        self.posts = SQLitePostRepository(self.db)
+        self.replies = SQLiteReplyRepository(self.db)
+        self.upvotes = SQLiteUpvoteRepository(self.db)
+        self.users = SQLiteUserRepository(self.db)
+        self.events = SQLiteEventRepository(self.db)
+
+    def search(self, query, course, limit):
+        expression = fts_query(query)
+        if not expression:
+            return []
+        return highlighted_results(self.db.query(SEARCH_SQL, {
+            'query': expression, 'course': course, 'limit': limit, 'start': MATCH_START, 'end': MATCH_END
+        }))
+
+    def ping(self):
+        self.db.query('SELECT id FROM forum_posts LIMIT 1')
+
+    def metrics(self):
+        return {'backend': self.name, **self.db.metrics()}
@@ -0,0 +1,322 @@
+"""
+Supabase storage backend
+
+Queries go through PostgREST on the shared ``supabase`` client, with the
+multi-statement operations (keyset pages, upvote toggles, search) done by the
+database functions in create_tables_sql.sql. Where a response needs several
+independent queries they are gathered on ``async_db`` so it costs one round
+trip rather than one per query.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from config.async_database import async_db, run_async
+from config.database import supabase, db_config
+from storage.base import (
+    USER_STAT_COLUMNS, PostNotFoundError, RowsRejectedError, highlighted_results, PostRepository, ReplyRepository, UpvoteRepository, UserRepository, EventRepository, Storage
+)
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE raised by database functions when the target post does not exist
+POST_NOT_FOUND_ERRCODE = 'P0002'
+
+
+def insert_rows(table: str, rows: List[Dict]) -> List[Dict]:
+    """
+    Insert rows with one request and return the stored rows.
+
+    Raises:
+        RowsRejectedError: If the database refused the rows; transport
+            errors (timeouts, dropped connections) are raised unchanged
+    """
+    # Deferred like the client itself: postgrest dominates import time
+    from postgrest.exceptions import APIError
+
+    try:
+        return supabase.table(table).insert(rows).execute().data or []
+    except APIError as e:
+        raise RowsRejectedError(e.message or str(e)) from e
+
+
+class SupabasePostRepository(PostRepository):
+    """``forum_posts`` through PostgREST"""
+
+    def list_for_course(self, course, sort_column, limit, offset=0, position=None):
+        if position:
+            sort = {'created_at': 'new', 'upvotes': 'top', 'hot_score': 'hot'}[sort_column]
+            response = supabase.rpc('list_course_posts', {
+                'p_course': course,
+                'p_limit': limit,
+                'p_sort': sort,
+                'p_before_created_at': position.get('created_at'),
+                'p_before_score': position.get(sort_column) if sort != 'new' else None,
+                'p_before_id': position['id']
+            }).execute()
+        else:
+            # id breaks ties the same way as the keyset pages that follow.
+            # One order parameter for both keys: this postgrest-py sends
+            # each .order() call as its own parameter.
+            response = supabase.table('forum_posts')\
+                .select('*')\
+                .eq('course', course)\
+                .order(f"{sort_column}.desc,id", desc=True)\
+                .limit(limit)\
+                .offset(offset)\
+                .execute()
+        return response.data or []
+
+    def get_course(self, post_id):
+        response = supabase.table('forum_posts')\
+            .select('course')\
+            .eq('id', post_id)\
+            .execute()
+        return response.data[0]['course'] if response.data else None
+
+    def create(self, post):
+        response = supabase.table('forum_posts').insert(post).execute()
+        if not response.data:
+            raise Exception("No data returned from post creation")
+        return response.data[0]
+
+    def create_many(self, posts):
+        return insert_rows('forum_posts', posts)
+
+    def count_for_course(self, course):
+        response = supabase.table('forum_posts')\
+            .select('id', count='exact')\
+            .eq('course', course)\
+            .execute()
+        return response.count if response.count is not None else 0
+
+    def latest_for_course(self, course):
+        response = supabase.table('forum_posts')\
+            .select('created_at')\
+            .eq('course', course)\
+            .order('created_at', desc=True)\
+            .limit(1)\
+            .execute()
+        return response.data[0]['created_at'] if response.data else None
+
+    def course_activity(self):
+        return supabase.rpc('get_course_activity', {}).execute().data or []
+
+    def list_for_user(self, user_id, limit):
+        response = supabase.table('forum_posts')\
+            .select('*')\
+            .eq('user_id', user_id)\
+            .order('created_at', desc=True)\
+            .limit(limit)\
+            .execute()
+        return response.data or []
+
+    def list_after(self, after_id, limit):
+        response = supabase.table('forum_posts')\
+            .select('*')\
+            .gt('id', after_id)\
+            .order('id')\
+            .limit(limit)\
+            .execute()
+        return response.data or []
+
+    def apply_upvote_deltas(self, deltas):
+        response = supabase.rpc('apply_upvote_deltas', {
+            'p_deltas': {str(post_id): delta for post_id, delta in deltas.items()}
+        }).execute()
+        return response.data or 0
+
+
+class SupabaseReplyRepository(ReplyRepository):
+    """``post_replies`` through PostgREST"""
+
+    def list_page(self, post_id, limit, position=None, backward=False):
+        async def fetch():
+            return await asyncio.gather(
+                self.page_query(async_db, post_id, limit, position, backward).execute(),
+                self.total_query(async_db, post_id).execute()
+            )
+
+        # The page and the reply count are independent, so fetch them together
+        response, total_response = run_async(fetch())
+        total = total_response.data[0]['reply_count'] if total_response.data else 0
+        return response.data or [], total
+
+    @staticmethod
+    def page_query(db, post_id: int, limit: int, position: Optional[Dict], backward: bool):
+        """
+        Build the query for one page of replies.
+
+        Args:
+            db: ``supabase`` or ``async_db``; both expose ``table`` and ``rpc``
+
+        Returns:
+            The unexecuted query builder
+        """
+        if position:
+            return db.rpc('list_post_replies', {
+                'p_post_id': post_id,
+                'p_limit': limit,
+                'p_created_at': position['created_at'],
+                'p_id': position['id'],
+                'p_backward': backward
+            })
+
+        # (created_at, id), the order list_post_replies pages in
+        return db.table('post_replies')\
+            .select('*')\
+            .eq('post_id', post_id)\
+            .order('created_at,id')\
+            .limit(limit)
+
+    @staticmethod
+    def total_query(db, post_id: int):
+        """Build the query for a post's denormalized reply count"""
+        return db.table('forum_posts')\
+            .select('reply_count')\
+            .eq('id', post_id)
+
+    def create(self, reply):
+        response = supabase.table('post_replies').insert(reply).execute()
+        if not response.data:
+            raise Exception("No data returned from reply creation")
+        return response.data[0]
+
+    def create_many(self, replies):
+        return insert_rows('post_replies', replies)
+
+    def list_after(self, after_id, limit):
+        response = supabase.table('post_replies')\
+            .select('*')\
+            .gt('id', after_id)\
+            .order('id')\
+            .limit(limit)\
+            .execute()
+        return response.data or []
+
+
+class SupabaseUpvoteRepository(UpvoteRepository):
+    """``post_upvotes`` through PostgREST"""
+
+    def toggle(self, post_id, user_id, adjust_count=True):
+        try:
+            response = supabase.rpc('toggle_post_upvote', {
+                'p_post_id': post_id,
+                'p_user_id': user_id,
+                'p_adjust_count': adjust_count
+            }).execute()
+        except Exception as e:
+            if getattr(e, 'code', None) == POST_NOT_FOUND_ERRCODE:
+                raise PostNotFoundError(f"Post {post_id} not found")
+            raise
+
+        if not response.data:
+            raise Exception("No data returned from upvote toggle")
+        return response.data[0]
+
+    def has_upvoted(self, post_id, user_id):
+        response = supabase.table('post_upvotes')\
+            .select('post_id')\
+            .eq('post_id', post_id)\
+            .eq('user_id', user_id)\
+            .limit(1)\
+            .execute()
+        return bool(response.data)
+
+    def upvoted_post_ids(self, post_ids, user_id):
+        if not post_ids:
+            return set()
+
+        response = supabase.table('post_upvotes')\
+            .select('post_id')\
+            .eq('user_id', user_id)\
+            .in_('post_id', list(post_ids))\
+            .execute()
+        return {row['post_id'] for row in (response.data or [])}
+
+
+class SupabaseUserRepository(UserRepository):
+    """``users`` through PostgREST"""
+
+    def get(self, clerk_user_id):
+        response = supabase.table('users').select('*').eq('clerk_user_id', clerk_user_id).execute()
+        return response.data[0] if response.data else None
+
+    def create(self, user):
+        response = supabase.table('users').insert(user).execute()
+        return response.data[0] if response.data else None
+
+    def update(self, clerk_user_id, changes):
+        response = supabase.table('users').update(changes).eq('clerk_user_id', clerk_user_id).execute()
+        return response.data[0] if response.data else None
+
+    def stats(self, user_id):
+        response = supabase.table('user_stats')\
+            .select(','.join(USER_STAT_COLUMNS))\
+            .eq('user_id', user_id)\
+            .limit(1)\
+            .execute()
+        return response.data[0] if response.data else dict.fromkeys(USER_STAT_COLUMNS, 0)
+
+    def reconcile_stats(self, include_received=True):
+        response = supabase.rpc('reconcile_user_stats', {'p_include_received': include_received}).execute()
+        return response.data or 0
+
+
+class SupabaseEventRepository(EventRepository):
+    """``forum_events`` through PostgREST"""
+
+    def append_many(self, events):
+        from postgrest.types import ReturnMethod
+
+        supabase.table('forum_events').insert(events, returning=ReturnMethod.minimal).execute()
+
+    def list_after(self, after_id, limit, course=None):
+        query = supabase.table('forum_events').select('*').gt('id', after_id)
+        if course is not None:
+            query = query.eq('course', course)
+        return query.order('id').limit(limit).execute().data or []
+
+    def latest_id(self):
+        response = supabase.table('forum_events').select('id').order('id', desc=True).limit(1).execute()
+        return response.data[0]['id'] if response.data else 0
+
+    def prune(self, before):
+        from postgrest.types import CountMethod, ReturnMethod
+
+        response = supabase.table('forum_events')\
+            .delete(count=CountMethod.exact, returning=ReturnMethod.minimal)\
+            .lt('created_at', before)\
+            .execute()
+        return response.count or 0
+
+
+class SupabaseStorage(Storage):
+    """Forum data in the Supabase Postgres database"""
+
+    name = 'supabase'
+
+    def __init__(self):
+        self.posts = SupabasePostRepository()
+        self.replies = SupabaseReplyRepository()
+        self.upvotes = SupabaseUpvoteRepository()
+        self.users = SupabaseUserRepository()
+        self.events = SupabaseEventRepository()
+
+    def search(self, query, course, limit):
+        response = supabase.rpc('search_forum', {
+            'p_query': query,
+            'p_course': course,
+            'p_limit': limit
+        }).execute()
+        return highlighted_results(response.data or [])
+
+    def ping(self):
+        supabase.table('forum_posts').select('id').limit(1).execute()
+
+    def metrics(self):
+        return {
+            'backend': self.name,
+            'initialized': db_config.initialized
+        }
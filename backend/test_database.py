@@ -15,6 +15,9 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
 if not SUPABASE_URL or not SUPABASE_KEY:
+    if __name__ != "__main__":
+        import pytest
+        pytest.skip("Missing Supabase credentials", allow_module_level=True)
     print("❌ Missing required Supabase credentials.")
     sys.exit(1)
 
@@ -25,79 +28,99 @@ def test_forum_posts_table():
     """Test forum_posts table operations"""
     print("\n🧪 Testing forum_posts table...")
     
-    try:
-        # Test reading from table
-        result = supabase.table('forum_posts').select('*').limit(5).execute()
-        print(f"✅ Successfully read from forum_posts table ({len(result.data)} rows)")
-        
-        # Test inserting a sample post
-        test_post = {
-            'title': 'Test Post',
-            'content': 'This is a test post to verify the table works.',
-            'course': 'CSC 111',
-            'user_id': 'test_user_123',
-            'user_name': 'testuser'
-        }
-        
-        insert_result = supabase.table('forum_posts').insert(test_post).execute()
-        if insert_result.data:
-            post_id = insert_result.data[0]['id']
-            print(f"✅ Successfully inserted test post (ID: {post_id})")
-            
-            # Test updating the post
-            update_result = supabase.table('forum_posts').update({'upvotes': 1}).eq('id', post_id).execute()
-            print("✅ Successfully updated test post")
-            
-            # Clean up - delete the test post
-            delete_result = supabase.table('forum_posts').delete().eq('id', post_id).execute()
-            print("✅ Successfully deleted test post")
-            
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error testing forum_posts table: {e}")
-        return False
+    # Test reading from table
+    result = supabase.table('forum_posts').select('*').limit(5).execute()
+    print(f"✅ Successfully read from forum_posts table ({len(result.data)} rows)")
+    
+    # Test inserting a sample post
+    test_post = {
+        'title': 'Test Post',
+        'content': 'This is a test post to verify the table works.',
+        'course': 'CSC 111',
+        'user_id': 'test_user_123',
+        'user_name': 'testuser'
+    }
+    
+    insert_result = supabase.table('forum_posts').insert(test_post).execute()
+    assert insert_result.data, "Inserting a test post returned no row"
+    post_id = insert_result.data[0]['id']
+    print(f"✅ Successfully inserted test post (ID: {post_id})")
+    
+    # Test updating the post
+    supabase.table('forum_posts').update({'upvotes': 1}).eq('id', post_id).execute()
+    print("✅ Successfully updated test post")
+    
+    # Clean up - delete the test post
+    supabase.table('forum_posts').delete().eq('id', post_id).execute()
+    print("✅ Successfully deleted test post")
 
 def test_post_upvotes_table():
     """Test post_upvotes table operations"""
     print("\n🧪 Testing post_upvotes table...")
     
+    # Test reading from table
+    result = supabase.table('post_upvotes').select('*').limit(5).execute()
+    print(f"✅ Successfully read from post_upvotes table ({len(result.data)} rows)")
+    
+    # Test inserting a sample upvote (we'll need a real post_id for this)
+    # For now, just test the table structure
+    print("✅ post_upvotes table structure is correct")
+
+def test_concurrent_upvotes(users=25):
+    """Test that concurrent upvote toggles on one post never lose counts"""
+    print("\n🧪 Testing concurrent upvote toggles...")
+    
+    from concurrent.futures import ThreadPoolExecutor
+    
+    post_id = None
     try:
-        # Test reading from table
-        result = supabase.table('post_upvotes').select('*').limit(5).execute()
-        print(f"✅ Successfully read from post_upvotes table ({len(result.data)} rows)")
+        insert_result = supabase.table('forum_posts').insert({
+            'title': 'Concurrency Test Post',
+            'content': 'This post is upvoted concurrently by many users.',
+            'course': 'CSC 111',
+            'user_id': 'test_user_123',
+            'user_name': 'testuser'
+        }).execute()
+        post_id = insert_result.data[0]['id']
         
-        # Test inserting a sample upvote (we'll need a real post_id for this)
-        # For now, just test the table structure
-        print("✅ post_upvotes table structure is correct")
+        def toggle(user_id):
+            return supabase.rpc('toggle_post_upvote', {
+                'p_post_id': post_id,
+                'p_user_id': user_id
+            }).execute().data[0]
         
-        return True
+        user_ids = [f"concurrency_user_{i}" for i in range(users)]
         
-    except Exception as e:
-        print(f"❌ Error testing post_upvotes table: {e}")
-        return False
+        # Every user upvotes at once, then every user removes the upvote at once
+        for expected_state, expected_count in ((True, users), (False, 0)):
+            with ThreadPoolExecutor(max_workers=users) as executor:
+                results = list(executor.map(toggle, user_ids))
+            
+            post = supabase.table('forum_posts').select('upvotes').eq('id', post_id).execute().data[0]
+            rows = supabase.table('post_upvotes').select('id', count='exact').eq('post_id', post_id).execute()
+            
+            assert all(result['upvoted'] is expected_state for result in results), \
+                f"Some toggles did not return upvoted={expected_state}"
+            assert post['upvotes'] == expected_count, \
+                f"Lost updates: upvotes={post['upvotes']}, expected {expected_count}"
+            assert rows.count == expected_count, \
+                f"Lost updates: rows={rows.count}, expected {expected_count}"
+            print(f"✅ {users} concurrent toggles -> {expected_count} upvotes, no lost updates")
+    finally:
+        if post_id is not None:
+            supabase.table('forum_posts').delete().eq('id', post_id).execute()
 
 def test_courses_api():
     """Test the courses API endpoint"""
     print("\n🧪 Testing courses API...")
     
-    try:
-        import requests
-        response = requests.get('http://localhost:5001/api/forums/courses')
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('success'):
-                print(f"✅ Courses API working ({len(data.get('data', []))} courses)")
-                return True
-            else:
-                print(f"❌ Courses API returned error: {data.get('error')}")
-                return False
-        else:
-            print(f"❌ Courses API returned status code: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"❌ Error testing courses API: {e}")
-        return False
+    import requests
+    response = requests.get('http://localhost:5001/api/forums/courses')
+    assert response.status_code == 200, f"Courses API returned status code: {response.status_code}"
+    
+    data = response.json()
+    assert data.get('success'), f"Courses API returned error: {data.get('error')}"
+    print(f"✅ Courses API working ({len(data.get('data', []))} courses)")
 
 def main():
     print("🚀 Testing database setup...")
@@ -105,16 +128,13 @@ def main():
     
     success = True
     
-    # Test tables
-    if not test_forum_posts_table():
-        success = False
-    
-    if not test_post_upvotes_table():
-        success = False
-    
-    # Test API
-    if not test_courses_api():
-        success = False
+    # Test tables, then the API
+    for test in (test_forum_posts_table, test_post_upvotes_table, test_concurrent_upvotes, test_courses_api):
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ {test.__name__} failed: {e}")
+            success = False
     
     print("\n" + "=" * 50)
     if success:
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the SQLite storage backend against a temporary file
+
+Runs offline; no Supabase project or credentials are needed. Each test gets
+an empty database, here and under pytest (see conftest.py).
+"""
+import os
+import sys
+import tempfile
+
+from config.storage import set_storage
+from storage.base import PostNotFoundError
+from storage.sqlite_storage import SQLiteStorage
+
+
+def make_post(course, index, created_at):
+    """Build a forum_posts row"""
+    return {
+        'title': f"Question {index}",
+        'content': f"How do I balance a red-black tree? ({index})",
+        'course': course,
+        'user_id': 'test_user_123',
+        'user_name': 'Test User',
+        'created_at': created_at
+    }
+
+
+def test_posts(storage):
+    """Test keyset pages in every sort order"""
+    print("\n🧪 Testing posts...")
+
+    posts = storage.posts.create_many([
+        make_post('COMP 210', i, f"2024-09-01T10:00:{i:02d}Z") for i in range(5)
+    ])
+    storage.upvotes.toggle(posts[1]['id'], 'voter')
+
+    for sort_column in ('created_at', 'upvotes', 'hot_score'):
+        first = storage.posts.list_for_course('COMP 210', sort_column, 2)
+        last = first[-1]
+        rest = storage.posts.list_for_course(
+            'COMP 210', sort_column, 10, position={sort_column: last[sort_column], 'id': last['id']}
+        )
+        ids = [post['id'] for post in first + rest]
+        assert sorted(ids) == sorted(post['id'] for post in posts), f"Keyset pages by {sort_column} returned {ids}"
+
+    top = storage.posts.list_for_course('COMP 210', 'upvotes', 1)[0]
+    assert top['id'] == posts[1]['id'], "Top post is not the upvoted one"
+
+    print("✅ Posts page correctly in every sort order")
+
+
+def test_upvotes(storage):
+    """Test toggling upvotes and the missing post error"""
+    print("\n🧪 Testing upvotes...")
+
+    post = storage.posts.create(make_post('COMP 110', 0, "2024-09-02T10:00:00Z"))
+    added = storage.upvotes.toggle(post['id'], 'voter')
+    removed = storage.upvotes.toggle(post['id'], 'voter')
+
+    results = (added['upvoted'], added['upvotes'], removed['upvoted'], removed['upvotes'])
+    assert results == (True, 1, False, 0), f"Unexpected toggle results: {added}, {removed}"
+
+    try:
+        storage.upvotes.toggle(10 ** 9, 'voter')
+    except PostNotFoundError:
+        pass
+    else:
+        raise AssertionError("Toggling a missing post did not fail")
+
+    print("✅ Upvotes toggle atomically")
+
+
+def test_replies(storage):
+    """Test reply stats triggers and keyset pages in both directions"""
+    print("\n🧪 Testing replies...")
+
+    post = storage.posts.create(make_post('COMP 301', 0, "2024-09-03T10:00:00Z"))
+    storage.replies.create_many([
+        {'post_id': post['id'], 'user_id': 'u', 'user_name': 'U', 'content': f"Reply {i}",
+         'created_at': f"2024-09-03T11:00:{i:02d}Z"}
+        for i in range(5)
+    ])
+
+    page, total = storage.replies.list_page(post['id'], 3)
+    after, _ = storage.replies.list_page(post['id'], 3, page[-1])
+    before, _ = storage.replies.list_page(post['id'], 3, after[0], backward=True)
+    stored = storage.posts.list_for_course('COMP 301', 'created_at', 1)[0]
+
+    assert total == 5 and stored['reply_count'] == 5, f"Reply stats not maintained: {total}, {stored}"
+    assert stored['last_reply_at'].startswith('2024-09-03T11:00:04'), f"Wrong last_reply_at: {stored}"
+    assert [r['content'] for r in after] == ['Reply 3', 'Reply 4'], "Reply pages out of order"
+    assert [r['content'] for r in before] == ['Reply 2', 'Reply 1', 'Reply 0'], "Reply pages out of order"
+
+    print("✅ Replies page correctly and keep post stats current")
+
+
+def test_search(storage):
+    """Test full-text search across posts and replies"""
+    print("\n🧪 Testing search...")
+
+    storage.posts.create(make_post('COMP 550', 0, "2024-09-05T10:00:00Z"))
+    results = storage.search('red-black trees', None, 5)
+    assert results and '<mark>' in results[0]['snippet'], f"Unexpected search results: {results}"
+    assert storage.search('"unbalanced AND (', None, 5) == [], "Search query syntax was not neutralized"
+
+    storage.posts.create({**make_post('COMP 550', 1, "2024-09-05T11:00:00Z"), 'content': "Heaps <img src=x onerror=alert(1)>"})
+    snippet = storage.search('heaps', None, 5)[0]['snippet']
+    assert snippet == "<mark>Heaps</mark> &lt;img src=x onerror=alert(1)&gt;", f"Snippet not escaped: {snippet}"
+
+    print(f"✅ Search found {len(results)} results")
+
+
+def test_user_stats(storage):
+    """Test the user_stats triggers against an exact recount"""
+    print("\n🧪 Testing user stats...")
+
+    author = {**make_post('COMP 311', 0, "2024-09-04T10:00:00Z"), 'user_id': 'author'}
+    post, other = storage.posts.create_many([author, {**author, 'title': "Another question"}])
+    storage.replies.create({'post_id': post['id'], 'user_id': 'author', 'user_name': 'A', 'content': "Bump"})
+    for voter in ('fan_1', 'fan_2', 'author'):
+        storage.upvotes.toggle(post['id'], voter)
+    storage.upvotes.toggle(other['id'], 'fan_1')
+    storage.upvotes.toggle(other['id'], 'fan_1')
+
+    stats = storage.users.stats('author')
+    expected = {'forum_posts': 2, 'forum_replies': 1, 'upvotes_received': 3, 'upvotes_given': 1}
+    assert stats == expected, f"Stats not maintained: {stats} != {expected}"
+    assert storage.users.stats('fan_1')['upvotes_given'] == 1, "Unexpected stats for a voter"
+    assert storage.users.stats('nobody')['forum_posts'] == 0, "Unexpected stats for an unknown user"
+
+    # Deleting a post takes its upvotes out of the author's received count
+    with storage.db.transaction('forum_posts', 'delete') as conn:
+        conn.execute('DELETE FROM forum_posts WHERE id = ?', (post['id'],))
+        conn.execute("UPDATE user_stats SET forum_replies = 99 WHERE user_id = 'fan_2'")
+
+    assert storage.users.stats('author')['upvotes_received'] == 0, f"Stats not updated on delete: {storage.users.stats('author')}"
+    assert storage.users.stats('fan_1')['upvotes_given'] == 0, f"Stats not updated on delete: {storage.users.stats('fan_1')}"
+
+    corrected = storage.users.reconcile_stats()
+    assert corrected == 1, f"Reconcile corrected {corrected} rows, expected 1"
+    assert storage.users.stats('fan_2')['forum_replies'] == 0, "Reconcile did not fix the drifted row"
+    assert storage.users.reconcile_stats() == 0, "A second reconcile still found drift"
+
+    # Batched upvotes: upvotes_received is left for the flush to settle
+    with storage.db.transaction('user_stats', 'update') as conn:
+        conn.execute("UPDATE user_stats SET upvotes_received = 5, forum_posts = 7 WHERE user_id = 'author'")
+    assert storage.users.reconcile_stats(include_received=False) == 1, "Reconcile skipping received found no drift"
+    stats = storage.users.stats('author')
+    assert (stats['forum_posts'], stats['upvotes_received']) == (1, 5), f"Reconcile touched upvotes_received: {stats}"
+
+    print("✅ User stats stay exact and reconcile fixes drift")
+
+
+def test_events(storage):
+    """Test live events crossing between workers through forum_events"""
+    print("\n🧪 Testing live events...")
+
+    from api.forums.events import EventHub
+
+    set_storage(storage)
+    # Two hubs stand in for two gunicorn workers; their relays are stepped by
+    # hand instead of on threads
+    worker_a, worker_b = EventHub(), EventHub()
+    worker_a._pid = worker_b._pid = os.getpid()
+
+    subscription = worker_b.subscribe('COMP 210')
+    worker_a.publish('COMP 210', 'post_created', {'id': 1})
+    worker_a.publish('COMP 301', 'post_created', {'id': 2})
+    worker_b.publish('COMP 210', 'upvote_changed', {'post_id': 1, 'upvotes': 1})
+    assert worker_a.flush() == 2 and worker_b.flush() == 1, "Queued events were not written"
+
+    assert worker_b.poll() == 3, "Worker B did not read every worker's events"
+    received = [subscription.get(timeout=0) for _ in range(2)]
+    assert [event[1] for event in received] == ['post_created', 'upvote_changed'], f"Unexpected events: {received}"
+    assert subscription.get(timeout=0) is None, "Another course's event was delivered"
+
+    resumed = worker_a.subscribe('COMP 210', last_event_id=received[0][0])
+    assert resumed.get(timeout=0) == received[1], "Reconnecting to another worker did not replay missed events"
+
+    assert storage.events.latest_id() == 3 and worker_a.prune() == 0, "Recent events were pruned"
+    worker_a.retention_seconds = -1
+    assert worker_a.prune() == 3 and storage.events.list_after(0, 10) == [], "Old events were not pruned"
+
+    print("✅ Live events reach subscribers on every worker")
+
+
+def main():
+    print("🚀 Testing SQLite storage...")
+    print("=" * 50)
+
+    success = True
+    for test in (test_posts, test_upvotes, test_replies, test_search, test_user_stats, test_events):
+        with tempfile.TemporaryDirectory() as directory:
+            try:
+                test(SQLiteStorage(os.path.join(directory, 'forum.sqlite3')))
+            except AssertionError as e:
+                print(f"❌ {e}")
+                success = False
+
+    print("\n" + "=" * 50)
+    if success:
+        print("🎉 All SQLite storage tests passed!")
+    else:
+        print("❌ Some SQLite storage tests failed. Check the errors above.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
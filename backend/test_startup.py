@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the app imports quickly and without a database
+
+Importing the app must not validate credentials, import the Supabase client
+libraries or open connections; that all happens on the first query. This
+keeps worker boot, CLI tools and tests fast, and is checked against a budget.
+
+Usage:
+    python test_startup.py [--budget-ms N] [--runs N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Packages the app must not import until the database is first used
+DEFERRED_MODULES = ('supabase', 'postgrest', 'httpx')
+
+# Median wall time allowed for a fresh `import app`
+IMPORT_TIME_BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', '500'))
+
+PROBE = f"""
+import sys
+import app
+app.create_app()
+loaded = [name for name in {DEFERRED_MODULES!r} if name in sys.modules]
+print(','.join(loaded))
+"""
+
+
+def startup_env():
+    """Environment for the import without any Supabase credentials"""
+    env = {key: value for key, value in os.environ.items() if not key.startswith('SUPABASE_')}
+    # Blank values keep load_dotenv from filling them in from .env
+    env['SUPABASE_URL'] = ''
+    env['SUPABASE_SERVICE_ROLE_KEY'] = ''
+    return env
+
+
+def test_import_without_credentials():
+    """Test the app imports and builds without credentials or client libraries"""
+    print("\n🧪 Testing import without credentials...")
+
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE], env=startup_env(), capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    assert result.returncode == 0, f"Import failed: {result.stderr.strip().splitlines()[-1:]}"
+
+    loaded = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ''
+    assert not loaded, f"Import loaded deferred modules: {loaded}"
+
+    print("✅ App imports without credentials or database libraries")
+
+
+def test_import_time(budget_ms=IMPORT_TIME_BUDGET_MS, runs=5):
+    """Test the median time of a fresh `import app` is within budget"""
+    print(f"\n🧪 Testing import time (budget {budget_ms:.0f}ms)...")
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-c', 'import app'], env=startup_env(), capture_output=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+        assert result.returncode == 0, "Import failed"
+
+    median = sorted(timings)[len(timings) // 2]
+    assert median <= budget_ms, f"Import took {median:.0f}ms (budget {budget_ms:.0f}ms)"
+
+    print(f"✅ Import took {median:.0f}ms (min {min(timings):.0f}ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_TIME_BUDGET_MS)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print("🚀 Testing startup...")
+    print("=" * 50)
+
+    success = True
+
+    for test, test_args in ((test_import_without_credentials, ()), (test_import_time, (args.budget_ms, args.runs))):
+        try:
+            test(*test_args)
+        except AssertionError as e:
+            print(f"❌ {e}")
+            success = False
+
+    print("\n" + "=" * 50)
+    if success:
+        print("🎉 All startup tests passed!")
+    else:
+        print("❌ Some startup tests failed. Check the errors above.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
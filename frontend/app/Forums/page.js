@@ -21,6 +21,10 @@ export default function ForumsPage() {
   const [creatingPost, setCreatingPost] = useState(false);
   const [expandedPost, setExpandedPost] = useState(null);
   const [replies, setReplies] = useState({});
+  // Per post: cursor for the next page of replies (null once all are loaded) and the thread's total
+  const [replyCursors, setReplyCursors] = useState({});
+  const [replyTotals, setReplyTotals] = useState({});
+  const [loadingMoreReplies, setLoadingMoreReplies] = useState(null);
   const [newReplyContent, setNewReplyContent] = useState('');
   const [creatingReply, setCreatingReply] = useState(false);
 
@@ -67,7 +71,12 @@ export default function ForumsPage() {
   const fetchPosts = async (courseCode) => {
     try {
       setPostsLoading(true);
-      const response = await fetch(`${API_BASE_URL}/api/forums/posts?course=${encodeURIComponent(courseCode)}&limit=20&offset=0`, {
+      const params = new URLSearchParams({ course: courseCode, limit: '20', offset: '0' });
+      if (userId) {
+        // Each post then says whether this user upvoted it
+        params.set('user_id', userId);
+      }
+      const response = await fetch(`${API_BASE_URL}/api/forums/posts?${params}`, {
         signal: AbortSignal.timeout(10000)
       });
       
@@ -170,9 +179,11 @@ export default function ForumsPage() {
     }
   };
 
-  const fetchReplies = async (postId) => {
+  // Loads the first page of a thread's replies, or the page after `cursor`
+  const fetchReplies = async (postId, cursor = null) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/api/forums/posts/${postId}/replies`, {
+      const params = cursor ? `?${new URLSearchParams({ after: cursor })}` : '';
+      const response = await fetch(`${API_BASE_URL}/api/forums/posts/${postId}/replies${params}`, {
         signal: AbortSignal.timeout(10000)
       });
       
@@ -185,17 +196,30 @@ export default function ForumsPage() {
       if (data.success) {
         setReplies(prev => ({
           ...prev,
-          [postId]: data.data || []
+          [postId]: cursor ? [...(prev[postId] || []), ...(data.data || [])] : (data.data || [])
         }));
+        setReplyCursors(prev => ({ ...prev, [postId]: data.next_cursor || null }));
+        setReplyTotals(prev => ({ ...prev, [postId]: data.total }));
       } else {
         throw new Error(data.message || 'Failed to fetch replies');
       }
     } catch (err) {
       console.error('Error fetching replies:', err);
-      setReplies(prev => ({
-        ...prev,
-        [postId]: []
-      }));
+      if (!cursor) {
+        setReplies(prev => ({
+          ...prev,
+          [postId]: []
+        }));
+      }
+    }
+  };
+
+  const loadMoreReplies = async (postId) => {
+    setLoadingMoreReplies(postId);
+    try {
+      await fetchReplies(postId, replyCursors[postId]);
+    } finally {
+      setLoadingMoreReplies(null);
     }
   };
 
@@ -228,7 +252,12 @@ export default function ForumsPage() {
       
       if (data.success) {
         setNewReplyContent('');
-        await fetchReplies(postId);
+        setReplyTotals(prev => ({ ...prev, [postId]: (prev[postId] ?? 0) + 1 }));
+        // Replies are oldest first: with later pages still unloaded, the new
+        // reply arrives with them via "load more"
+        if (!replyCursors[postId]) {
+          setReplies(prev => ({ ...prev, [postId]: [...(prev[postId] || []), data.data] }));
+        }
       } else {
         throw new Error(data.message || 'Failed to create reply');
       }
@@ -484,8 +513,8 @@ export default function ForumsPage() {
                             <div className="flex items-center space-x-4">
                               <button
                                 onClick={() => handleUpvote(post.id)}
-                                className="flex items-center space-x-1 hover:text-blue-600 transition-colors"
-                                title="Upvote this post"
+                                className={`flex items-center space-x-1 hover:text-blue-600 transition-colors ${post.upvoted ? 'text-blue-600 font-semibold' : ''}`}
+                                title={post.upvoted ? 'Remove your upvote' : 'Upvote this post'}
                               >
                                 <span>👍</span>
                                 <span>{post.upvotes || 0}</span>
@@ -496,7 +525,7 @@ export default function ForumsPage() {
                                 title="View replies"
                               >
                                 <span>💬</span>
-                                <span>{replies[post.id]?.length || 0} replies</span>
+                                <span>{replyTotals[post.id] ?? post.reply_count ?? 0} replies</span>
                               </button>
                             </div>
                           </div>
@@ -518,6 +547,18 @@ export default function ForumsPage() {
                                   </div>
                                 ))}
                                 
+                                {replyCursors[post.id] && (
+                                  <button
+                                    onClick={() => loadMoreReplies(post.id)}
+                                    disabled={loadingMoreReplies === post.id}
+                                    className="w-full py-2 text-sm text-blue-600 hover:text-blue-700 disabled:text-gray-400 transition-colors"
+                                  >
+                                    {loadingMoreReplies === post.id
+                                      ? 'Loading...'
+                                      : `Load more replies (${(replyTotals[post.id] ?? post.reply_count ?? 0) - (replies[post.id]?.length ?? 0)} more)`}
+                                  </button>
+                                )}
+                                
                                 <div className="mt-4">
                                   <textarea
                                     value={newReplyContent}
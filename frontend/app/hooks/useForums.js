@@ -100,6 +100,8 @@ export const useForumCourses = () => {
  * @returns {Object} - Posts state and actions
  */
 export const useForumPosts = (courseCode) => {
+  const { user } = useUser();
+  const userId = user?.id;
   const [posts, setPosts] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
@@ -111,7 +113,7 @@ export const useForumPosts = (courseCode) => {
       setLoading(true);
       setError(null);
 
-      const response = await forumsService.getPosts(code);
+      const response = await forumsService.getPosts(code, 20, 0, userId);
       const postsData = response.data.map(post => ({
         id: post.id,
         title: post.title || 'Untitled',
@@ -119,9 +121,10 @@ export const useForumPosts = (courseCode) => {
         author: post.user_name || 'Anonymous',
         course: post.course || code,
         upvotes: post.upvotes || 0,
-        replies: 0, // TODO: Add replies functionality
+        replies: post.reply_count || 0,
+        lastReplyAt: post.last_reply_at,
         timeAgo: utils.formatTimeAgo(post.created_at),
-        isUpvoted: false, // TODO: Check user's upvote status
+        isUpvoted: post.upvoted || false,
         created_at: post.created_at
       }));
 
@@ -133,7 +136,7 @@ export const useForumPosts = (courseCode) => {
     } finally {
       setLoading(false);
     }
-  }, []);
+  }, [userId]);
 
   useEffect(() => {
     if (courseCode) {
@@ -154,15 +154,19 @@ export const forumsService = {
    * @param {string} courseCode - Course code
    * @param {number} limit - Maximum number of posts
    * @param {number} offset - Number of posts to skip
+   * @param {string} [userId] - Signed-in user, so each post says whether they upvoted it
    * @returns {Promise<Object>} - Posts data
    */
-  async getPosts(courseCode, limit = 20, offset = 0) {
+  async getPosts(courseCode, limit = 20, offset = 0, userId = null) {
     try {
       const params = new URLSearchParams({
         course: courseCode,
         limit: limit.toString(),
         offset: offset.toString(),
       });
+      if (userId) {
+        params.set('user_id', userId);
+      }
       
       const response = await fetchWithRetry(
         `${API_CONFIG.BASE_URL}/api/forums/posts?${params}`